@@ -0,0 +1,43 @@
+"""
+High school baseball stats parser.
+
+Importing the package or any module in it does no work: scripts run only
+through their main() entry points, e.g.
+
+    python -m backend.parse_baseball_data
+    python -m backend.recompute_league
+    python -m backend.stats_service --port 5000
+
+The parsing and metrics API is re-exported here and loaded on first use, so
+`import backend` stays cheap:
+
+    from backend import parse_lines, aggregate_league
+"""
+import importlib
+
+_EXPORTS = {
+    "parse_lines": "fast_parse",
+    "iter_parse_chunks": "fast_parse",
+    "parse_baseball_data_fast": "fast_parse",
+    "parse_additional_data_fast": "fast_parse",
+    "COUNTING_STATS": "league_totals",
+    "LeagueTotals": "league_totals",
+    "aggregate_league": "league_totals",
+    "open_store": "stats_store",
+    "PlayerRecords": "player_records",
+    "parse_records": "player_records",
+    "merge_additional_data": "parse_baseball_data",
+    "validate_text": "validation",
+    "validate_lines": "validation",
+    "ValidationReport": "validation",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
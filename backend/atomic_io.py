@@ -0,0 +1,284 @@
+"""
+Atomic, lock-protected writes to an output directory such as output_data/.
+
+Writers stage every file they change as a hidden temp file next to its target
+and rename them all into place when the transaction commits. Files staged for
+removal are deleted in the same commit. Only whole, committed files are ever
+visible under the real names.
+
+    with atomic_io.transaction("output_data") as txn:
+        df.to_csv(txn.path("output_data/Branham_stats.csv"), index=False)
+        league_df.to_csv(txn.path("output_data/league_stats.csv"), index=False)
+    # both files are replaced together here
+
+Two lock files in the directory coordinate processes:
+- .write.lock is held exclusively by a writer for its whole transaction.
+  Overlapping scripts therefore run one after another, and a read-modify-write
+  cannot lose another writer's update.
+- .commit.lock is held exclusively only while the staged files are renamed.
+  Readers that need several files from the same commit (the league table)
+  hold it shared with snapshot(); readers never wait for a writer's parsing
+  or metric work, only for the renames.
+
+Transactions nest. A transaction opened on a directory that this thread
+already has one open on joins it, and the files are committed when the
+outermost one exits. If a transaction raises, its temp files are removed and
+nothing is replaced.
+"""
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+WRITE_LOCK_FILE = ".write.lock"
+COMMIT_LOCK_FILE = ".commit.lock"
+TEMP_SUFFIX = ".tmp"
+
+# Seconds to wait for another writer before giving up; None waits forever
+DEFAULT_TIMEOUT = 120.0
+POLL_INTERVAL = 0.05
+
+_counter = itertools.count()
+_local = threading.local()
+
+
+class LockTimeout(TimeoutError):
+    pass
+
+
+def _try_lock(handle, shared):
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+        else:
+            # msvcrt has no shared locks, so readers exclude each other on Windows
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(handle):
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    else:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# Function to hold a lock file in a directory
+@contextmanager
+def directory_lock(directory, name=WRITE_LOCK_FILE, shared=False, timeout=DEFAULT_TIMEOUT):
+    """
+    Parameters:
+    directory (str): Directory the lock file lives in (created if missing).
+    name (str): Lock file name, WRITE_LOCK_FILE or COMMIT_LOCK_FILE.
+    shared (bool): Take a shared (reader) lock instead of an exclusive one.
+    timeout (float): Seconds to wait, or None to wait forever.
+
+    Raises:
+    LockTimeout: If the lock is still held by another process after timeout.
+    """
+    os.makedirs(directory, exist_ok=True)
+    handle = open(os.path.join(directory, name), "a+b")
+    try:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not _try_lock(handle, shared):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise LockTimeout(f"Timed out after {timeout:g}s waiting for '{os.path.join(directory, name)}'.")
+            time.sleep(POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            _unlock(handle)
+    finally:
+        handle.close()
+
+
+def _fsync(path, directory=False):
+    try:
+        fd = os.open(path, os.O_RDONLY | (getattr(os, "O_DIRECTORY", 0) if directory else 0))
+    except OSError:  # Directories cannot be opened on Windows
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _is_temp(filename):
+    return filename.startswith(".") and filename.endswith(TEMP_SUFFIX)
+
+
+# Files staged for one directory, renamed into place on commit
+class Transaction:
+    def __init__(self, directory, fsync=True):
+        self.directory = directory
+        self.fsync = fsync
+        # Target path to staged temp path, in staging order
+        self._staged = {}
+        # Target paths to delete on commit
+        self._removed = set()
+
+    def _target(self, target):
+        target = os.path.abspath(target)
+        if os.path.dirname(target) != os.path.abspath(self.directory):
+            raise ValueError(f"'{target}' is not in the transaction's directory '{self.directory}'.")
+        return target
+
+    def path(self, target):
+        """
+        Return the temp path to write target's new contents to. Staging the
+        same target again returns the same temp path.
+        """
+        target = self._target(target)
+        self._removed.discard(target)
+        if target not in self._staged:
+            name = f".{os.path.basename(target)}.{os.getpid()}.{next(_counter)}{TEMP_SUFFIX}"
+            self._staged[target] = os.path.join(os.path.dirname(target), name)
+        return self._staged[target]
+
+    def remove(self, target):
+        """
+        Delete target when the transaction commits, dropping anything staged
+        for it. A target that does not exist by then is ignored.
+        """
+        target = self._target(target)
+        temp = self._staged.pop(target, None)
+        if temp is not None:
+            try:
+                os.remove(temp)
+            except FileNotFoundError:
+                pass
+        self._removed.add(target)
+
+    def current(self, target):
+        """
+        Return the path holding target's latest contents in this transaction:
+        the staged file if it was written, otherwise target itself.
+        """
+        staged = self._staged.get(os.path.abspath(target))
+        return staged if staged is not None and os.path.exists(staged) else target
+
+    def staged(self):
+        return list(self._staged)
+
+    def commit(self):
+        staged = [(target, temp) for target, temp in self._staged.items() if os.path.exists(temp)]
+        if self.fsync:
+            for _, temp in staged:
+                _fsync(temp)
+        removed = []
+        with directory_lock(self.directory, COMMIT_LOCK_FILE, timeout=None):
+            for target, temp in staged:
+                os.replace(temp, target)
+            for target in sorted(self._removed):
+                try:
+                    os.remove(target)
+                except FileNotFoundError:
+                    continue
+                removed.append(target)
+        if self.fsync and (staged or removed):
+            _fsync(self.directory, directory=True)
+        self._staged.clear()
+        self._removed.clear()
+        return [target for target, _ in staged] + removed
+
+    def rollback(self):
+        for temp in self._staged.values():
+            try:
+                os.remove(temp)
+            except FileNotFoundError:
+                pass
+        self._staged.clear()
+        self._removed.clear()
+
+
+def _active():
+    if not hasattr(_local, "transactions"):
+        _local.transactions = {}
+    return _local.transactions
+
+
+def _remove_stale_temps(directory):
+    # Left behind by a writer that crashed; safe to remove while holding the write lock
+    for filename in os.listdir(directory):
+        if _is_temp(filename):
+            try:
+                os.remove(os.path.join(directory, filename))
+            except OSError:
+                pass
+
+
+# Function to open (or join) the write transaction for a directory
+@contextmanager
+def transaction(directory, timeout=DEFAULT_TIMEOUT, fsync=True):
+    """
+    Parameters:
+    directory (str): Directory whose files are written.
+    timeout (float): Seconds to wait for another writer's transaction.
+    fsync (bool): Flush staged files and the directory to disk on commit.
+
+    Yields:
+    Transaction: Stage files with txn.path(target), deletions with
+    txn.remove(target).
+    """
+    key = os.path.realpath(directory)
+    active = _active()
+    if key in active:
+        yield active[key]
+        return
+
+    with directory_lock(directory, WRITE_LOCK_FILE, timeout=timeout):
+        _remove_stale_temps(directory)
+        txn = Transaction(directory, fsync=fsync)
+        active[key] = txn
+        try:
+            yield txn
+        except BaseException:
+            txn.rollback()
+            raise
+        else:
+            txn.commit()
+        finally:
+            del active[key]
+
+
+# Function to write one file atomically (a transaction of one file unless one is already open)
+@contextmanager
+def atomic_path(target, timeout=DEFAULT_TIMEOUT):
+    """
+    Yields:
+    str: Temp path to write to; it replaces target when the block exits.
+    """
+    with transaction(os.path.dirname(os.path.abspath(target)), timeout=timeout) as txn:
+        yield txn.path(target)
+
+
+# Function to return where a file's latest contents are, including uncommitted writes of this thread
+def current_path(target):
+    txn = _active().get(os.path.realpath(os.path.dirname(os.path.abspath(target))))
+    return target if txn is None else txn.current(target)
+
+
+# Function to read several files of a directory from one commit
+@contextmanager
+def snapshot(directory, timeout=DEFAULT_TIMEOUT):
+    """
+    Hold the directory's commit lock shared, so no transaction renames files
+    while the block reads them. Does nothing if the directory does not exist
+    or this thread is writing to it (its own transaction cannot be committing).
+    """
+    if not os.path.isdir(directory) or os.path.realpath(directory) in _active():
+        yield
+        return
+    with directory_lock(directory, COMMIT_LOCK_FILE, shared=True, timeout=timeout):
+        yield
@@ -0,0 +1,173 @@
+"""
+Batch ingestion of a whole league directory.
+
+Each team is a raw text file named <Team>.txt holding the basic rows (up to HR
+and GS), a line reading 'done', then the additional rows (SF through OPS) --
+the same thing you would paste into the interactive prompt. Teams are parsed
+and merged in parallel, then league totals and wOBA weights are computed once.
+The team files are replaced in one atomic_io transaction.
+
+    python -m backend.batch_ingest raw_league/ --workers 4
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from . import atomic_io, instrument
+from .fast_parse import DEFAULT_CHUNK_SIZE, parse_lines
+from .parse_baseball_data import apply_league_woba, merge_additional_data
+
+RAW_EXTENSION = ".txt"
+
+
+# Function to list the raw team files in a directory, in a stable order
+def find_team_files(input_directory):
+    return sorted(
+        os.path.join(input_directory, filename)
+        for filename in os.listdir(input_directory)
+        if filename.endswith(RAW_EXTENSION)
+    )
+
+
+def _section(handle):
+    for line in handle:
+        if line.rstrip("\r\n").lower() == "done":
+            return
+        yield line
+
+
+def _parse_section(handle, kind, chunk_size):
+    lines = _section(handle)
+    df = parse_lines(lines, kind=kind, chunk_size=chunk_size)
+    # A 'quit' line stops parsing early; skip the rest of the section
+    for _ in lines:
+        pass
+    return df
+
+
+def team_output_path(output_directory, path):
+    return os.path.join(output_directory, f"{os.path.basename(path)[:-len(RAW_EXTENSION)]}_stats.csv")
+
+
+# Function to parse and merge one team's raw file
+def parse_team_file(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Parse both sections of a raw team file and merge them.
+
+    Returns:
+    tuple: (team name, merged DataFrame)
+    """
+    team_name = os.path.basename(path)[:-len(RAW_EXTENSION)]
+    with open(path, encoding="utf-8") as handle:
+        basic_df = _parse_section(handle, "basic", chunk_size)
+        additional_df = _parse_section(handle, "additional", chunk_size)
+
+    if basic_df.empty:
+        raise ValueError(f"No valid basic rows found in '{path}'.")
+    if additional_df.empty:
+        raise ValueError(f"No valid additional rows found in '{path}'.")
+
+    return team_name, merge_additional_data(basic_df, additional_df)
+
+
+# Function to parse and merge one team's raw file and save it to the output directory
+def process_team_file(path, output_directory, chunk_size=DEFAULT_CHUNK_SIZE, output_path=None):
+    """
+    Parse and merge a raw team file and write <Team>_stats.csv. Runs inside a
+    worker process.
+
+    Parameters:
+    output_path (str): Where to write instead of <Team>_stats.csv, e.g. the
+    temp path a transaction staged for it.
+
+    Returns:
+    tuple: (team name, merged DataFrame)
+    """
+    team_name, team_df = parse_team_file(path, chunk_size)
+    output_path = output_path or team_output_path(output_directory, path)
+    with instrument.stage("write") as record:
+        team_df.to_csv(output_path, index=False)
+        if record:
+            record.add(rows=len(team_df), bytes_written=os.path.getsize(output_path))
+    return team_name, team_df
+
+
+# Function to ingest every team in a directory and compute league wOBA once at the end
+def ingest_league(input_directory, output_directory="output_data", workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Parameters:
+    input_directory (str): Directory of raw <Team>.txt files.
+    output_directory (str): Directory the <Team>_stats.csv files are written to.
+    workers (int): Number of worker processes; 1 parses in this process.
+    chunk_size (int): Number of input lines parsed per chunk.
+
+    Returns:
+    dict: Team name to DataFrame with wOBA added, in sorted team order.
+    """
+    paths = find_team_files(input_directory)
+    team_dataframes = {}
+
+    # Workers write to the temp paths staged here; the files replace the old
+    # ones together once every team is done
+    with atomic_io.transaction(output_directory) as txn:
+        staged = [txn.path(team_output_path(output_directory, path)) for path in paths]
+        if workers == 1:
+            results = [
+                _collect(path, partial(process_team_file, path, output_directory, chunk_size, output_path))
+                for path, output_path in zip(paths, staged)
+            ]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(process_team_file, path, output_directory, chunk_size, output_path)
+                    for path, output_path in zip(paths, staged)
+                ]
+                results = [_collect(path, future.result) for future, path in zip(futures, paths)]
+
+    # Results are collected in submission order so the output is deterministic
+    for result in results:
+        if result is not None:
+            team_name, team_df = result
+            team_dataframes[team_name] = team_df
+
+    if team_dataframes:
+        apply_league_woba(team_dataframes)
+    return team_dataframes
+
+
+def _collect(path, get_result):
+    try:
+        return get_result()
+    except (OSError, ValueError) as e:
+        print(f"Skipping '{path}': {e}", file=sys.stderr)
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input_directory", help="Directory of raw <Team>.txt files")
+    parser.add_argument("-o", "--output-directory", default="output_data")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Number of lines parsed per chunk")
+    instrument.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument.configure_from_args(args)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if not os.path.isdir(args.input_directory):
+        parser.error(f"'{args.input_directory}' is not a directory")
+
+    with instrument.stage("ingest_league"):
+        team_dataframes = ingest_league(args.input_directory, args.output_directory, args.workers, args.chunk_size)
+    for team, df in team_dataframes.items():
+        print(f"{team}: {len(df)} players")
+    return 0 if team_dataframes else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+Scaling benchmark for batch_ingest.py: builds a synthetic league directory and
+ingests it with 1, 2, 4 and 8 worker processes.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_batch_ingest [--teams 32 --players 5000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from backend.batch_ingest import ingest_league
+from backend.synthetic import synthetic_pastes
+
+
+# Function to write one raw <Team>.txt file per team
+def write_league(directory, teams, players):
+    for team in range(teams):
+        basic, additional = synthetic_pastes(players, seed=team)
+        with open(os.path.join(directory, f"Team{team:03d}.txt"), "w", encoding="utf-8") as handle:
+            handle.write(f"{basic}\ndone\n{additional}\ndone\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=32)
+    parser.add_argument("--players", type=int, default=5000, help="Rows per team")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_directory = os.path.join(tmp, "raw")
+        output_directory = os.path.join(tmp, "output_data")
+        os.makedirs(raw_directory)
+        write_league(raw_directory, args.teams, args.players)
+
+        print(f"{args.teams} teams x {args.players} rows, {os.cpu_count()} CPUs available")
+        print(f"{'workers':>8}{'seconds':>12}{'speedup':>10}")
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            # Weights are printed by apply_league_woba; keep the table readable
+            with open(os.devnull, "w") as devnull:
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    team_dataframes = ingest_league(raw_directory, output_directory, workers=workers)
+                finally:
+                    sys.stdout = stdout
+            elapsed = time.perf_counter() - start
+            assert len(team_dataframes) == args.teams
+            baseline = baseline or elapsed
+            print(f"{workers:>8}{elapsed:>12.3f}{baseline / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
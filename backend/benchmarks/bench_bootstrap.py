@@ -0,0 +1,100 @@
+"""
+Bootstrap confidence intervals (bootstrap.py): a loop over replicates and one
+batched draw for all players against the engine in one process and in a
+process pool.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_bootstrap [--teams 9 40 --replicates 10000 --workers 4]
+
+'loop' draws one replicate of one player at a time. It is timed on
+--loop-replicates replicates and scaled to --replicates. 'batched' draws every
+(player, replicate) pair in one multinomial call; the engine instead draws all
+of one player's replicates per call.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.bootstrap import STATS, bootstrap_intervals, outcome_counts, outcome_stats
+from backend.fast_parse import parse_additional_data_fast, parse_baseball_data_fast
+from backend.league_totals import aggregate_league
+from backend.parse_baseball_data import merge_additional_data
+from backend.synthetic import synthetic_league
+
+
+def _league(teams, players):
+    frames = [
+        merge_additional_data(parse_baseball_data_fast(basic), parse_additional_data_fast(additional))
+        for basic, additional in synthetic_league(teams, players).values()
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _probabilities(counts):
+    total = counts.sum()
+    return counts / total if total else np.eye(len(counts))[-1]
+
+
+# The straightforward version: one draw per player per replicate
+def replicate_loop(df, replicates, level=0.95, seed=0):
+    rng = np.random.default_rng(seed)
+    league_ops = aggregate_league(df).ops
+    alpha = (1 - level) / 2
+    bounds = {stat: [] for stat in STATS}
+    for counts in outcome_counts(df):
+        total, probabilities = counts.sum(), _probabilities(counts)
+        samples = {stat: [] for stat in STATS}
+        for _ in range(replicates):
+            for stat, value in outcome_stats(rng.multinomial(total, probabilities), league_ops).items():
+                samples[stat].append(value)
+        for stat, values in samples.items():
+            bounds[stat].append(np.quantile(values, [alpha, 1 - alpha]))
+    return bounds
+
+
+# One multinomial call for every player and replicate: shape (players, replicates, outcomes)
+def batched_draw(df, replicates, level=0.95, seed=0):
+    rng = np.random.default_rng(seed)
+    league_ops = aggregate_league(df).ops
+    alpha = (1 - level) / 2
+    counts = outcome_counts(df)
+    probabilities = np.array([_probabilities(player) for player in counts])
+    drawn = rng.multinomial(np.broadcast_to(counts.sum(axis=1)[:, None], (len(counts), replicates)),
+                            probabilities[:, None, :])
+    return {stat: np.quantile(values, [alpha, 1 - alpha], axis=1)
+            for stat, values in outcome_stats(drawn, league_ops).items()}
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, nargs="+", default=[9, 40])
+    parser.add_argument("--players", type=int, default=18)
+    parser.add_argument("--replicates", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--loop-replicates", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'players':>9}{'loop (s)':>10}{'batched (s)':>13}{'1 worker (s)':>14}"
+          f"{f'{args.workers} workers (s)':>16}{'draws/s':>14}")
+    for teams in args.teams:
+        df = _league(teams, args.players)
+        loop = _timed(lambda: replicate_loop(df, args.loop_replicates)) * args.replicates / args.loop_replicates
+        batched = _timed(lambda: batched_draw(df, args.replicates))
+        single = _timed(lambda: bootstrap_intervals(df, args.replicates, workers=1))
+        pooled = _timed(lambda: bootstrap_intervals(df, args.replicates, workers=args.workers))
+        print(f"{len(df):>9}{loop:>10.1f}{batched:>13.2f}{single:>14.2f}{pooled:>16.2f}"
+              f"{len(df) * args.replicates / min(single, pooled):>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Derived-column cache (derived.py): computing every metric cold, warm, and
+after one team's stats change, against computing them directly.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_derived [--teams 9 200 2000 --players 20]
+
+'direct' calls the metric functions on the whole league with no cache. 'cold'
+starts from an empty cache, 'warm' finds every team cached, and 'one team'
+changes one team's hits, so every team misses on wRAA and OPS+ (their league
+constants moved) but only that team misses on the other metrics.
+"""
+import argparse
+import contextlib
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from backend.derived import METRICS, DerivedColumns, league_constants, resolve
+from backend.league_totals import aggregate_league
+from backend.stats_store import TEAM_COLUMN, CsvStore
+from backend.synthetic import synthetic_league
+from backend.fast_parse import parse_additional_data_fast, parse_baseball_data_fast
+from backend.parse_baseball_data import merge_additional_data
+
+
+def _league(teams, players):
+    frames = []
+    for team, (basic, additional) in synthetic_league(teams, players).items():
+        df = merge_additional_data(parse_baseball_data_fast(basic), parse_additional_data_fast(additional))
+        frames.append(df.assign(**{TEAM_COLUMN: team}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _direct(df):
+    work = df.copy()
+    constants = league_constants(aggregate_league(work))
+    for metric in resolve():
+        work[metric.name] = metric.compute(work, constants)
+    return work
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, nargs="+", default=[9, 200, 2000])
+    parser.add_argument("--players", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'teams':>7}{'rows':>9}{'direct (s)':>12}{'cold (s)':>10}{'warm (s)':>10}{'one team (s)':>14}"
+          f"{'misses':>8}")
+    for teams in args.teams:
+        df = _league(teams, args.players)
+        with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as sink, \
+                contextlib.redirect_stdout(sink):
+            derived = DerivedColumns(CsvStore(directory))
+            direct = _timed(lambda: _direct(df))
+            cold = _timed(lambda: derived.compute(df))
+            warm = _timed(lambda: derived.compute(df))
+
+            changed = df.copy()
+            first = changed[TEAM_COLUMN] == changed[TEAM_COLUMN].iat[0]
+            changed.loc[first, 'Hits'] += 1
+            derived.misses = 0
+            one_team = _timed(lambda: derived.compute(changed))
+            misses = derived.misses
+            shutil.rmtree(derived.cache_directory)
+        print(f"{teams:>7}{len(df):>9}{direct:>12.4f}{cold:>10.4f}{warm:>10.4f}{one_team:>14.4f}"
+              f"{misses:>5}/{teams * len(METRICS)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Fetching stat pages (fetch.py): one request at a time against --concurrency
+in flight over pooled keep-alive connections, and a refetch where every page
+answers 304 Not Modified, against the local stub server.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_fetch [--teams 9 36 --latency 0.05 --concurrency 8]
+
+--latency is the stub server's delay per response, standing in for a remote
+site. Each team's pages are parsed and checked against its fixture pastes.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from backend.benchmarks.stub_server import StubServer, fixture_pages
+from backend.fetch import PAGES, ConnectionPool, fetch_league, fetch_page, fetch_pages, parse_team_pages
+from backend.parse_baseball_data import merge_additional_data, parse_additional_data, parse_baseball_data
+from backend.synthetic import synthetic_league
+
+
+def _fetch(server, concurrency, pooled=True):
+    # Fetch every team without a cache; returns (seconds, connections opened, pages)
+    pool = ConnectionPool()
+    server.reset_counts()
+    start = time.perf_counter()
+    if pooled:
+        fetched, failed = asyncio.run(fetch_pages(server.sources(), concurrency=concurrency, pool=pool))
+    else:
+        # One page at a time on a new connection each, as urllib.request.urlopen does
+        fetched, failed = {}, {}
+        for team, urls in server.sources().items():
+            fetched[team] = {}
+            for page in PAGES:
+                fetched[team][page] = fetch_page(pool, None, urls[page])
+                pool.close()
+    elapsed = time.perf_counter() - start
+    pool.close()
+    if failed:
+        raise SystemExit(f"Fetch failed: {failed}")
+    return elapsed, server.counts["connections"], fetched
+
+
+def _check(fetched, teams, players):
+    for team, (basic, additional) in synthetic_league(teams, players).items():
+        expected = merge_additional_data(parse_baseball_data(basic), parse_additional_data(additional))
+        if not parse_team_pages(fetched[team]).equals(expected):
+            raise SystemExit(f"Parsed pages of {team} differ from its fixture")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, nargs="+", default=[9, 36])
+    parser.add_argument("--players", type=int, default=18)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'teams':>6}{'mode':>22}{'time (s)':>10}{'connections':>13}{'speedup':>9}")
+    for teams in args.teams:
+        with StubServer(fixture_pages(teams, args.players), latency=args.latency) as server:
+            runs = [
+                ("sequential, no pool", *_fetch(server, 1, pooled=False)),
+                ("sequential", *_fetch(server, 1)),
+                (f"concurrent x{args.concurrency}", *_fetch(server, args.concurrency)),
+            ]
+            _check(runs[-1][3], teams, args.players)
+
+            # A second run over a warm cache: every page is a 304 and every team is skipped
+            directory = tempfile.mkdtemp()
+            try:
+                raw = os.path.join(directory, "raw")
+                fetch_league(server.sources(), raw, concurrency=args.concurrency)
+                server.reset_counts()
+                start = time.perf_counter()
+                result = fetch_league(server.sources(), raw, concurrency=args.concurrency)
+                runs.append(("concurrent, all 304", time.perf_counter() - start, server.counts["connections"], None))
+                if result["updated"] or server.counts["not_modified"] != 2 * teams:
+                    raise SystemExit("Warm refetch did not skip every team")
+            finally:
+                shutil.rmtree(directory)
+
+        baseline = runs[0][1]
+        for mode, elapsed, connections, _ in runs:
+            print(f"{teams:>6}{mode:>22}{elapsed:>10.3f}{connections:>13}{baseline / elapsed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Game-log windows (gamelog.py): summing a window's game rows with a groupby
+against one subtraction of running totals, and adding a game against
+rebuilding the log.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_gamelog [--games 30 300 3000 --players 20]
+
+Times are per window or per added game, averaged over --repeat runs; the
+appends include the occasional doubling of the running totals' capacity.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.gamelog import COUNTING, GameLog
+
+
+def _game_log(games, players, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = games * players
+    df = pd.DataFrame({
+        "Date": np.repeat([f"{2000 + g // 365:04d}-{g % 365:03d}" for g in range(games)], players),
+        "Game": 1,
+        "Number": np.tile([str(p) for p in range(players)], games),
+        "Name": np.tile([f"Player {p}" for p in range(players)], games),
+    })
+    for column in COUNTING[1:]:
+        df[column] = rng.poisson(1.0, rows)
+    return df
+
+
+def _per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, nargs="+", default=[30, 300, 3000])
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'games':>7}{'groupby (ms)':>14}{'prefix (ms)':>13}{'rebuild (ms)':>14}{'append (ms)':>13}")
+    for games in args.games:
+        df = _game_log(games, args.players)
+        log = GameLog.from_frame(df)
+        first = log.games[-args.window][0]
+
+        groupby = _per_call(lambda: df[df["Date"] >= first].groupby(["Number", "Name"])[COUNTING[1:]].sum(),
+                            args.repeat)
+        prefix = _per_call(lambda: log.totals(*log.window(last=args.window)), args.repeat)
+        rebuild = _per_call(lambda: GameLog.from_frame(df), max(1, args.repeat // 10))
+
+        # The last --repeat games appended one by one to a log of the rest
+        dates = log.games[-args.repeat:]
+        tail = [df[df["Date"] == date] for date, _ in dates]
+        base = GameLog.from_frame(df[df["Date"] < dates[0][0]])
+        start = time.perf_counter()
+        for (date, game), rows in zip(dates, tail):
+            base.append(date, game, rows)
+        append = (time.perf_counter() - start) / len(dates)
+        print(f"{games:>7}{groupby * 1e3:>14.3f}{prefix * 1e3:>13.3f}{rebuild * 1e3:>14.3f}{append * 1e3:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
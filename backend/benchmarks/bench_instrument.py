@@ -0,0 +1,78 @@
+"""
+Cost of the instrumentation hooks (instrument.py), switched off and on.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_instrument [--calls 1000000 --rows 100000]
+
+The first table times an empty instrumented stage. The second times the
+batch ingest of a synthetic league with instrumentation off and in each mode;
+the JSON lines and summary go to os.devnull.
+"""
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+
+from backend import instrument
+from backend.batch_ingest import ingest_league
+from .bench_batch_ingest import write_league
+
+TEAMS = 20
+
+
+def _empty_stages(calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        with instrument.stage("empty") as record:
+            record.add(rows=1)
+    return time.perf_counter() - start
+
+
+def _best(func, repeat):
+    return min(func() for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    modes = [None] + list(instrument.MODES)
+    print(f"{'mode':<10}{'ns per empty stage':>20}")
+    for mode in modes:
+        instrument.configure(mode, output=os.devnull)
+        seconds = _best(lambda: _empty_stages(args.calls), args.repeat)
+        print(f"{mode or 'off':<10}{seconds / args.calls * 1e9:>20.0f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        raw_directory = os.path.join(directory, "raw")
+        output_directory = os.path.join(directory, "out")
+        os.makedirs(raw_directory)
+        write_league(raw_directory, TEAMS, args.rows // TEAMS)
+
+        def run():
+            with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+                start = time.perf_counter()
+                ingest_league(raw_directory, output_directory, workers=1)
+                return time.perf_counter() - start
+
+        # Warm up the page cache and imports before the first timed mode
+        instrument.configure(None)
+        run()
+
+        print(f"\n{'mode':<10}{'ingest (s)':>12}{'overhead':>10}")
+        baseline = None
+        for mode in modes:
+            instrument.configure(mode, output=os.devnull)
+            seconds = _best(run, args.repeat)
+            baseline = baseline or seconds
+            print(f"{mode or 'off':<10}{seconds:>12.3f}{(seconds / baseline - 1) * 100:>9.1f}%")
+    instrument.configure(None)
+
+
+if __name__ == "__main__":
+    main()
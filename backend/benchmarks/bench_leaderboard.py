@@ -0,0 +1,73 @@
+"""
+Micro-benchmark for LeaderboardIndex against sorting the league table on every
+top-N / percentile question.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_leaderboard [--players 100000 --queries 1000]
+
+Queries use the qualifying PA threshold, whose views the index keeps. Any
+other --min-pa is filtered and sorted per query, like a full sort.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from backend import metrics
+from backend.leaderboard import LeaderboardIndex, qualifying_pa
+from backend.wOBA import mlb_woba_weights
+from .bench_metrics import synthetic_players
+
+STAT = 'wOBA'
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--min-pa", type=float, help="PA threshold (default: the qualifying PA)")
+    args = parser.parse_args()
+
+    df = synthetic_players(args.players)
+    # A 17-game season, so qualifying takes 41 PA
+    df['Games'] = 17
+    if args.min_pa is None:
+        args.min_pa = qualifying_pa(df)
+    df[STAT] = metrics.woba_column(df, mlb_woba_weights)
+    values = np.random.default_rng(1).choice(df[STAT].to_numpy(), args.queries)
+
+    def full_sort():
+        results = []
+        for value in values:
+            qualified = df[df['PA'] >= args.min_pa]
+            leaders = qualified.sort_values(STAT, ascending=False, kind="stable").head(args.top)
+            percentile = 100.0 * (qualified[STAT] <= value).sum() / len(qualified)
+            results.append((leaders[STAT].tolist(), percentile))
+        return results
+
+    def indexed():
+        index = LeaderboardIndex(df)
+        return [
+            (index.top(STAT, args.top, min_pa=args.min_pa)[STAT].tolist(),
+             index.percentile(STAT, value, min_pa=args.min_pa))
+            for value in values
+        ]
+
+    sort_time, expected = _timed(full_sort)
+    index_time, results = _timed(indexed)
+    assert results == expected
+    print(f"{args.players} players, {args.queries} top-{args.top} + percentile queries (min PA {args.min_pa:g})")
+    print(f"  sort per query: {sort_time:.3f}s")
+    print(f"  index (incl. build): {index_time:.3f}s ({sort_time / index_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Lineup simulator (lineup.py): scoring lineups one at a time against one
+batched call, and the two searches for the best order.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_lineup [--lineups 5040 --roster 14 --workers 4]
+
+'exhaustive' scores all 9! orders of the best nine found by hill climbing and
+is skipped with --skip-exhaustive.
+"""
+import argparse
+import itertools
+import os
+import time
+
+import numpy as np
+
+from backend.fast_parse import parse_additional_data_fast, parse_baseball_data_fast
+from backend.lineup import event_rates, expected_runs, search_lineups
+from backend.parse_baseball_data import merge_additional_data
+from backend.synthetic import synthetic_league
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lineups", type=int, default=5040)
+    parser.add_argument("--roster", type=int, default=14)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--skip-exhaustive", action="store_true")
+    args = parser.parse_args()
+
+    (basic, additional), = synthetic_league(1, args.roster).values()
+    rates = event_rates(merge_additional_data(parse_baseball_data_fast(basic), parse_additional_data_fast(additional)))
+    lineups = np.array(list(itertools.islice(itertools.permutations(range(9)), args.lineups)))
+
+    one_at_a_time, _ = _timed(lambda: [expected_runs(rates, lineup[None]) for lineup in lineups])
+    batched, _ = _timed(lambda: expected_runs(rates, lineups))
+    print(f"{len(lineups)} lineups: one at a time {one_at_a_time:.2f}s, batched {batched:.2f}s "
+          f"({len(lineups) / batched:,.0f} lineups/s)")
+
+    for workers in sorted({1, args.workers}):
+        seconds, found = _timed(lambda: search_lineups(rates, workers=workers))
+        print(f"hill climbing, {args.roster} players, {workers} workers: {seconds:.2f}s, "
+              f"best {found[0][1]:.3f} runs")
+    if not args.skip_exhaustive:
+        best = found[0][0]
+        seconds, exact = _timed(lambda: search_lineups(rates, players=best, exhaustive=True, workers=args.workers))
+        print(f"exhaustive, 9! orders, {args.workers} workers: {seconds:.2f}s, best {exact[0][1]:.3f} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Key-indexed alignment of the basic and additional pastes (player_keys.py)
+against the outer merge on Number, Name and Games it replaces.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_merge [--rows 10000 100000 1000000]
+
+On clean pastes both give the same rows (the merge sorts them by its keys).
+On pastes where a few names are formatted differently, the outer merge grows
+half-empty rows while the alignment keeps one row per player.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from backend.fast_parse import parse_additional_data_fast, parse_baseball_data_fast
+from backend.player_keys import KEY_COLUMNS, align_additional
+from backend.synthetic import synthetic_pastes
+
+# Share of additional rows whose name is reformatted in the messy run
+MESSY_SHARE = 0.01
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def _pastes(rows):
+    basic, additional = synthetic_pastes(rows)
+    return parse_baseball_data_fast(basic), parse_additional_data_fast(additional)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'outer merge (s)':>17}{'aligned (s)':>13}{'speedup':>9}"
+          f"{'messy: merge rows':>19}{'aligned rows':>14}{'reported':>10}")
+    for rows in args.rows:
+        basic, additional = _pastes(rows)
+
+        merge_time, expected = _timed(lambda: pd.merge(basic, additional, on=KEY_COLUMNS, how='outer'))
+        align_time, (merged, report) = _timed(lambda: align_additional(basic, additional))
+        assert report.clean
+        # The outer merge sorts by its keys; the alignment keeps the paste order
+        assert_frame_equal(merged.sort_values(KEY_COLUMNS, kind="stable").reset_index(drop=True), expected)
+
+        # Reformat a few names in the second paste: 'A. Winsor7(Sr)' -> 'a. winsor7 (Sr)'
+        messy = additional.copy()
+        rng = np.random.default_rng(0)
+        changed = rng.choice(rows, int(rows * MESSY_SHARE), replace=False)
+        messy.loc[changed, 'Name'] = messy.loc[changed, 'Name'].str.lower().str.replace("(", " (")
+        messy_merge = pd.merge(basic, messy, on=KEY_COLUMNS, how='outer')
+        messy_aligned, messy_report = align_additional(basic, messy)
+        assert len(messy_aligned) == rows and messy_report.clean
+        messy_aligned_stats = messy_aligned.drop(columns=['Name'])
+        assert_frame_equal(messy_aligned_stats, merged.drop(columns=['Name']))
+
+        # Drop a few additional rows entirely; these are reported, not merged
+        missing = additional.drop(index=changed)
+        _, missing_report = align_additional(basic, missing)
+
+        print(f"{rows:>10}{merge_time:>17.4f}{align_time:>13.4f}{merge_time / align_time:>8.1f}x"
+              f"{len(messy_merge):>19}{len(messy_aligned):>14}{len(missing_report.missing_additional):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark for the vectorized wOBA/wRAA kernels in metrics.py against
+the row-wise DataFrame.apply versions in wOBA.py.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_metrics [--players 1000 100000 1000000]
+
+The row-wise baseline is slow (tens of seconds at 1M players); pass
+--max-apply-rows to skip it above a size.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend import metrics
+from backend.wOBA import calculate_woba, calculate_wraa, mlb_woba_weights, woba_scale
+
+LEAGUE_WOBA = 0.3335
+
+
+# Function to build a player table with the columns wOBA and wRAA need
+def synthetic_players(players, seed=0):
+    rng = np.random.default_rng(seed)
+    ab = rng.integers(0, 80, players)
+    hits = rng.binomial(ab, 0.28)
+    doubles = rng.binomial(hits, 0.18)
+    triples = rng.binomial(hits - doubles, 0.02)
+    hr = rng.binomial(hits - doubles - triples, 0.02)
+    bb = rng.poisson(3, players)
+    hbp = rng.poisson(1, players)
+    sf = rng.poisson(0.3, players)
+    return pd.DataFrame({
+        'Name': [f"Player {i}" for i in range(players)],
+        'PA': ab + bb + hbp + sf, 'AB': ab, 'Hits': hits, 'Doubles': doubles,
+        'Triples': triples, 'HR': hr, 'BB': bb, 'HBP': hbp, 'SF': sf,
+    })
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--max-apply-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{'players':>10}{'apply (s)':>12}{'vectorized (s)':>16}{'speedup':>10}")
+    for players in args.players:
+        df = synthetic_players(players)
+
+        def vectorized():
+            woba = metrics.woba_column(df, mlb_woba_weights)
+            wraa = metrics.wraa(woba, df['PA'], LEAGUE_WOBA, woba_scale)
+            return woba.to_numpy(), wraa
+
+        vector_time, (woba, wraa) = _timed(vectorized)
+
+        if players > args.max_apply_rows:
+            print(f"{players:>10}{'skipped':>12}{vector_time:>16.4f}{'':>10}")
+            continue
+
+        def row_wise():
+            rows = df.copy()
+            rows['wOBA'] = rows.apply(calculate_woba, axis=1, weights=mlb_woba_weights)
+            rows['wRAA'] = rows.apply(calculate_wraa, axis=1, league_woba=LEAGUE_WOBA, woba_scale=woba_scale)
+            return rows['wOBA'].to_numpy(), rows['wRAA'].to_numpy()
+
+        apply_time, (expected_woba, expected_wraa) = _timed(row_wise)
+        np.testing.assert_array_equal(woba, expected_woba)
+        np.testing.assert_array_equal(wraa, expected_wraa)
+        print(f"{players:>10}{apply_time:>12.4f}{vector_time:>16.4f}{apply_time / vector_time:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Compare the row-by-row parsers in parse_baseball_data.py with the regex plus
+read_csv engine in fast_parse.py on synthetic pastes. Expect about 1.2-2x.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_parse [--rows 10000 100000]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from backend.fast_parse import parse_additional_data_fast, parse_baseball_data_fast
+from backend.parse_baseball_data import parse_additional_data, parse_baseball_data
+from backend.synthetic import synthetic_pastes
+
+
+def _time(func, raw_data, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(raw_data)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [
+        ("basic", parse_baseball_data, parse_baseball_data_fast),
+        ("additional", parse_additional_data, parse_additional_data_fast),
+    ]
+
+    print(f"{'layout':<12}{'rows':>10}{'row parser (s)':>18}{'fast parser (s)':>18}{'speedup':>10}")
+    for rows in args.rows:
+        for (label, legacy, fast), raw_data in zip(cases, synthetic_pastes(rows)):
+            legacy_time, expected = _time(legacy, raw_data, args.repeat)
+            fast_time, actual = _time(fast, raw_data, args.repeat)
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+            print(f"{label:<12}{rows:>10}{legacy_time:>18.4f}{fast_time:>18.4f}{legacy_time / fast_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Memory of a league table held as a DataFrame (as parsed and merged today)
+against the same rows packed into PlayerRecords.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_records [--rows 1000000 --teams 2000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from backend import metrics
+from backend.fast_parse import parse_additional_data_fast, parse_baseball_data_fast
+from backend.parse_baseball_data import merge_additional_data
+from backend.player_records import PlayerRecords
+from backend.stats_store import TEAM_COLUMN
+from backend.synthetic import synthetic_pastes
+from backend.wOBA import mlb_woba_weights
+
+# Each synthetic player appears in this many consecutive rows (seasons)
+SEASONS_PER_PLAYER = 4
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--teams", type=int, default=2_000)
+    args = parser.parse_args()
+    if args.teams < SEASONS_PER_PLAYER:
+        parser.error(f"--teams must be at least {SEASONS_PER_PLAYER}, so a player's seasons are on different teams")
+
+    basic_paste, additional_paste = synthetic_pastes(args.rows)
+    basic = parse_baseball_data_fast(basic_paste)
+    additional = parse_additional_data_fast(additional_paste)
+    # Give each player a name shared by their seasons, and put each season on a different team, so
+    # team, number and name match the rows one to one in the merge
+    names = 'Player ' + pd.Series(np.arange(args.rows) // SEASONS_PER_PLAYER).astype(str) + '(Sr)'
+    teams = [f"Team{i % args.teams:05d}" for i in range(args.rows)]
+    for frame in (basic, additional):
+        frame['Name'] = names
+        frame.insert(0, TEAM_COLUMN, teams)
+    df = merge_additional_data(basic, additional)
+    assert len(df) == len(basic) == args.rows, f"merge kept {len(df)} of {args.rows} rows"
+
+    encode_time, records = _timed(lambda: PlayerRecords.from_frame(df))
+    decode_time, decoded = _timed(records.to_frame)
+    assert_frame_equal(decoded, df)
+
+    frame_bytes = df.memory_usage(deep=True).sum()
+    print(f"{len(df)} player-seasons, {df['Name'].nunique()} players, {len(df.columns)} columns, "
+          f"{args.teams} teams")
+    print(f"  DataFrame:     {frame_bytes / 2**20:8.1f} MiB")
+    print(f"  PlayerRecords: {records.nbytes / 2**20:8.1f} MiB ({frame_bytes / records.nbytes:.1f}x smaller)")
+    print(f"  encode {encode_time:.2f}s, decode {decode_time:.2f}s")
+
+    storage = {}
+    for column in records.columns:
+        kind = "codes" if column in records.categories else (
+            "float64" if records.scales[column] is None else str(records.data.dtype[column]))
+        storage.setdefault(kind, []).append(column)
+    for kind, columns in storage.items():
+        print(f"  {kind:>8}: {', '.join(columns)}")
+
+    frame_time, expected = _timed(lambda: metrics.woba_column(df, mlb_woba_weights).to_numpy())
+    records_time, woba = _timed(lambda: metrics.woba_column(records, mlb_woba_weights).to_numpy())
+    np.testing.assert_array_equal(woba, expected)
+    print(f"  wOBA kernel: DataFrame {frame_time:.3f}s, PlayerRecords {records_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
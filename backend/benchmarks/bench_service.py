@@ -0,0 +1,63 @@
+"""
+Local load test for stats_service.py: starts the service on a free port and
+hits the team, league and readCsv routes from concurrent clients.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_service [--requests 2000 --concurrency 16]
+"""
+import argparse
+import logging
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+from backend.stats_service import create_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output-directory", default="output_data")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    app = create_app(args.output_directory)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    teams = app.config["TABLE_CACHE"].teams()
+    if not teams:
+        sys.exit(f"No team stats found in '{args.output_directory}'.")
+    urls = [f"{base}/api/teams/{team}" for team in teams] + [f"{base}/api/league"] + [
+        f"{base}/api/readCsv?team={team}" for team in teams
+    ]
+
+    def fetch(i):
+        with urllib.request.urlopen(urls[i % len(urls)]) as response:
+            response.read()
+            return response.status
+
+    # Warm the cache so the timed run measures steady state
+    for i in range(len(urls)):
+        fetch(i)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        statuses = list(executor.map(fetch, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    failures = sum(status != 200 for status in statuses)
+    print(f"{args.requests} requests, {args.concurrency} clients: {elapsed:.2f}s, "
+          f"{args.requests / elapsed:.0f} req/s, {failures} failures")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Player similarity (similarity.py): one player's nearest neighbours from the
+index against a pandas scan, and all-pairs comps, at growing numbers of
+player-seasons.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_similarity [--rows 1000 10000 100000 -k 10]
+
+'pandas' standardizes the feature columns and sorts every row's distance per
+query, as a notebook would. All-pairs comps are skipped above --max-comps rows.
+"""
+import argparse
+import tempfile
+import time
+
+import pandas as pd
+
+from backend.fast_parse import parse_additional_data_fast, parse_baseball_data_fast
+from backend.derived import DerivedColumns
+from backend.league_totals import aggregate_league
+from backend.parse_baseball_data import merge_additional_data
+from backend.similarity import FEATURES, SimilarityIndex, feature_matrix
+from backend.stats_store import TEAM_COLUMN, CsvStore
+from backend.synthetic import synthetic_league
+
+
+def _player_seasons(rows, players=20):
+    frames = []
+    for team, (basic, additional) in synthetic_league(max(1, rows // players), players).items():
+        df = merge_additional_data(parse_baseball_data_fast(basic), parse_additional_data_fast(additional))
+        frames.append(df.assign(**{TEAM_COLUMN: team}))
+    df = pd.concat(frames, ignore_index=True).iloc[:rows]
+    names = ['OPS', 'OPS+', 'wOBA', 'wRAA']
+    with tempfile.TemporaryDirectory() as directory:
+        # Nothing is written to the store; the cache goes in the temp directory
+        derived = DerivedColumns(CsvStore(directory)).compute(df, names, aggregate_league(df))
+    return df.assign(**{name: derived[name] for name in names})
+
+
+def _pandas_query(df, row, k):
+    features = pd.DataFrame(feature_matrix(df, FEATURES), columns=FEATURES)
+    z = (features - features.mean()) / features.std(ddof=0)
+    distances = ((z - z.iloc[row]) ** 2).sum(axis=1).drop(index=row)
+    return distances.nsmallest(k)
+
+
+def _per_call(func, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        func(i)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--max-comps", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}{'build (ms)':>12}{'pandas (ms)':>13}{'index (ms)':>12}{'comps (s)':>11}")
+    for rows in args.rows:
+        df = _player_seasons(rows)
+        start = time.perf_counter()
+        index = SimilarityIndex(df)
+        build = time.perf_counter() - start
+
+        pandas = _per_call(lambda i: _pandas_query(df, i, args.k), max(1, args.repeat // 20))
+        index.nearest(0, args.k)
+        query = _per_call(lambda i: index.nearest(i % len(index), args.k), args.repeat)
+        comps = "-"
+        if len(index) <= args.max_comps:
+            start = time.perf_counter()
+            index.comps(args.k)
+            comps = f"{time.perf_counter() - start:.2f}"
+        print(f"{len(df):>8}{build * 1e3:>12.1f}{pandas * 1e3:>13.2f}{query * 1e3:>12.3f}{comps:>11}")
+
+
+if __name__ == "__main__":
+    main()
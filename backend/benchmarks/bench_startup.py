@@ -0,0 +1,74 @@
+"""
+Cold-import benchmark for the parsing and metrics API. Each import runs in a
+fresh interpreter; the time spent beyond importing numpy and pandas (which
+every module needs) must stay under the budget, and the plotting and web
+libraries must not be loaded.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_startup [--runs 5 --budget-ms 150]
+
+Exits non-zero if a module is over budget or loads a heavy dependency.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+BASELINE = "import numpy, pandas"
+MODULES = [
+    "backend",
+    "backend.fast_parse",
+    "backend.metrics",
+    "backend.league_totals",
+    "backend.parse_baseball_data",
+    "backend.wOBA",
+    "backend.recompute_league",
+]
+HEAVY_MODULES = ["matplotlib", "seaborn", "flask"]
+
+_PROBE = "import sys, json; {statement}; print(json.dumps([m for m in {heavy!r} if m in sys.modules]))"
+
+
+def _cold_import(statement, runs):
+    """
+    Best wall time over runs fresh interpreters, and the heavy modules loaded.
+    """
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        best = min(best, time.perf_counter() - start)
+    return best, json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    baseline, _ = _cold_import(BASELINE, args.runs)
+    print(f"{'baseline (' + BASELINE + ')':<40}{baseline * 1000:>10.0f} ms")
+    print(f"{'module':<40}{'import (ms)':>12}{'over baseline':>15}  heavy deps")
+
+    failures = 0
+    for module in MODULES:
+        elapsed, heavy = _cold_import(f"import {module}", args.runs)
+        overhead = (elapsed - baseline) * 1000
+        ok = overhead <= args.budget_ms and not heavy
+        failures += not ok
+        print(f"{module:<40}{elapsed * 1000:>12.0f}{overhead:>15.0f}  {', '.join(heavy) or '-'}"
+              f"{'' if ok else '  FAIL'}")
+
+    if failures:
+        sys.exit(f"{failures} module(s) over the {args.budget_ms:g} ms budget or loading heavy dependencies.")
+    print(f"All modules within {args.budget_ms:g} ms of the baseline.")
+
+
+if __name__ == "__main__":
+    main()
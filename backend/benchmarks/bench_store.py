@@ -0,0 +1,79 @@
+"""
+Round-trip benchmark for the stats_store backends: write a synthetic league,
+read it back in full, and read only OBP/SLG (the OPS+ step's projection).
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_store [--teams 30 --players 5000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from backend.fast_parse import parse_additional_data_fast, parse_baseball_data_fast
+from backend.parse_baseball_data import merge_additional_data
+from backend.stats_store import TEAM_COLUMN, open_store
+from backend.synthetic import synthetic_pastes
+
+
+# Function to build a merged league table with a Team column
+def synthetic_league(teams, players):
+    frames = []
+    for team in range(teams):
+        basic_paste, additional_paste = synthetic_pastes(players, seed=team)
+        basic = parse_baseball_data_fast(basic_paste)
+        additional = parse_additional_data_fast(additional_paste)
+        df = merge_additional_data(basic, additional)
+        df.insert(0, TEAM_COLUMN, f"Team{team:03d}")
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=30)
+    parser.add_argument("--players", type=int, default=5000, help="Rows per team")
+    args = parser.parse_args()
+
+    league = synthetic_league(args.teams, args.players)
+    print(f"{len(league)} rows x {league.shape[1]} columns")
+    print(f"{'backend':<10}{'write (s)':>12}{'read all (s)':>14}{'read OBP/SLG (s)':>18}{'size (MB)':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        locations = [
+            ("csv", os.path.join(tmp, "output_data")),
+            ("npy", os.path.join(tmp, "league.npystore")),
+            ("parquet", os.path.join(tmp, "league.parquet")),
+        ]
+        for label, location in locations:
+            store = open_store(location)
+            try:
+                write_time, _ = _timed(lambda: store.write(league))
+            except ImportError as e:
+                print(f"{label:<10}skipped ({e.__class__.__name__}: {e})".splitlines()[0])
+                continue
+            read_time, full = _timed(store.read)
+            projection_time, projected = _timed(lambda: store.read(columns=["OBP", "SLG"]))
+            assert len(full) == len(league) and list(projected.columns) == [TEAM_COLUMN, "OBP", "SLG"]
+            pd.testing.assert_series_equal(full["OBP"], league["OBP"], check_dtype=False)
+            size = _size(location) / 1e6
+            print(f"{label:<10}{write_time:>12.3f}{read_time:>14.3f}{projection_time:>18.3f}{size:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
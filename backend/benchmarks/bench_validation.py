@@ -0,0 +1,87 @@
+"""
+Parsing dirty pastes: the row-by-row parser, which prints an error for every
+row it cannot read, and the fast parser, which drops them, against
+validate_text, which quarantines those rows and the rows that fail the sanity
+checks without printing.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_validation [--rows 10000 100000 --dirty 0.05]
+
+The row parser's output goes to os.devnull, so its times are a lower bound;
+on a terminal each printed row costs more.
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.fast_parse import parse_baseball_data_fast
+from backend.parse_baseball_data import parse_baseball_data
+from backend.synthetic import synthetic_pastes
+from backend.validation import UNPARSEABLE, check_rows, validate_text
+
+
+# Function to spoil a share of the rows of a paste
+def dirty_basic(rows, share, seed=0):
+    """
+    Half of the spoiled rows get a stat the parser cannot read, the other half
+    more hits than at-bats.
+
+    Returns:
+    tuple: (raw paste, number of unreadable rows, number of impossible rows)
+    """
+    lines = synthetic_pastes(rows, seed)[0].split("\n")
+    rng = random.Random(seed)
+    spoiled = rng.sample(range(rows), int(rows * share))
+    unreadable = spoiled[:len(spoiled) // 2]
+    for i in unreadable:
+        parts = lines[i].split()
+        parts[-3] = "x"
+        lines[i] = " ".join(parts)
+    for i in spoiled[len(spoiled) // 2:]:
+        parts = lines[i].split()
+        # Hits is the 6th stat from the end; make it one more than AB
+        parts[-6] = str(int(parts[-8]) + 1)
+        lines[i] = " ".join(parts)
+    return "\n".join(lines), len(unreadable), len(spoiled) - len(unreadable)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dirty", type=float, default=0.05, help="Share of spoiled rows")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'spoiled':>9}{'row parser (s)':>16}{'fast parser (s)':>17}{'validated (s)':>15}"
+          f"{'speedup':>9}{'quarantined':>13}")
+    for rows in args.rows:
+        raw_data, unreadable, impossible = dirty_basic(rows, args.dirty)
+
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+            legacy_time, expected = _timed(lambda: parse_baseball_data(raw_data))
+            fast_time, _ = _timed(lambda: parse_baseball_data_fast(raw_data))
+        validate_time, (df, report) = _timed(lambda: validate_text(raw_data))
+
+        # The validated rows are the parser's rows minus the impossible ones
+        expected = expected[check_rows(expected) == ""].reset_index(drop=True)
+        pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+        assert report.counts == {UNPARSEABLE: unreadable, "Hits > AB": impossible}
+        assert np.all(np.diff(report.quarantine["Line"]) > 0)
+
+        print(f"{rows:>10}{unreadable + impossible:>9}{legacy_time:>16.4f}{fast_time:>17.4f}{validate_time:>15.4f}"
+              f"{legacy_time / validate_time:>8.1f}x{report.rejected:>13}")
+
+
+if __name__ == "__main__":
+    main()
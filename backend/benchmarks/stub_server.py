@@ -0,0 +1,201 @@
+"""
+A local HTTP server of fixture stat pages for fetch.py.
+
+Each synthetic team gets a basic and an additional page, rendered as an HTML
+table with a header and a totals row like a team stats site. Pages carry an
+ETag and a Last-Modified and answer conditional requests with 304 Not
+Modified. Connections are kept alive, and --latency delays every response to
+stand in for a remote site.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.stub_server [--teams 9 --players 18 --port 8000 --latency 0.05]
+
+It writes the matching sources file (default: stub_sources.json) for
+
+    python -m backend.fetch stub_sources.json raw_league/
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backend.synthetic import synthetic_league
+
+BASIC_HEADER = ["#", "Player", "GP", "AVG", "PA", "AB", "R", "H", "RBI", "2B", "3B", "HR", "GS"]
+ADDITIONAL_HEADER = ["#", "Player", "GP", "SF", "SH/B", "BB", "K", "HBP", "ROE", "FC", "LOB", "OBP", "SLG", "OPS"]
+
+
+def _cells(line):
+    # Number, name (up to the "(Year)" token) and the stat columns of a paste row
+    tokens = line.split()
+    end = next((i for i, token in enumerate(tokens[1:], 1) if token.endswith(")")), 1)
+    return [tokens[0], " ".join(tokens[1:end + 1])] + tokens[end + 1:]
+
+
+# Function to render a paste as a team stats page
+def render_page(team, paste, header):
+    rows = [_cells(line) for line in paste.splitlines() if line.strip()]
+    head = "".join(f"<th>{escape(cell)}</th>" for cell in header)
+    body = "\n".join("<tr>" + "".join(f"<td>{escape(cell)}</td>" for cell in row) + "</tr>" for row in rows)
+    totals = "<tr><td></td><td>Totals</td>" + "<td></td>" * (len(header) - 2) + "</tr>"
+    return (f"<!DOCTYPE html>\n<html><head><title>{escape(team)}</title></head><body>\n"
+            f"<h1>{escape(team)}</h1>\n<table>\n<thead><tr>{head}</tr></thead>\n<tbody>\n{body}\n{totals}\n"
+            f"</tbody>\n</table>\n</body></html>\n")
+
+
+# Function to build the fixture pages of a synthetic league
+def fixture_pages(teams=9, players=18, seed=0):
+    """
+    Returns:
+    dict: URL path to page HTML, two pages per team.
+    """
+    pages = {}
+    for team, (basic, additional) in synthetic_league(teams, players, seed).items():
+        pages[f"/{team}/basic"] = render_page(team, basic, BASIC_HEADER)
+        pages[f"/{team}/additional"] = render_page(team, additional, ADDITIONAL_HEADER)
+    return pages
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle on, a kept-alive
+    # connection stalls on the client's delayed ACK before every body
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def do_GET(self):
+        server = self.server
+        server.count("requests")
+        if server.latency:
+            time.sleep(server.latency)
+        page = server.pages.get(self.path)
+        if page is None:
+            self.send_error(404)
+            return
+        body, etag, modified = page
+        if self._not_modified(etag, modified):
+            server.count("not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(modified, usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_modified(self, etag, modified):
+        if "If-None-Match" in self.headers:
+            return etag in [tag.strip() for tag in self.headers["If-None-Match"].split(",")]
+        since = self.headers.get("If-Modified-Since")
+        if since:
+            try:
+                return modified <= parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Threaded keep-alive server of fixture pages, usable as a context manager
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, pages, host="127.0.0.1", port=0, latency=0.0):
+        """
+        Parameters:
+        pages (dict): URL path to page text (see fixture_pages).
+        port (int): Port to listen on; 0 picks a free one.
+        latency (float): Seconds to wait before every response.
+        """
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.pages = {}
+        self.counts = {"connections": 0, "requests": 0, "not_modified": 0}
+        self._lock = threading.Lock()
+        self._thread = None
+        for path, text in pages.items():
+            self.set_page(path, text)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def set_page(self, path, text):
+        """Serve text at path, with a new ETag and Last-Modified if it changed."""
+        body = text.encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        with self._lock:
+            current = self.pages.get(path)
+            if current is None or current[1] != etag:
+                self.pages[path] = (body, etag, int(time.time()))
+
+    def count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts = dict.fromkeys(self.counts, 0)
+
+    def sources(self):
+        """
+        Returns:
+        dict: Team name to its basic and additional URLs, for fetch.py.
+        """
+        teams = {}
+        for path in self.pages:
+            team, page = path.strip("/").split("/")
+            teams.setdefault(team, {})[page] = f"{self.url}{path}"
+        return teams
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self._thread.join()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=9)
+    parser.add_argument("--players", type=int, default=18)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--sources", default="stub_sources.json", help="Sources file to write for fetch.py")
+    args = parser.parse_args()
+
+    server = StubServer(fixture_pages(args.teams, args.players, args.seed), port=args.port, latency=args.latency)
+    with open(args.sources, "w", encoding="utf-8") as handle:
+        json.dump(server.sources(), handle, indent=2)
+    print(f"Serving {len(server.pages)} pages at {server.url} (sources in {args.sources}); Ctrl-C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
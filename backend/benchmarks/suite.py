@@ -0,0 +1,302 @@
+"""
+Benchmark suite over synthetic leagues (synthetic.py) at several scales.
+
+Each case times one stage of the pipeline: parsing, validation, merging,
+league aggregation, wOBA/wRAA and OPS+ through the derived-column registry
+(computed from a cold cache, and materialized into a copy of the store as
+recompute_league does), CSV reads and writes, and the batch ingest end to
+end. Results are saved as JSON per commit under
+backend/benchmarks/results/, so two commits can be compared.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.suite                      # small and medium
+    python -m backend.benchmarks.suite --scale large --case parse merge
+    python -m backend.benchmarks.suite --save               # results/<commit>.json
+    python -m backend.benchmarks.suite --compare HEAD~3     # against saved results
+
+--compare takes a commit (its saved results file) or a path to a results file.
+Cases more than --threshold slower than the saved run are reported as
+regressions, and the exit status is 1 if there are any.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from backend.batch_ingest import ingest_league
+from backend.derived import DerivedColumns
+from backend.fast_parse import parse_additional_data_fast, parse_baseball_data_fast
+from backend.league_totals import aggregate_league
+from backend.parse_baseball_data import merge_additional_data
+from backend.recompute_league import derived_columns
+from backend.stats_store import TEAM_COLUMN, CsvStore
+from backend.synthetic import synthetic_league, write_raw_league
+from backend.validation import validate_text
+
+RESULTS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Scale name to (teams, players per team)
+SCALES = {
+    "small": (9, 18),
+    "medium": (200, 20),
+    "large": (2000, 25),
+}
+DEFAULT_SCALES = ["small", "medium"]
+SEED = 0
+
+# A case slower than the saved run by more than this share is a regression
+DEFAULT_THRESHOLD = 0.10
+
+
+# Synthetic league and the intermediate tables the cases start from
+class LeagueData:
+    def __init__(self, teams, players, directory):
+        self.pastes = synthetic_league(teams, players, seed=SEED)
+        self.basic = {team: parse_baseball_data_fast(basic) for team, (basic, _) in self.pastes.items()}
+        self.additional = {
+            team: parse_additional_data_fast(additional) for team, (_, additional) in self.pastes.items()
+        }
+        self.merged = pd.concat(
+            [merge_additional_data(self.basic[team], self.additional[team]).assign(**{TEAM_COLUMN: team})
+             for team in self.pastes],
+            ignore_index=True,
+        )
+        self.merged.insert(0, TEAM_COLUMN, self.merged.pop(TEAM_COLUMN))
+        self.totals = aggregate_league(self.merged)
+        self.rows = len(self.merged)
+
+        self.directory = directory
+        self.raw_directory = os.path.join(directory, "raw")
+        write_raw_league(self.raw_directory, teams, players, seed=SEED)
+        self.store = CsvStore(os.path.join(directory, "store"))
+        self.store.write(self.merged)
+
+
+def _parse(data):
+    for basic, additional in data.pastes.values():
+        parse_baseball_data_fast(basic)
+        parse_additional_data_fast(additional)
+
+
+def _validate(data):
+    for basic, additional in data.pastes.values():
+        validate_text(basic, kind="basic")
+        validate_text(additional, kind="additional")
+
+
+def _merge(data):
+    for team in data.pastes:
+        merge_additional_data(data.basic[team], data.additional[team])
+
+
+def _woba(data, derived):
+    derived.compute(data.merged, ['wOBA', 'wRAA'], data.totals)
+
+
+def _ops_plus(data, derived):
+    derived.compute(data.merged, ['OPS', 'OPS+'], data.totals)
+
+
+def _materialize(data, store):
+    DerivedColumns(store).materialize(derived_columns(data.totals), totals=data.totals)
+
+
+def _write_csv(data, directory):
+    CsvStore(directory).write(data.merged)
+
+
+def _ingest(data, directory):
+    ingest_league(data.raw_directory, directory, workers=1)
+
+
+def _fresh_directory(data):
+    directory = os.path.join(data.directory, "scratch")
+    shutil.rmtree(directory, ignore_errors=True)
+    return directory
+
+
+def _cold_cache(data):
+    return DerivedColumns(data.store, cache_directory=_fresh_directory(data))
+
+
+def _store_copy(data):
+    directory = _fresh_directory(data)
+    shutil.copytree(data.store.directory, directory)
+    return CsvStore(directory)
+
+
+# Case name to (function, per-repeat setup or None). The setup runs untimed
+# before every repeat and its result is passed to the function.
+CASES = {
+    "parse": (_parse, None),
+    "validate": (_validate, None),
+    "merge": (_merge, None),
+    "aggregate": (lambda data: aggregate_league(data.merged), None),
+    "woba_wraa": (_woba, _cold_cache),
+    "ops_plus": (_ops_plus, _cold_cache),
+    "materialize": (_materialize, _store_copy),
+    "read_csv": (lambda data: data.store.read(), None),
+    "write_csv": (_write_csv, _fresh_directory),
+    "batch_ingest": (_ingest, _fresh_directory),
+}
+
+
+def _time_case(data, func, setup, repeat):
+    times = []
+    for _ in range(repeat + 1):
+        args = () if setup is None else (setup(data),)
+        start = time.perf_counter()
+        func(data, *args)
+        times.append(time.perf_counter() - start)
+    # The first run warms caches and is not counted
+    return times[1:]
+
+
+# Function to run the selected cases at the selected scales
+def run_suite(scales=DEFAULT_SCALES, cases=None, repeat=5, progress=None):
+    """
+    Returns:
+    dict: Scale to case to {"min", "median", "rows", "repeat"} (seconds).
+    """
+    cases = list(CASES) if cases is None else cases
+    results = {}
+    for scale in scales:
+        teams, players = SCALES[scale]
+        results[scale] = {}
+        with tempfile.TemporaryDirectory() as directory:
+            data = LeagueData(teams, players, directory)
+            for case in cases:
+                func, setup = CASES[case]
+                # Keep the pipeline's own progress messages out of the report
+                with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+                    times = _time_case(data, func, setup, repeat)
+                results[scale][case] = {
+                    "min": min(times), "median": statistics.median(times), "rows": data.rows, "repeat": repeat,
+                }
+                if progress is not None:
+                    progress(scale, case, results[scale][case])
+    return results
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+
+
+# Function to save results as results/<commit>.json
+def save_results(results, env, directory=RESULTS_DIRECTORY):
+    os.makedirs(directory, exist_ok=True)
+    name = (env["commit"] or "unknown") + ("-dirty" if env["dirty"] else "")
+    path = os.path.join(directory, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({"environment": env, "results": results}, handle, indent=2, sort_keys=True)
+    return path
+
+
+# Function to load saved results by path or commit
+def load_results(reference, directory=RESULTS_DIRECTORY):
+    if os.path.exists(reference):
+        path = reference
+    else:
+        commit = _git("rev-parse", reference) or reference
+        path = os.path.join(directory, f"{commit}.json")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No saved results for '{reference}' ({path}). Run with --save on that commit.")
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+# Function to compare two runs case by case
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Returns:
+    list: (scale, case, baseline min, current min, ratio, verdict) for every
+    case in both runs; verdict is 'regression', 'faster' or ''.
+    """
+    rows = []
+    for scale, cases in results.items():
+        for case, current in cases.items():
+            previous = baseline.get(scale, {}).get(case)
+            if previous is None:
+                continue
+            ratio = current["min"] / previous["min"]
+            verdict = "regression" if ratio > 1 + threshold else "faster" if ratio < 1 / (1 + threshold) else ""
+            rows.append((scale, case, previous["min"], current["min"], ratio, verdict))
+    return rows
+
+
+def _print_case(scale, case, result):
+    print(f"{scale:<8}{case:<14}{result['rows']:>9}{result['min']:>12.4f}{result['median']:>12.4f}"
+          f"{result['rows'] / result['min']:>14,.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", nargs="+", choices=list(SCALES), default=DEFAULT_SCALES)
+    parser.add_argument("--case", nargs="+", choices=list(CASES), help="Cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", action="store_true", help="Save the results under the current commit")
+    parser.add_argument("--compare", metavar="REF", help="Commit or results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown reported as a regression (default: 0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        try:
+            baseline = load_results(args.compare)
+        except FileNotFoundError as e:
+            parser.error(str(e))
+
+    env = environment()
+    print(f"commit {env['commit'] or 'unknown'}{' (dirty)' if env['dirty'] else ''}, "
+          f"Python {env['python']}, numpy {env['numpy']}, pandas {env['pandas']}, {env['cpus']} CPUs")
+    print(f"{'scale':<8}{'case':<14}{'rows':>9}{'min (s)':>12}{'median (s)':>12}{'rows/s':>14}")
+    results = run_suite(args.scale, args.case, args.repeat, progress=_print_case)
+
+    if args.save:
+        print(f"Saved {save_results(results, env)}")
+
+    if baseline is None:
+        return 0
+    rows = compare(results, baseline["results"], args.threshold)
+    print(f"\nAgainst {baseline['environment']['commit']} ({baseline['environment']['timestamp']}):")
+    print(f"{'scale':<8}{'case':<14}{'before (s)':>12}{'after (s)':>12}{'ratio':>8}")
+    for scale, case, before, after, ratio, verdict in rows:
+        print(f"{scale:<8}{case:<14}{before:>12.4f}{after:>12.4f}{ratio:>8.2f}  {verdict}")
+    regressions = [row for row in rows if row[-1] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Bootstrap confidence intervals for wOBA, OPS+ and BABIP.
+
+Each player's plate appearances are rebuilt from the counting stats as
+outcomes (1B, 2B, 3B, HR, BB, HBP, SF, SACB, K, other out) and resampled with
+replacement: one multinomial draw of the player's PA total per replicate. The
+statistics are recomputed for every replicate, and the interval is the
+percentile range of the replicates.
+
+All of a player's replicates are drawn in one NumPy call, which beats one
+batched (players, replicates) draw: the sampling costs the same and each
+player's replicates stay in cache while their statistics are computed.
+Chunks of players are sized to a memory budget and can run in a process pool.
+Every chunk has its own seed derived from the base seed, so the intervals do
+not depend on the number of workers.
+
+League constants (league OPS for OPS+, the wOBA weights) are held fixed: the
+intervals describe the player's own sampling noise.
+
+    python -m backend.bootstrap [--replicates 10000] [--level 0.95] [--workers 4]
+                                [-o confidence_intervals.csv]
+
+The table is printed unless -o names a file. Keep that file out of the store
+directory, which the stats service lists as team tables.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import atomic_io, instrument, metrics
+from .league_totals import aggregate_league
+from .stats_store import TEAM_COLUMN, open_store
+from .wOBA import mlb_woba_weights
+
+OUTCOMES = ["1B", "2B", "3B", "HR", "BB", "HBP", "SF", "SACB", "K", "Out"]
+_1B, _2B, _3B, _HR, _BB, _HBP, _SF, _SACB, _K, _OUT = range(len(OUTCOMES))
+
+STATS = ["wOBA", "OPS+", "BABIP"]
+INPUT_COLUMNS = ['Hits', 'Doubles', 'Triples', 'HR', 'AB', 'K', 'BB', 'HBP', 'SF', 'SACB']
+DEFAULT_REPLICATES = 10_000
+DEFAULT_LEVEL = 0.95
+# Bytes of replicate statistics held at once per chunk
+DEFAULT_MEMORY_BUDGET = 64 * 2**20
+
+
+# Function to rebuild each player's plate-appearance outcomes from the counting stats
+def outcome_counts(df):
+    """
+    Returns:
+    ndarray: (players, len(OUTCOMES)) int64 counts. Outs in play are
+    AB - Hits - K. Missing stats count as 0 and negative counts from
+    inconsistent rows are clipped to 0.
+    """
+    hits, doubles, triples, hr, ab, k, bb, hbp, sf, sacb = (
+        df[column].fillna(0).to_numpy(dtype=np.int64) for column in INPUT_COLUMNS
+    )
+    counts = np.column_stack([hits - doubles - triples - hr, doubles, triples, hr, bb, hbp, sf, sacb, k, ab - hits - k])
+    return np.maximum(counts, 0)
+
+
+def _ratio(numerator, denominator):
+    # Zero denominators give 0, as in metrics.woba and the BABIP column
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, 0.0)
+
+
+# Function to compute the statistics from outcome counts of any leading shape
+def outcome_stats(counts, league_ops, weights=mlb_woba_weights):
+    """
+    Parameters:
+    counts (ndarray): (..., len(OUTCOMES)) outcome counts.
+    league_ops (float): League OPS for OPS+.
+    weights (dict): wOBA weights keyed like wOBA.mlb_woba_weights.
+
+    Returns:
+    dict: Stat name to unrounded values of shape counts.shape[:-1].
+    """
+    # Every numerator and denominator is a weighted sum of the outcomes, so one
+    # matrix product over the last axis gives them all
+    times_on_base, chances, total_bases, ab, woba_sum, balls_in_play_hits, balls_in_play = np.moveaxis(
+        counts.astype(np.float64) @ _coefficients(weights), -1, 0)
+    obp = _ratio(times_on_base, chances)
+    slg = _ratio(total_bases, ab)
+    return {
+        "wOBA": _ratio(woba_sum, chances),
+        "OPS+": (obp + slg) / league_ops * 100 if league_ops else np.zeros(obp.shape),
+        "BABIP": _ratio(balls_in_play_hits, balls_in_play),
+    }
+
+
+def _coefficients(weights):
+    # Columns: times on base, OBP denominator, total bases, AB, wOBA numerator,
+    # BABIP numerator, BABIP denominator
+    hits = [_1B, _2B, _3B, _HR]
+    matrix = np.zeros((len(OUTCOMES), 7))
+    matrix[hits + [_BB, _HBP], 0] = 1
+    matrix[hits + [_K, _OUT, _BB, _HBP, _SF], 1] = 1
+    matrix[hits, 2] = [1, 2, 3, 4]
+    matrix[hits + [_K, _OUT], 3] = 1
+    for outcome, key in [(_BB, 'Walks'), (_HBP, 'Hit By Pitch'), (_1B, 'Singles'), (_2B, 'Doubles'),
+                         (_3B, 'Triples'), (_HR, 'Home Runs')]:
+        matrix[outcome, 4] = weights[key]
+    matrix[[_1B, _2B, _3B], 5] = 1
+    matrix[[_1B, _2B, _3B, _OUT, _SF], 6] = 1
+    return matrix
+
+
+# Function to bootstrap one chunk of players (runs in a worker process)
+def bootstrap_chunk(counts, replicates, quantiles, league_ops, weights, seed):
+    """
+    Returns:
+    dict: Stat name to (len(quantiles), players) array of quantiles.
+    """
+    rng = np.random.default_rng(seed)
+    totals = counts.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        probabilities = np.where(totals[:, None] > 0, counts / totals[:, None], 0.0)
+    # Players with no plate appearances draw nothing; give them a valid distribution
+    probabilities[totals == 0, _OUT] = 1.0
+
+    samples = {stat: np.empty((len(counts), replicates)) for stat in STATS}
+    with instrument.stage("bootstrap") as record:
+        for player, (total, player_probabilities) in enumerate(zip(totals, probabilities)):
+            # All of the player's replicates at once: shape (replicates, outcomes)
+            drawn = rng.multinomial(total, player_probabilities, size=replicates)
+            for stat, values in outcome_stats(drawn, league_ops, weights).items():
+                samples[stat][player] = values
+        record.add(rows=len(counts) * replicates)
+    return {stat: np.quantile(values, quantiles, axis=1) for stat, values in samples.items()}
+
+
+# Function to add bootstrap confidence intervals to a league table
+def bootstrap_intervals(df, replicates=DEFAULT_REPLICATES, level=DEFAULT_LEVEL, seed=0, workers=1,
+                        league_ops=None, weights=mlb_woba_weights, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Parameters:
+    df (DataFrame): Player rows with Hits, Doubles, Triples, HR, AB, K, BB,
+        HBP, SF and SACB.
+    replicates (int): Bootstrap replicates per player.
+    level (float): Confidence level, e.g. 0.95.
+    seed (int): Base seed; the same arguments always give the same intervals.
+    workers (int): Worker processes; 1 runs in this process, None uses all CPUs.
+    league_ops (float): League OPS for OPS+ (default: computed from df).
+    memory_budget (int): Bytes of replicate statistics held at once per chunk.
+
+    Returns:
+    DataFrame: Same index as df with <stat>, <stat>_lo and <stat>_hi for wOBA,
+    OPS+ and BABIP. Point estimates come from the observed counts, the same
+    source as the replicates, so they can differ from the table's OPS+
+    column. wOBA and BABIP are rounded to 3 places, OPS+ to an integer.
+    Players missing any input stat (no additional row) get NaN for every
+    stat and interval.
+    """
+    if replicates < 1:
+        raise ValueError("replicates must be at least 1")
+    if not 0 < level < 1:
+        raise ValueError("level must be between 0 and 1")
+    if league_ops is None:
+        league_ops = aggregate_league(df).ops
+
+    counts = outcome_counts(df)
+    alpha = (1 - level) / 2
+    quantiles = [alpha, 1 - alpha]
+
+    # Chunks depend only on the data and the budget, never on the worker count
+    bytes_per_player = replicates * len(STATS) * 8
+    chunk_players = max(1, min(len(counts), memory_budget // bytes_per_player)) if len(counts) else 1
+    chunks = [counts[start:start + chunk_players] for start in range(0, len(counts), chunk_players)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    arguments = [(chunk, replicates, quantiles, league_ops, weights, chunk_seed)
+                 for chunk, chunk_seed in zip(chunks, seeds)]
+
+    if workers == 1 or len(chunks) <= 1:
+        results = [bootstrap_chunk(*args) for args in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(bootstrap_chunk, *zip(*arguments)))
+
+    point = outcome_stats(counts, league_ops, weights)
+    # metrics.woba sums the terms in the wOBA column's order, so ties round the same way
+    point["wOBA"] = metrics.woba(*(counts[:, i] for i in [_BB, _HBP, _1B, _2B, _3B, _HR]),
+                                 counts[:, [_1B, _2B, _3B, _HR, _K, _OUT]].sum(axis=1), counts[:, _SF],
+                                 weights, decimals=None)
+    incomplete = df[INPUT_COLUMNS].isna().any(axis=1).to_numpy()
+    out = pd.DataFrame(index=df.index)
+    for stat in STATS:
+        bounds = np.concatenate([result[stat] for result in results], axis=1) if results else np.empty((2, 0))
+        if stat == "OPS+":
+            out[stat] = pd.array(np.where(incomplete, np.nan, np.round(point[stat]))).astype("Int64")
+            for column, values in zip([f"{stat}_lo", f"{stat}_hi"], np.round(bounds)):
+                out[column] = pd.array(np.where(incomplete, np.nan, values)).astype("Int64")
+        else:
+            out[stat] = np.where(incomplete, np.nan, metrics.round_like_python(point[stat], 3))
+            for column, values in zip([f"{stat}_lo", f"{stat}_hi"], metrics.round_like_python(bounds, 3)):
+                out[column] = np.where(incomplete, np.nan, values)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", default=os.environ.get("STATS_STORE", "output_data"))
+    parser.add_argument("-o", "--output", default="-", help="CSV to write (default: print)")
+    parser.add_argument("--replicates", type=int, default=DEFAULT_REPLICATES)
+    parser.add_argument("--level", type=float, default=DEFAULT_LEVEL)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Number of worker processes (default: number of CPUs)")
+    instrument.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument.configure_from_args(args)
+
+    df = open_store(args.store).read()
+    if df.empty:
+        parser.error(f"No team stats found in '{args.store}'.")
+    try:
+        intervals = bootstrap_intervals(df, args.replicates, args.level, args.seed, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+
+    table = pd.concat([df[[TEAM_COLUMN, 'Name', 'PA']], intervals], axis=1)
+    if args.output == "-":
+        table.to_csv(sys.stdout, index=False)
+    else:
+        with atomic_io.atomic_path(args.output) as path:
+            table.to_csv(path, index=False)
+        print(f"Wrote {args.level:.0%} intervals from {args.replicates} replicates for {len(table)} players "
+              f"to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Headless chart rendering for one or many leagues.
+
+A league is a directory of <Team>_stats.csv files. For each league the team
+charts from visualize_team_statistics (total runs, total home runs, average
+batting average) and the player distributions of wOBA, OPS+ and BABIP are
+written to <output>/<league>/<chart>.<format>. Leagues render in a process
+pool; each worker draws every chart on one reused Agg figure.
+
+A league whose input data, chart set and formats are unchanged since its last
+render (tracked by a hash in <output>/<league>/render.json) is skipped.
+
+    python -m backend.charts output_data other_league/ -o charts --format png svg --workers 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from .stats_store import TEAM_COLUMN, CsvStore
+
+# Bump when chart drawing changes so cached renders are redrawn
+CHART_VERSION = 1
+RENDER_MANIFEST = "render.json"
+DEFAULT_FORMATS = ("png",)
+
+# (file name, summary column, title, seaborn palette) for the per-team bar charts
+TEAM_CHARTS = [
+    ("total_runs", "Total Runs", "Total Runs by Team", "Blues_d"),
+    ("total_home_runs", "Total Home Runs", "Total Home Runs by Team", "Reds_d"),
+    ("average_batting_average", "Average Batting Average", "Average Batting Average by Team", "Greens_d"),
+]
+
+# (file name, player column, title) for the per-player histograms
+DISTRIBUTION_CHARTS = [
+    ("woba_distribution", "wOBA", "Player wOBA"),
+    ("ops_plus_distribution", "OPS+", "Player OPS+"),
+    ("babip_distribution", "BABIP", "Player BABIP"),
+]
+
+# Columns the charts read; only these feed the cache hash
+CHART_COLUMNS = [TEAM_COLUMN, 'R', 'HR', 'AVG'] + [column for _, column, _ in DISTRIBUTION_CHARTS]
+
+_figure = None
+
+
+# Function to build the per-team totals shown in the team charts
+def team_summary(df):
+    """
+    Parameters:
+    df (DataFrame): Players of a league with a Team column.
+
+    Returns:
+    DataFrame: One row per team with Total Runs, Total Home Runs and
+    Average Batting Average, in order of first appearance.
+    """
+    grouped = df.groupby(TEAM_COLUMN, sort=False)
+    return pd.DataFrame({
+        'Total Runs': grouped['R'].sum(),
+        'Total Home Runs': grouped['HR'].sum(),
+        'Average Batting Average': grouped['AVG'].mean(),
+    }).reset_index()
+
+
+# Function to hash the chart inputs of a league
+def league_hash(df, formats):
+    columns = [column for column in CHART_COLUMNS if column in df.columns]
+    digest = hashlib.sha256(f"{CHART_VERSION}|{','.join(formats)}|{','.join(columns)}".encode())
+    digest.update(pd.util.hash_pandas_object(df[columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _axes():
+    """
+    The Agg figure and axes shared by every chart drawn in this process.
+    """
+    global _figure
+    if _figure is None:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        sns.set_theme(style="whitegrid")
+        _figure = plt.figure(figsize=(10, 6))
+        _figure.add_subplot()
+    return _figure, _figure.axes[0]
+
+
+def draw_team_chart(ax, summary, column, title, palette):
+    import seaborn as sns
+
+    ax.bar(summary[TEAM_COLUMN], summary[column], color=sns.color_palette(palette, len(summary)))
+    ax.set_title(title)
+    ax.set_ylabel(column)
+    ax.set_xlabel('Team')
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+def draw_distribution_chart(ax, values, column, title):
+    import seaborn as sns
+
+    ax.hist(values, bins=20, color=sns.color_palette("Blues_d")[2])
+    ax.set_title(title)
+    ax.set_ylabel('Players')
+    ax.set_xlabel(column)
+    ax.tick_params(axis='x', labelrotation=0)
+
+
+def _save(figure, directory, name, formats):
+    paths = []
+    for image_format in formats:
+        path = os.path.join(directory, f"{name}.{image_format}")
+        figure.savefig(path, format=image_format)
+        paths.append(path)
+    return paths
+
+
+# Function to render every chart for one league directory
+def render_league(league_directory, output_directory="charts", formats=DEFAULT_FORMATS, force=False):
+    """
+    Parameters:
+    league_directory (str): Directory of <Team>_stats.csv files.
+    output_directory (str): Charts go to output_directory/<league name>/.
+    formats (tuple): Image formats understood by matplotlib, e.g. ('png', 'svg').
+    force (bool): Render even if the cached hash matches.
+
+    Returns:
+    tuple: (league name, list of chart paths, True if rendered, False if cached)
+    """
+    league = os.path.basename(os.path.normpath(league_directory))
+    directory = os.path.join(output_directory, league)
+    df = CsvStore(league_directory).read()
+    if df.empty:
+        raise ValueError(f"No team stats found in '{league_directory}'.")
+    digest = league_hash(df, formats)
+
+    manifest_path = os.path.join(directory, RENDER_MANIFEST)
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as handle:
+            manifest = json.load(handle)
+        if manifest.get("hash") == digest and all(os.path.exists(path) for path in manifest["files"]):
+            return league, manifest["files"], False
+
+    os.makedirs(directory, exist_ok=True)
+    figure, ax = _axes()
+    summary = team_summary(df)
+    files = []
+    for name, column, title, palette in TEAM_CHARTS:
+        ax.clear()
+        draw_team_chart(ax, summary, column, title, palette)
+        figure.tight_layout()
+        files += _save(figure, directory, name, formats)
+    for name, column, title in DISTRIBUTION_CHARTS:
+        if column not in df.columns:
+            continue
+        ax.clear()
+        draw_distribution_chart(ax, df[column].dropna(), column, title)
+        figure.tight_layout()
+        files += _save(figure, directory, name, formats)
+
+    with open(manifest_path, "w", encoding="utf-8") as handle:
+        json.dump({"hash": digest, "files": files}, handle, indent=2)
+    return league, files, True
+
+
+# Function to render many leagues, in parallel unless workers is 1
+def render_leagues(league_directories, output_directory="charts", formats=DEFAULT_FORMATS, workers=None,
+                   force=False):
+    """
+    Returns:
+    list: render_league results in input order; leagues that fail are reported
+    on stderr and left out.
+    """
+    if workers == 1:
+        results = [
+            _collect(directory, partial(render_league, directory, output_directory, formats, force))
+            for directory in league_directories
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(render_league, directory, output_directory, formats, force)
+                for directory in league_directories
+            ]
+            results = [_collect(directory, future.result) for future, directory in zip(futures, league_directories)]
+    return [result for result in results if result is not None]
+
+
+def _collect(directory, get_result):
+    try:
+        return get_result()
+    except (OSError, ValueError) as e:
+        print(f"Skipping '{directory}': {e}", file=sys.stderr)
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("leagues", nargs="+", help="League directories of <Team>_stats.csv files.")
+    parser.add_argument("-o", "--output-directory", default="charts")
+    parser.add_argument("--format", dest="formats", nargs="+", default=list(DEFAULT_FORMATS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true", help="Re-render leagues whose data is unchanged.")
+    args = parser.parse_args(argv)
+
+    results = render_leagues(args.leagues, args.output_directory, tuple(args.formats), args.workers, args.force)
+    for league, files, rendered in results:
+        print(f"{league}: {len(files)} charts {'rendered' if rendered else 'unchanged, skipped'}")
+
+
+if __name__ == "__main__":
+    main()
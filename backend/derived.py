@@ -0,0 +1,395 @@
+"""
+Registry and cache of the derived player columns.
+
+Each derived metric (1B, ISOP, BABIP, OPS, wOBA, wRAA, OPS+) declares the
+columns it reads, which may be other metrics, and the league constants it
+depends on. Values are cached per team under <store>/.derived/, keyed by a
+hash of the metric's input values, its formula version and the constants it
+uses. A metric is therefore recomputed only for teams whose inputs changed,
+or for every team when a constant it depends on moved. Nothing is written to
+the team tables until materialize() asks for it, and undoing a metric is
+dropping its cache entry; only team files it was materialized into are
+rewritten, and only with from_files.
+
+    derived = DerivedColumns(open_store("output_data"))
+    df = derived.compute(store.read(), ["wOBA", "wRAA"])   # Team + the columns, not written
+    derived.materialize(["OPS", "OPS+"])                     # write changed values to the store
+    derived.drop(["wOBA"], from_files=True)                  # forget and strip a column
+
+    python -m backend.derived --list
+    python -m backend.derived --materialize wOBA wRAA
+    python -m backend.derived --drop wOBA 1B --from-files
+"""
+import argparse
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from . import atomic_io, instrument, metrics
+from .league_totals import aggregate_league
+from .stats_store import TEAM_COLUMN, CsvStore, open_store
+from .wOBA import mlb_woba_weights, woba_scale
+
+CACHE_DIRECTORY = ".derived"
+INDEX_FILE = "index.json"
+
+
+@dataclass(frozen=True)
+class Metric:
+    """
+    name (str): Column name.
+    inputs (tuple): Columns the metric reads; derived columns are computed first.
+    constants (tuple): League constants it depends on (see league_constants).
+    compute: Function of (DataFrame with the inputs, constants dict) returning
+        one value per row.
+    dtype (str): dtype of the column.
+    version (int): Bump when the formula changes to invalidate cached values.
+    """
+    name: str
+    inputs: tuple
+    constants: tuple
+    compute: object
+    dtype: str = "float64"
+    version: int = 1
+
+
+def _isop(df, constants):
+    return (df['SLG'] - df['AVG']).round(3)
+
+
+def _babip(df, constants):
+    # BABIP = (H - HR) / (AB - K - HR + SF), zero when the denominator is zero
+    return ((df['Hits'] - df['HR']) / (df['AB'] - df['K'] - df['HR'] + df['SF'])).fillna(0).round(3)
+
+
+def _ops_plus(df, constants):
+    ops_plus = (df['OPS'] / constants['league_ops']) * 100
+    return ops_plus.fillna(0).replace([float('inf'), -float('inf')], 0).round().astype(int)
+
+
+def _woba(df, constants):
+    return metrics.woba(
+        df['BB'], df['HBP'], df['1B'], df['Doubles'], df['Triples'], df['HR'], df['AB'], df['SF'],
+        constants['woba_weights'],
+    )
+
+
+def _wraa(df, constants):
+    return metrics.wraa(df['wOBA'], df['PA'], constants['league_woba'], constants['woba_scale'])
+
+
+METRICS = {metric.name: metric for metric in [
+    Metric("1B", ("Hits", "Doubles", "Triples", "HR"), (),
+           lambda df, constants: metrics.singles(df['Hits'], df['Doubles'], df['Triples'], df['HR'])),
+    Metric("ISOP", ("SLG", "AVG"), (), _isop),
+    Metric("BABIP", ("Hits", "HR", "AB", "K", "SF"), (), _babip),
+    Metric("OPS", ("OBP", "SLG"), (), lambda df, constants: df['OBP'] + df['SLG']),
+    Metric("wOBA", ("BB", "HBP", "1B", "Doubles", "Triples", "HR", "AB", "SF"), ("woba_weights",), _woba),
+    Metric("wRAA", ("wOBA", "PA"), ("league_woba", "woba_scale"), _wraa),
+    Metric("OPS+", ("OPS",), ("league_ops",), _ops_plus, dtype="int64"),
+]}
+
+
+# Function to compute the league constants the metrics depend on
+def league_constants(totals):
+    return {
+        "league_ops": totals.ops,
+        "league_woba": totals.league_woba(mlb_woba_weights),
+        "woba_scale": woba_scale,
+        "woba_weights": mlb_woba_weights,
+    }
+
+
+def _digest(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=repr).encode()).hexdigest()
+
+
+# Function to hash the league constants, e.g. to tell whether a rebuild moved them
+def constants_version(constants, names=None):
+    names = sorted(constants) if names is None else sorted(names)
+    return _digest([(name, constants[name]) for name in names])[:16]
+
+
+# Function to list metrics with the derived metrics they read first
+def resolve(names=None):
+    """
+    Returns:
+    list: Metric objects in an order where every metric follows its inputs.
+
+    Raises:
+    ValueError: For an unknown metric name.
+    """
+    ordered = []
+
+    def visit(name):
+        if name not in METRICS:
+            raise ValueError(f"Unknown derived metric '{name}'. Expected one of: {', '.join(METRICS)}")
+        metric = METRICS[name]
+        if metric in ordered:
+            return
+        for column in metric.inputs:
+            if column in METRICS:
+                visit(column)
+        ordered.append(metric)
+
+    for name in METRICS if names is None else names:
+        visit(name)
+    return ordered
+
+
+def _filename(name):
+    return name.replace("+", "_plus") + ".npy"
+
+
+# Rows of a league table grouped by team
+class _Teams:
+    def __init__(self, teams):
+        codes, self.names = pd.factorize(teams)
+        # Row positions sorted by team (in order of first appearance), and each team's bounds in that order
+        self.order = np.argsort(codes, kind="stable")
+        self.bounds = np.searchsorted(codes[self.order], np.arange(len(self.names) + 1))
+
+    def __iter__(self):
+        bounds = self.bounds.tolist()
+        return zip(self.names, bounds[:-1], bounds[1:])
+
+    def rows(self, team_index):
+        return self.order[self.bounds[team_index]:self.bounds[team_index + 1]]
+
+
+def _ranges(starts, lengths):
+    # Concatenated np.arange(start, start + length) for each pair, without a Python loop
+    starts = np.asarray(starts, dtype=np.intp)
+    lengths = np.asarray(lengths, dtype=np.intp)
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(lengths.sum(), dtype=np.intp)
+
+
+def _changed(old, new):
+    old = pd.to_numeric(old, errors="coerce").to_numpy(dtype=np.float64)
+    new = np.asarray(new, dtype=np.float64)
+    # read_csv's default float parser can be an ulp off what to_csv wrote
+    return old.shape != new.shape or not np.allclose(old, new, rtol=1e-12, atol=0, equal_nan=True)
+
+
+# Derived columns of one store, computed through the cache
+class DerivedColumns:
+    """
+    The cache holds, per metric, one .npy of values for all cached teams and
+    an index.json entry per team: [key, offset, length] into that array.
+    """
+    def __init__(self, store, cache_directory=None):
+        self.store = store
+        if cache_directory is None:
+            base = store.directory if isinstance(store, CsvStore) else os.path.dirname(os.path.abspath(store.path))
+            cache_directory = os.path.join(base, CACHE_DIRECTORY)
+        self.cache_directory = cache_directory
+        self.hits = 0
+        self.misses = 0
+
+    def _index(self):
+        path = atomic_io.current_path(os.path.join(self.cache_directory, INDEX_FILE))
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def _values(self, name):
+        path = atomic_io.current_path(os.path.join(self.cache_directory, _filename(name)))
+        if not os.path.exists(path):
+            return np.empty(0)
+        return np.load(path, mmap_mode="r")
+
+    def _save_index(self, txn, index):
+        with open(txn.path(os.path.join(self.cache_directory, INDEX_FILE)), "w", encoding="utf-8") as handle:
+            json.dump(index, handle, sort_keys=True)
+
+    def _save(self, txn, name, entries, teams, keys, sorted_values, cached):
+        # This league's teams first, in sorted-row order, then cached teams it does not have
+        entries_out = {team: [keys[i], int(start), int(stop - start)] for i, (team, start, stop) in enumerate(teams)}
+        others = [(team, entry) for team, entry in entries.items() if team not in entries_out]
+        parts = [sorted_values]
+        offset = len(sorted_values)
+        for team, (key, start, length) in others:
+            parts.append(cached[start:start + length])
+            entries_out[team] = [key, offset, length]
+            offset += length
+        with open(txn.path(os.path.join(self.cache_directory, _filename(name))), "wb") as handle:
+            np.save(handle, np.concatenate(parts))
+        return entries_out
+
+    def compute(self, df, names=None, totals=None):
+        """
+        Parameters:
+        df (DataFrame): League table with a Team column and the raw stats.
+        names (list): Metrics to return (default: all); metrics they read are
+            computed too but not returned.
+        totals (LeagueTotals): Totals of df, if the caller already has them.
+
+        Returns:
+        DataFrame: Team column and one column per requested metric, in df's
+        row order.
+        """
+        names = list(METRICS) if names is None else list(names)
+        constants = league_constants(totals or aggregate_league(df))
+        teams = _Teams(df[TEAM_COLUMN].to_numpy())
+        work = df.copy()
+
+        with instrument.stage("derived") as record, atomic_io.transaction(self.cache_directory) as txn:
+            index = self._index()
+            updated = False
+            for metric in resolve(names):
+                # Key: formula, constants used, and the team's input values
+                prefix = _digest(metric.name, metric.version, [constants[c] for c in metric.constants]).encode()
+                inputs = np.column_stack([work[column].to_numpy(dtype=np.float64) for column in metric.inputs])
+                inputs = np.ascontiguousarray(inputs[teams.order])
+                keys = [hashlib.sha1(prefix + inputs[start:stop].tobytes()).hexdigest() for _, start, stop in teams]
+
+                entries = index.get(metric.name, {})
+                cached = self._values(metric.name) if entries else np.empty(0)
+                hits, missing = [], []
+                for i, (team, start, stop) in enumerate(teams):
+                    entry = entries.get(team)
+                    if entry is not None and entry[0] == keys[i] and entry[1] + entry[2] <= len(cached):
+                        hits.append((start, stop - start, entry[1]))
+                    else:
+                        missing.append((start, stop - start))
+                self.hits += len(hits)
+                self.misses += len(missing)
+
+                sorted_values = np.empty(len(work), dtype=np.float64)
+                if hits:
+                    starts, lengths, offsets = zip(*hits)
+                    sorted_values[_ranges(starts, lengths)] = cached[_ranges(offsets, lengths)]
+                if missing:
+                    # One vectorized call over the rows of every team that missed
+                    positions = _ranges(*zip(*missing))
+                    sorted_values[positions] = np.asarray(
+                        metric.compute(work.iloc[teams.order[positions]], constants), dtype=np.float64
+                    )
+                    index[metric.name] = self._save(txn, metric.name, entries, teams, keys, sorted_values, cached)
+                    updated = True
+
+                column = np.empty(len(work), dtype=np.float64)
+                column[teams.order] = sorted_values
+                work[metric.name] = column.astype(metric.dtype)
+            if updated:
+                self._save_index(txn, index)
+            record.add(rows=len(df))
+        return work[[TEAM_COLUMN] + names]
+
+    def materialize(self, names, df=None, totals=None):
+        """
+        Write metrics into the store's team tables, touching only the teams
+        whose stored values differ from the computed ones.
+
+        Parameters:
+        names (list): Metrics to write.
+        df (DataFrame): The store's current contents, if the caller already
+            read them inside its own store.transaction().
+        totals (LeagueTotals): Totals of df, if the caller already has them.
+
+        Returns:
+        list: Teams that were rewritten.
+        """
+        with self.store.transaction():
+            df = self.store.read() if df is None else df
+            if df.empty:
+                return []
+            derived = self.compute(df, names, totals)
+            teams = _Teams(df[TEAM_COLUMN].to_numpy())
+            changed = [
+                team for i, team in enumerate(teams.names)
+                if any(name not in df.columns or _changed(df[name].iloc[teams.rows(i)], derived[name].iloc[teams.rows(i)])
+                       for name in names)
+            ]
+            if changed:
+                # Only CsvStore rewrites per team; the other stores replace every row
+                if isinstance(self.store, CsvStore):
+                    derived = derived[derived[TEAM_COLUMN].isin(changed)]
+                self.store.update_columns(derived)
+        return changed
+
+    def drop(self, names, from_files=False):
+        """
+        Forget the cached values of metrics, and optionally remove the columns
+        from the store's team tables.
+
+        Returns:
+        dict: Team to the columns removed from its file (empty unless
+        from_files).
+        """
+        for name in names:
+            if name not in METRICS:
+                raise ValueError(f"Unknown derived metric '{name}'. Expected one of: {', '.join(METRICS)}")
+        with atomic_io.transaction(self.cache_directory) as txn:
+            index = self._index()
+            for name in names:
+                index.pop(name, None)
+                txn.remove(os.path.join(self.cache_directory, _filename(name)))
+            self._save_index(txn, index)
+        if not from_files or not isinstance(self.store, CsvStore):
+            return {}
+        return drop_columns(self.store, names)
+
+
+# Function to remove columns from every team table of a CSV store, in one commit
+def drop_columns(store, names):
+    """
+    Only files whose header has one of the columns are read in full and
+    rewritten.
+
+    Returns:
+    dict: Team to the columns removed from its file, for files that had any.
+    """
+    removed = {}
+    with store.transaction() as txn:
+        for team in store.teams():
+            path = store.path_for(team)
+            header = pd.read_csv(txn.current(path), nrows=0).columns
+            present = [name for name in names if name in header]
+            if present:
+                pd.read_csv(txn.current(path)).drop(columns=present).to_csv(txn.path(path), index=False)
+                removed[team] = present
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", default=os.environ.get("STATS_STORE", "output_data"))
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--list", action="store_true", help="List the metrics and what each depends on")
+    action.add_argument("--materialize", nargs="+", metavar="METRIC")
+    action.add_argument("--drop", nargs="+", metavar="METRIC")
+    parser.add_argument("--from-files", action="store_true", help="With --drop, also remove the columns")
+    instrument.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument.configure_from_args(args)
+
+    if args.list:
+        for metric in METRICS.values():
+            constants = f"; constants: {', '.join(metric.constants)}" if metric.constants else ""
+            print(f"{metric.name:<7}inputs: {', '.join(metric.inputs)}{constants}")
+        return 0
+
+    derived = DerivedColumns(open_store(args.store))
+    try:
+        if args.materialize:
+            teams = derived.materialize(args.materialize)
+            print(f"Cache hits {derived.hits}, misses {derived.misses}; "
+                  f"rewrote {len(teams)} teams: {', '.join(teams) or 'none'}")
+        else:
+            teams = derived.drop(args.drop, from_files=args.from_files)
+            print(f"Dropped {', '.join(args.drop)} from the cache"
+                  + (f" and {len(teams)} team files." if args.from_files else "."))
+    except ValueError as e:
+        parser.error(str(e))
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+
+# Column layouts for the two pasted stat tables. Each entry is (column, kind)
+# where kind is "int" for counting stats and "float" for rate stats.
+BASIC_LAYOUT = [
+    ("Games", "int"), ("AVG", "float"), ("PA", "int"), ("AB", "int"),
+    ("R", "int"), ("Hits", "int"), ("RBI", "int"), ("Doubles", "int"),
+    ("Triples", "int"), ("HR", "int"), ("GS", "int"),
+]
+
+ADDITIONAL_LAYOUT = [
+    ("Games", "int"), ("SF", "int"), ("SACB", "int"), ("BB", "int"),
+    ("K", "int"), ("HBP", "int"), ("ROE", "int"), ("FC", "int"),
+    ("LOB", "int"), ("OBP", "float"), ("SLG", "float"), ("OPS", "float"),
+]
+
+# Counting stats are stored as int32; rate stats stay float64 so that the
+# values (and everything rounded from them downstream) match the row parser.
+INT_DTYPE = np.int32
+FLOAT_DTYPE = np.float64
+
+# Number of input lines parsed per chunk by the streaming entry point
+DEFAULT_CHUNK_SIZE = 10_000
+
+_HSPACE = r"[^\S\n]"
+_INT_TOKEN = r"[+-]?[0-9]++"
+_FLOAT_TOKEN = r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+_QUIT_PATTERN = re.compile(r"^[Qq][Uu][Ii][Tt]$", re.MULTILINE)
+
+
+# Function to build the single-pass row pattern for a layout
+def _compile_row_pattern(layout):
+    """
+    Build one multiline regex that splits a well-formed row of the given layout
+    into (number, name, stat block), or otherwise captures the whole line in a
+    trailing fallback group. Running findall over the whole text therefore
+    yields one tuple per line, in order, without splitting rows in Python.
+    """
+    stats = (_HSPACE + "+").join(
+        _INT_TOKEN if kind == "int" else _FLOAT_TOKEN for _, kind in layout
+    )
+    strict = (
+        _HSPACE + r"*(\S++)" + _HSPACE + "+"
+        # Name tokens up to and including the first token ending with ")"
+        + r"((?:\S++(?<!\))" + _HSPACE + r"+)*+\S++(?<=\)))"
+        + _HSPACE + "+(" + stats + ")"
+        # Anything after the last expected stat is ignored, like the row parser
+        + r"(?:" + _HSPACE + r"[^\n]*)?"
+    )
+    return re.compile(r"^(?:" + strict + r"|([^\n]*))$", re.MULTILINE)
+
+
+_BASIC_PATTERN = _compile_row_pattern(BASIC_LAYOUT)
+_ADDITIONAL_PATTERN = _compile_row_pattern(ADDITIONAL_LAYOUT)
+
+
+def _dtypes(layout):
+    return {column: INT_DTYPE if kind == "int" else FLOAT_DTYPE for column, kind in layout}
+
+
+# Function to parse one row the same way the original per-row parsers do
+def _parse_row(row, layout):
+    parts = row.split()
+
+    # Remove trailing zeros past the expected number of tokens
+    while len(parts) > len(layout) + 3 and parts[-1] == '0':
+        parts.pop()
+
+    number = parts[0]
+    name_parts = []
+    for part in parts[1:]:
+        name_parts.append(part)
+        if part.endswith(")"):
+            break
+    name = ' '.join(name_parts)
+
+    remaining_parts = parts[len(name_parts) + 1:]
+    while len(remaining_parts) < len(layout):
+        remaining_parts.append('0')
+
+    values = [number, name]
+    for (column, kind), part in zip(layout, remaining_parts):
+        values.append(int(part) if kind == "int" else float(part))
+    return values
+
+
+def _parse_text(text, layout, pattern):
+    """
+    Parse stripped text without printing anything.
+
+    Returns:
+    tuple: (DataFrame, 0-based line of each row within text, list of
+    (line, row, error) for the non-blank rows that could not be parsed)
+    """
+    stat_columns = [column for column, _ in layout]
+    columns = ["Number", "Name"] + stat_columns
+
+    numbers, names, stats, fallback = zip(*pattern.findall(text))
+    strict_lines = np.fromiter(map(bool, stats), dtype=bool, count=len(stats))
+
+    if strict_lines.any():
+        # All stat blocks go through the C CSV tokenizer in one call; blank
+        # lines left by fallback rows are skipped by read_csv.
+        values = pd.read_csv(
+            io.StringIO("\n".join(stats)), sep=r"\s+", header=None, names=stat_columns,
+            dtype=_dtypes(layout), float_precision="round_trip",
+        )
+        if strict_lines.all():
+            keys = pd.DataFrame({"Number": numbers, "Name": names})
+        else:
+            keys = pd.DataFrame({
+                "Number": np.array(numbers, dtype=object)[strict_lines],
+                "Name": np.array(names, dtype=object)[strict_lines],
+            })
+        if "\t" in text or "  " in text or "\r" in text:
+            keys["Name"] = [' '.join(name.split()) for name in keys["Name"]]
+        df = pd.concat([keys, values], axis=1)
+    else:
+        df = pd.DataFrame(columns=columns).astype(_dtypes(layout))
+    lines = np.flatnonzero(strict_lines)
+
+    # Rows the strict pattern rejected (short rows, odd tokens, names without
+    # a closing parenthesis) go through the row parser so the result is the
+    # same as before, including which rows are dropped.
+    if not any(fallback):
+        return df, lines, []
+
+    parsed = []
+    positions = []
+    rejected = []
+    for line, row in enumerate(fallback):
+        if not row or row.isspace():
+            continue
+        try:
+            parsed.append(_parse_row(row, layout))
+            positions.append(line)
+        except ValueError as e:
+            rejected.append((line, row, str(e)))
+
+    if not parsed:
+        return df, lines, rejected
+
+    extra = pd.DataFrame(parsed, columns=columns).astype(_dtypes(layout))
+    lines = np.concatenate([lines, np.array(positions)])
+    order = np.argsort(lines, kind="stable")
+    combined = pd.concat([df, extra], ignore_index=True)
+    return combined.iloc[order].reset_index(drop=True), lines[order], rejected
+
+
+def _parse_block(raw_data, layout, pattern):
+    text = raw_data.strip()
+
+    # A literal "quit" line abandons the whole paste
+    if _QUIT_PATTERN.search(text):
+        print("Quitting data entry for this team.")
+        return pd.DataFrame()
+
+    with instrument.stage("parse") as record:
+        df, _, rejected = _parse_text(text, layout, pattern)
+        record.add(rows=len(df), bytes_read=len(text))
+    if rejected:
+        # One message per block rather than per row; validation.py keeps
+        # every rejected row with its line number
+        _, row, error = rejected[0]
+        more = f" ({len(rejected) - 1} more rows skipped)" if len(rejected) > 1 else ""
+        print(f"Error: Could not parse row: {row}. Error: {error}{more}")
+    return df
+
+
+# Function to parse initial raw baseball data (up to "HR" and "GS")
+def parse_baseball_data_fast(raw_data):
+    """
+    Drop-in for parse_baseball_data: one regex pass splits the rows, one
+    read_csv call converts every stat, and rows the pattern rejects go
+    through the row parser. Measured at 1.2-2x the speed of the row
+    parser on 10k-100k rows (benchmarks/bench_parse.py); the regex pass
+    takes most of the time.
+
+    Parameters:
+    raw_data (str): Pasted rows of the basic stat table.
+
+    Returns:
+    DataFrame: The same rows and values as parse_baseball_data, with counting
+    stats stored as int32.
+    """
+    return _parse_block(raw_data, BASIC_LAYOUT, _BASIC_PATTERN)
+
+
+# Function to parse additional data with OBP, SLG, OPS
+def parse_additional_data_fast(raw_data):
+    """
+    Drop-in for parse_additional_data: one regex pass splits the rows, one
+    read_csv call converts every stat, and rows the pattern rejects go
+    through the row parser. Measured at 1.2-2x the speed of the row
+    parser on 10k-100k rows (benchmarks/bench_parse.py); the regex pass
+    takes most of the time.
+
+    Parameters:
+    raw_data (str): Pasted rows of the additional stat table.
+
+    Returns:
+    DataFrame: The same rows and values as parse_additional_data, with
+    counting stats stored as int32.
+    """
+    return _parse_block(raw_data, ADDITIONAL_LAYOUT, _ADDITIONAL_PATTERN)
+
+
+_LAYOUTS = {
+    "basic": (BASIC_LAYOUT, _BASIC_PATTERN),
+    "additional": (ADDITIONAL_LAYOUT, _ADDITIONAL_PATTERN),
+}
+
+
+def _layout(kind):
+    if kind not in _LAYOUTS:
+        raise ValueError(f"Unknown layout '{kind}'. Expected one of: {', '.join(_LAYOUTS)}")
+    return _LAYOUTS[kind]
+
+
+# Function to parse a stream of lines into typed DataFrame chunks
+def iter_parse_chunks(lines, kind="basic", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Parse any iterable of lines (a file handle, sys.stdin, a generator) and
+    yield DataFrames of at most chunk_size rows, so memory stays bounded by the
+    chunk rather than the whole input.
+
+    Parameters:
+    lines (iterable of str): Raw rows, with or without trailing newlines.
+    kind (str): "basic" (up to HR and GS) or "additional" (SF through OPS).
+    chunk_size (int): Number of input lines parsed per chunk.
+
+    Yields:
+    DataFrame: Parsed rows with the same columns and dtypes as the fast
+    parsers. The index continues across chunks, so concatenating them gives
+    the same frame as parsing the whole input at once. A "quit" line stops
+    the stream and yields a final empty DataFrame with no columns, matching
+    what the parsers return for "quit".
+    """
+    layout, pattern = _layout(kind)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    offset = 0
+    buffer = []
+
+    def flush():
+        df = _parse_block("\n".join(buffer), layout, pattern)
+        buffer.clear()
+        df.index += offset
+        return df
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.lower() == "quit":
+            print("Quitting data entry for this team.")
+            yield pd.DataFrame()
+            return
+        buffer.append(line)
+        if len(buffer) >= chunk_size:
+            df = flush()
+            if not df.empty:
+                offset += len(df)
+                yield df
+
+    if buffer:
+        df = flush()
+        if not df.empty:
+            yield df
+
+
+# Function to parse a stream of lines into a single DataFrame
+def parse_lines(lines, kind="basic", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Collect iter_parse_chunks into one DataFrame. Returns an empty DataFrame
+    if the input contained a "quit" line, like the parsers do.
+    """
+    layout, _ = _layout(kind)
+    frames = []
+    for chunk in iter_parse_chunks(lines, kind, chunk_size):
+        if chunk.columns.empty:
+            return chunk
+        frames.append(chunk)
+    if not frames:
+        return pd.DataFrame(columns=["Number", "Name"] + [column for column, _ in layout]).astype(_dtypes(layout))
+    return pd.concat(frames)
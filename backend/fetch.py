@@ -0,0 +1,405 @@
+"""
+Fetch every team's basic and additional stat pages instead of pasting them.
+
+A sources file maps each team to the URLs of its two pages:
+
+    {"Branham": {"basic": "https://.../batting", "additional": "https://.../batting-extra"}, ...}
+
+Pages are fetched concurrently (--concurrency requests in flight) over a pool
+of keep-alive connections. Responses are cached under <raw>/.fetch_cache/ with
+their ETag and Last-Modified, and requested again with If-None-Match and
+If-Modified-Since, so a team whose pages answer 304 Not Modified is skipped.
+The stat rows are taken from the page's table (or used as-is for plain text),
+parsed with parse_baseball_data and parse_additional_data, and saved as raw
+<Team>.txt files in the batch_ingest layout. The raw files and the cache are
+each committed in one atomic_io transaction.
+
+    python -m backend.fetch sources.json raw_league/ [--concurrency 8] [--update output_data]
+
+--update brings the output directory up to date with incremental.update_league.
+backend/benchmarks/stub_server.py serves fixture pages to fetch from locally.
+"""
+import argparse
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from . import atomic_io, instrument
+from .batch_ingest import RAW_EXTENSION
+from .parse_baseball_data import merge_additional_data, parse_additional_data, parse_baseball_data
+
+PAGES = ["basic", "additional"]
+CACHE_DIRECTORY = ".fetch_cache"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 30.0
+USER_AGENT = "baseball-stats-fetch/1.0"
+
+
+class FetchError(Exception):
+    pass
+
+
+# Stat rows of an HTML page: the cells of each table row
+class _TableRows(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag == "td" and self._cell is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+# Function to turn a fetched page into the rows the parsers take
+def extract_rows(body, content_type=""):
+    """
+    Parameters:
+    body (str): Page text.
+    content_type (str): The response's Content-Type.
+
+    Returns:
+    str: One player per line, cells separated by spaces. For HTML, only
+    table rows whose first cell is a jersey number are kept, which drops
+    header and totals rows. Other pages are returned as they are.
+    """
+    if "html" not in content_type and not body.lstrip().startswith("<"):
+        return body.strip()
+    parser = _TableRows()
+    parser.feed(body)
+    parser.close()
+    return "\n".join(" ".join(row) for row in parser.rows if row and row[0].isdigit())
+
+
+# Keep-alive HTTP connections shared by the fetch threads, per host
+class ConnectionPool:
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, scheme, netloc):
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        with self._lock:
+            self.opened += 1
+        return connection_class(netloc, timeout=self.timeout)
+
+    def get(self, url, headers):
+        """
+        Returns:
+        tuple: (status, response headers, body bytes).
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise FetchError(f"Unsupported URL '{url}'.")
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        headers = {"User-Agent": USER_AGENT, **headers}
+
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            connection = idle.pop() if idle else None
+        reused = connection is not None
+        if connection is None:
+            connection = self._connect(*key)
+        try:
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+            except (http.client.HTTPException, ConnectionError):
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection; retry once on a new one
+                connection.close()
+                connection = self._connect(*key)
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+            body = response.read()
+        except (http.client.HTTPException, OSError) as e:
+            connection.close()
+            raise FetchError(f"GET {url} failed: {e}") from e
+        if response.will_close:
+            connection.close()
+        else:
+            with self._lock:
+                self._idle[key].append(connection)
+        return response.status, response.headers, body
+
+    def close(self):
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+# Cached responses (validators and extracted rows) of one cache directory
+class ResponseCache:
+    def __init__(self, directory):
+        self.directory = directory
+        self._pending = {}
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+    def get(self, url):
+        try:
+            with open(self._path(url), encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def put(self, url, entry):
+        self._pending[url] = entry
+
+    def save(self):
+        """
+        Write the entries put since the last save, in one transaction.
+        """
+        if not self._pending:
+            return
+        with atomic_io.transaction(self.directory) as txn:
+            for url, entry in self._pending.items():
+                with open(txn.path(self._path(url)), "w", encoding="utf-8") as handle:
+                    json.dump({"url": url, **entry}, handle)
+        self._pending.clear()
+
+
+@dataclass(frozen=True)
+class Page:
+    """
+    url (str): The page's URL.
+    text (str): Extracted stat rows (see extract_rows).
+    modified (bool): False when the server answered 304 Not Modified or
+        sent the cached rows again.
+    etag, last_modified (str): The response's validators, or None.
+    """
+    url: str
+    text: str
+    modified: bool
+    etag: str = None
+    last_modified: str = None
+
+    def cache_entry(self):
+        return {"etag": self.etag, "last_modified": self.last_modified, "text": self.text}
+
+
+# Function to fetch one page with a conditional GET (runs in a fetch thread)
+def fetch_page(pool, cache, url):
+    """
+    Raises:
+    FetchError: For a failed request or a status other than 200 and 304.
+    """
+    cached = cache.get(url) if cache is not None else None
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    status, response_headers, body = pool.get(url, headers)
+    if status == 304 and cached is not None:
+        return Page(url, cached["text"], False, cached.get("etag"), cached.get("last_modified"))
+    if status != 200:
+        raise FetchError(f"GET {url} returned HTTP {status}.")
+    content_type = response_headers.get("Content-Type", "")
+    charset = response_headers.get_content_charset() or "utf-8"
+    text = extract_rows(body.decode(charset, errors="replace"), content_type)
+    return Page(url, text, cached is None or cached["text"] != text, response_headers.get("ETag"),
+                response_headers.get("Last-Modified"))
+
+
+# Function to fetch every team's pages with at most `concurrency` requests in flight
+async def fetch_pages(sources, cache=None, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT, pool=None):
+    """
+    Parameters:
+    sources (dict): Team name to {"basic": url, "additional": url}.
+    cache (ResponseCache): Cached responses to send conditional GETs for,
+        or None. Only read; the caller decides which pages to cache.
+    concurrency (int): Most requests in flight at once (and pooled threads).
+    pool (ConnectionPool): Connections to use; default: a new pool, closed
+        at the end.
+
+    Returns:
+    tuple: (team name to {"basic": Page, "additional": Page} for the teams
+    whose pages were both fetched, team name to error message for the others).
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    own_pool = pool is None
+    pool = pool or ConnectionPool(timeout)
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        async def get(url):
+            async with semaphore:
+                return await loop.run_in_executor(executor, fetch_page, pool, cache, url)
+
+        async def team_pages(urls):
+            pages = await asyncio.gather(*(get(urls[page]) for page in PAGES))
+            return dict(zip(PAGES, pages))
+
+        try:
+            with instrument.stage("fetch") as record:
+                results = await asyncio.gather(*(team_pages(urls) for urls in sources.values()),
+                                               return_exceptions=True)
+                record.add(rows=2 * len(sources))
+        finally:
+            if own_pool:
+                pool.close()
+
+    fetched, failed = {}, {}
+    for team, result in zip(sources, results):
+        if isinstance(result, FetchError):
+            failed[team] = str(result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            fetched[team] = result
+    return fetched, failed
+
+
+# Function to parse a team's fetched pages into its merged table
+def parse_team_pages(pages):
+    """
+    Raises:
+    ValueError: If either page has no rows the parsers accept.
+    """
+    basic_df = parse_baseball_data(pages["basic"].text) if pages["basic"].text else None
+    if basic_df is None or basic_df.empty:
+        raise ValueError(f"No valid basic rows at {pages['basic'].url}.")
+    additional_df = parse_additional_data(pages["additional"].text) if pages["additional"].text else None
+    if additional_df is None or additional_df.empty:
+        raise ValueError(f"No valid additional rows at {pages['additional'].url}.")
+    return merge_additional_data(basic_df, additional_df)
+
+
+def raw_path(raw_directory, team):
+    return os.path.join(raw_directory, f"{team}{RAW_EXTENSION}")
+
+
+# Function to refresh the raw team files of a league from its sources
+def fetch_league(sources, raw_directory, cache_directory=None, concurrency=DEFAULT_CONCURRENCY,
+                 timeout=DEFAULT_TIMEOUT, force=False):
+    """
+    Parameters:
+    sources (dict): Team name to {"basic": url, "additional": url}.
+    raw_directory (str): Where the raw <Team>.txt files go.
+    cache_directory (str): Response cache (default: <raw_directory>/.fetch_cache).
+    force (bool): Fetch without conditional headers and rewrite every team.
+
+    Returns:
+    dict: Lists of team names under 'updated', 'unchanged' and 'failed',
+    and the error message per failed team under 'errors'.
+    """
+    if cache_directory is None:
+        cache_directory = os.path.join(raw_directory, CACHE_DIRECTORY)
+    cache = ResponseCache(cache_directory)
+    fetched, errors = asyncio.run(fetch_pages(sources, None if force else cache, concurrency, timeout))
+
+    updated, unchanged = [], []
+    with atomic_io.transaction(raw_directory) as txn:
+        for team, pages in fetched.items():
+            path = raw_path(raw_directory, team)
+            if not force and not any(page.modified for page in pages.values()) and os.path.exists(path):
+                unchanged.append(team)
+                continue
+            try:
+                parse_team_pages(pages)
+            except ValueError as e:
+                errors[team] = str(e)
+                continue
+            with open(txn.path(path), "w", encoding="utf-8") as handle:
+                handle.write(f"{pages['basic'].text}\ndone\n{pages['additional'].text}\ndone\n")
+            updated.append(team)
+            # Cached only once the raw file is written, so a failed team is fetched in full next time
+            for page in pages.values():
+                cache.put(page.url, page.cache_entry())
+    cache.save()
+    return {"updated": updated, "unchanged": unchanged, "failed": sorted(errors), "errors": errors}
+
+
+# Function to read a sources file
+def read_sources(path):
+    """
+    Raises:
+    ValueError: If a team does not have both page URLs.
+    """
+    with open(path, encoding="utf-8") as handle:
+        sources = json.load(handle)
+    for team, urls in sources.items():
+        if not isinstance(urls, dict) or any(not urls.get(page) for page in PAGES):
+            raise ValueError(f"Team '{team}' needs both 'basic' and 'additional' URLs.")
+    return sources
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", help="JSON file of team name to basic and additional page URLs")
+    parser.add_argument("raw_directory")
+    parser.add_argument("--teams", nargs="+", help="Only these teams")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--force", action="store_true", help="Ignore the cache and rewrite every team")
+    parser.add_argument("--update", metavar="OUTPUT_DIRECTORY",
+                        help="Then update this output directory with incremental.update_league")
+    instrument.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument.configure_from_args(args)
+
+    try:
+        sources = read_sources(args.sources)
+        if args.teams:
+            missing = sorted(set(args.teams) - set(sources))
+            if missing:
+                raise ValueError(f"Not in '{args.sources}': {', '.join(missing)}")
+            sources = {team: sources[team] for team in args.teams}
+        result = fetch_league(sources, args.raw_directory, concurrency=args.concurrency, timeout=args.timeout,
+                              force=args.force)
+    except (OSError, ValueError) as e:
+        sys.exit(str(e))
+
+    for team in result["failed"]:
+        print(f"Skipping '{team}': {result['errors'][team]}", file=sys.stderr)
+    print(f"Updated {len(result['updated'])} teams, {len(result['unchanged'])} unchanged, "
+          f"{len(result['failed'])} failed.")
+
+    if args.update:
+        from .incremental import update_league
+
+        changes = update_league(args.raw_directory, args.update)
+        print(f"Parsed {len(changes['parsed'])} teams, refreshed {len(changes['refreshed'])}, "
+              f"removed {len(changes['removed'])}.")
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
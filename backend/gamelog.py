@@ -0,0 +1,374 @@
+"""
+Per-game stats and windowed totals ("last 5 games", "since league play").
+
+A game log is a CSV with one row per player per game:
+
+    Date,Game,Number,Name,PA,AB,R,Hits,RBI,Doubles,Triples,HR,GS,SF,SACB,BB,K,HBP,ROE,FC,LOB
+
+Date sorts as text (use YYYY-MM-DD). Game tells apart the games of a
+doubleheader and defaults to 1; counting columns left out are 0.
+
+Each team's log is kept as running totals under <store>/.gamelogs/<Team>.npz:
+prefix[g] holds every player's counting stats summed over the team's first g
+games. The totals of any window of games are then one subtraction,
+prefix[stop] - prefix[start], for the whole roster at once, and adding a game
+adds one row to the running totals without recomputing the games before it
+(the .npz itself is rewritten on save). Rates are recomputed from the summed
+counts, so they can differ by 0.001 from pasted season rates that were
+truncated rather than rounded.
+Window stats come out with the same columns as <Team>_stats.csv; OPS+ and
+wRAA use the league constants of the store's season totals.
+
+    python -m backend.gamelog add Branham branham_games.csv
+    python -m backend.gamelog window Branham --last 5 [-o -]
+    python -m backend.gamelog window Branham --since 2024-03-15 [--until 2024-04-01]
+    python -m backend.gamelog rolling Branham wOBA --games 5
+"""
+import argparse
+import bisect
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from . import atomic_io, instrument, metrics
+from .derived import league_constants, resolve
+from .fast_parse import ADDITIONAL_LAYOUT, BASIC_LAYOUT
+from .league_totals import aggregate_league, read_league_totals
+from .stats_store import CsvStore, open_store
+
+CACHE_DIRECTORY = ".gamelogs"
+GAME_COLUMNS = ["Date", "Game"]
+KEY_COLUMNS = ["Number", "Name"]
+# Summed per window; Games counts the games a player appears in
+COUNTING = ['Games'] + [column for column, kind in BASIC_LAYOUT + ADDITIONAL_LAYOUT
+                        if kind == "int" and column != 'Games']
+# Columns of <Team>_stats.csv, in file order
+STATS_COLUMNS = (
+    KEY_COLUMNS + [column for column, _ in BASIC_LAYOUT]
+    + [column for column, _ in ADDITIONAL_LAYOUT if column != 'Games']
+    + ['ISOP', 'BABIP', 'OPS+', 'wOBA', 'wRAA']
+)
+DERIVED = ['ISOP', 'BABIP', 'OPS', 'wOBA', 'wRAA', 'OPS+']
+
+
+# Function to read and check a game-log CSV
+def read_game_log(path_or_buffer):
+    """
+    Returns:
+    DataFrame: Date, Game, Number, Name and the counting stats (without
+    Games) as int64, in file order.
+
+    Raises:
+    ValueError: For missing Date or Name columns, or counting stats that are
+    not non-negative integers.
+    """
+    df = pd.read_csv(path_or_buffer, dtype={"Date": str, "Number": str, "Name": str})
+    missing = [column for column in ["Date", "Name"] if column not in df.columns]
+    if missing:
+        raise ValueError(f"Game log is missing column(s): {', '.join(missing)}")
+    df["Date"] = df["Date"].str.strip()
+    df["Game"] = df["Game"].fillna(1).astype(np.int64) if "Game" in df.columns else 1
+    df["Number"] = df["Number"].fillna("").str.strip() if "Number" in df.columns else ""
+    for column in COUNTING[1:]:
+        values = pd.to_numeric(df[column], errors="coerce").fillna(0) if column in df.columns else 0
+        df[column] = values
+    counts = df[COUNTING[1:]].to_numpy(dtype=np.float64)
+    bad = (counts < 0) | (counts != np.floor(counts))
+    if bad.any():
+        row = int(np.flatnonzero(bad.any(axis=1))[0])
+        raise ValueError(f"Game log row {row + 2}: counting stats must be non-negative integers.")
+    df[COUNTING[1:]] = counts.astype(np.int64)
+    return df[GAME_COLUMNS + KEY_COLUMNS + COUNTING[1:]]
+
+
+# Function to compute the stats-file columns from summed counting stats
+def stats_frame(players, totals, constants):
+    """
+    Parameters:
+    players (list): (Number, Name) per row of totals.
+    totals (ndarray): (rows, len(COUNTING)) summed counting stats.
+    constants (dict): League constants from derived.league_constants.
+
+    Returns:
+    DataFrame: STATS_COLUMNS, one row per player.
+    """
+    df = pd.DataFrame(totals, columns=COUNTING)
+    df.insert(0, "Number", [number for number, _ in players])
+    df.insert(1, "Name", [name for _, name in players])
+    singles = metrics.singles(df['Hits'], df['Doubles'], df['Triples'], df['HR'])
+    total_bases = singles + 2 * df['Doubles'] + 3 * df['Triples'] + 4 * df['HR']
+    on_base_chances = df['AB'] + df['BB'] + df['HBP'] + df['SF']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for column, numerator, denominator in [
+            ('AVG', df['Hits'], df['AB']),
+            ('OBP', df['Hits'] + df['BB'] + df['HBP'], on_base_chances),
+            ('SLG', total_bases, df['AB']),
+        ]:
+            ratio = np.where(denominator > 0, numerator / denominator, 0.0)
+            df[column] = metrics.round_like_python(ratio, 3)
+    for metric in resolve(DERIVED):
+        df[metric.name] = metric.compute(df, constants)
+    df['OPS'] = metrics.round_like_python(df['OPS'], 3)
+    return df[STATS_COLUMNS]
+
+
+def _date(game):
+    return game[0]
+
+
+# Running totals of one team's games
+class GameLog:
+    """
+    players (list): (Number, Name) per player, in order of first game.
+    games (list): (Date, Game) per game, in order.
+
+    The running totals are held with spare capacity on both axes, so adding
+    a game or a new player is amortized O(players).
+    """
+    def __init__(self, players=(), games=(), prefix=None):
+        self.players = [tuple(player) for player in players]
+        self.games = [(str(date), int(game)) for date, game in games]
+        self._index = {player: i for i, player in enumerate(self.players)}
+        self._prefix = np.zeros((len(self.games) + 1, len(self.players), len(COUNTING)), dtype=np.int64)
+        if prefix is not None:
+            self._prefix[:] = prefix
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Build the running totals of a whole game log (see read_game_log) at once.
+        """
+        games = df[GAME_COLUMNS].drop_duplicates().sort_values(GAME_COLUMNS, kind="stable")
+        game_codes = pd.MultiIndex.from_frame(games).get_indexer(pd.MultiIndex.from_frame(df[GAME_COLUMNS]))
+        player_codes, players = pd.factorize(pd.MultiIndex.from_frame(df[KEY_COLUMNS]))
+        per_game = np.zeros((len(games), len(players), len(COUNTING)), dtype=np.int64)
+        values = np.column_stack([np.ones(len(df), dtype=np.int64), df[COUNTING[1:]].to_numpy(dtype=np.int64)])
+        np.add.at(per_game, (game_codes, player_codes), values)
+        # A player listed twice in one game still played one game
+        np.minimum(per_game[..., 0], 1, out=per_game[..., 0])
+        prefix = np.concatenate([np.zeros((1,) + per_game.shape[1:], dtype=np.int64), per_game.cumsum(axis=0)])
+        return cls(list(players), games.itertuples(index=False, name=None), prefix)
+
+    def __len__(self):
+        return len(self.games)
+
+    def _reserve(self, games, players):
+        capacity_games, capacity_players, _ = self._prefix.shape
+        if games + 1 <= capacity_games and players <= capacity_players:
+            return
+        grown = np.zeros((max(games + 1, 2 * capacity_games), max(players, 2 * capacity_players), len(COUNTING)),
+                         dtype=np.int64)
+        grown[:capacity_games, :capacity_players] = self._prefix
+        self._prefix = grown
+
+    @property
+    def prefix(self):
+        """(games + 1, players, len(COUNTING)) running totals, without spare capacity."""
+        return self._prefix[:len(self.games) + 1, :len(self.players)]
+
+    def append(self, date, game, rows):
+        """
+        Add one game after the last one.
+
+        Parameters:
+        date (str), game (int): The game's Date and Game.
+        rows (DataFrame): The game's player rows, as from read_game_log.
+
+        Raises:
+        ValueError: If the game is not after the last game in the log.
+        """
+        key = (str(date), int(game))
+        if self.games and key <= self.games[-1]:
+            raise ValueError(f"Game {key} is not after the last game {self.games[-1]}; rebuild the log instead.")
+        keys = list(zip(rows["Number"], rows["Name"]))
+        for player in keys:
+            if player not in self._index:
+                self._index[player] = len(self.players)
+                self.players.append(player)
+        count = len(self.games)
+        self._reserve(count + 1, len(self.players))
+        # Only the new row is written: the previous totals plus this game
+        new = self._prefix[count + 1]
+        new[:] = self._prefix[count]
+        columns = [self._index[player] for player in keys]
+        np.add.at(new[:, 1:], columns, rows[COUNTING[1:]].to_numpy(dtype=np.int64))
+        new[np.unique(columns), 0] += 1
+        self.games.append(key)
+
+    def add_games(self, df):
+        """
+        Append the games of a game log that are not in this log yet.
+
+        Returns:
+        int: Games added.
+
+        Raises:
+        ValueError: If a new game is dated before the last game in the log.
+        """
+        known = set(self.games)
+        added = 0
+        for key, rows in df.groupby(GAME_COLUMNS, sort=True):
+            key = (str(key[0]), int(key[1]))
+            if key in known:
+                continue
+            self.append(*key, rows)
+            added += 1
+        return added
+
+    def window(self, last=None, since=None, until=None):
+        """
+        Returns:
+        tuple: (start, stop) game positions of the games dated since..until
+        (inclusive), limited to the last `last` of them.
+        """
+        start = bisect.bisect_left(self.games, since, key=_date) if since is not None else 0
+        stop = bisect.bisect_right(self.games, until, key=_date) if until is not None else len(self.games)
+        if last is not None:
+            start = max(start, stop - last)
+        return start, max(start, stop)
+
+    def totals(self, start=0, stop=None):
+        """(players, len(COUNTING)) summed counting stats of games start..stop-1."""
+        prefix = self.prefix
+        return prefix[len(self.games) if stop is None else stop] - prefix[start]
+
+    def stats(self, start=0, stop=None, constants=None):
+        """
+        Returns:
+        DataFrame: STATS_COLUMNS for the players who played in the window.
+        """
+        with instrument.stage("window") as record:
+            totals = self.totals(start, stop)
+            played = totals[:, 0] > 0
+            players = [player for player, keep in zip(self.players, played) if keep]
+            if constants is None:
+                constants = league_constants(aggregate_league(pd.DataFrame(totals[played], columns=COUNTING)))
+            df = stats_frame(players, totals[played], constants)
+            record.add(rows=len(df))
+        return df
+
+    def rolling(self, stat, games, constants):
+        """
+        One stat over every window of `games` consecutive games, for every
+        player, from one subtraction of shifted running totals.
+
+        Returns:
+        DataFrame: One row per window (indexed by the Date of its last game),
+        one column per player Name; NaN where the player did not play in the
+        window.
+        """
+        prefix = self.prefix
+        if len(self.games) < games:
+            return pd.DataFrame(columns=[name for _, name in self.players], dtype=np.float64)
+        with instrument.stage("rolling") as record:
+            windows = prefix[games:] - prefix[:-games]
+            count, players, _ = windows.shape
+            flat = stats_frame(self.players * count, windows.reshape(-1, len(COUNTING)), constants)
+            values = np.array(flat[stat], dtype=np.float64).reshape(count, players)
+            values[windows[..., 0] == 0] = np.nan
+            record.add(rows=count * players)
+        index = pd.Index([date for date, _ in self.games[games - 1:]], name="Date")
+        return pd.DataFrame(values, index=index, columns=[name for _, name in self.players])
+
+    def save(self, path):
+        numbers, names = zip(*self.players) if self.players else ((), ())
+        dates, games = zip(*self.games) if self.games else ((), ())
+        with atomic_io.atomic_path(path) as temp, open(temp, "wb") as handle:
+            np.savez(handle, prefix=self.prefix, numbers=np.array(numbers, dtype=str),
+                     names=np.array(names, dtype=str), dates=np.array(dates, dtype=str),
+                     games=np.array(games, dtype=np.int64))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(zip(data["numbers"].tolist(), data["names"].tolist()),
+                       zip(data["dates"].tolist(), data["games"].tolist()), data["prefix"])
+
+
+# Function to return where a store keeps a team's game log
+def game_log_path(store, team):
+    base = store.directory if isinstance(store, CsvStore) else os.path.dirname(os.path.abspath(store.path))
+    return os.path.join(base, CACHE_DIRECTORY, f"{team}.npz")
+
+
+def _store_constants(store):
+    # The season's league constants, or None to use the window's own
+    return league_constants(read_league_totals(store)) if store.teams() else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", default=os.environ.get("STATS_STORE", "output_data"))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = commands.add_parser("add", help="Add the new games of game-log CSVs to a team's log.")
+    add_parser.add_argument("team")
+    add_parser.add_argument("files", nargs="+")
+    add_parser.add_argument("--rebuild", action="store_true", help="Replace the team's log with these files")
+
+    window_parser = commands.add_parser("window", help="A team's stats over a window of games.")
+    window_parser.add_argument("team")
+    window_parser.add_argument("--last", type=int, help="Only the last N games")
+    window_parser.add_argument("--since", help="First date, YYYY-MM-DD")
+    window_parser.add_argument("--until", help="Last date, YYYY-MM-DD")
+    window_parser.add_argument("-o", "--output", default="-", help="CSV to write (default: print)")
+
+    rolling_parser = commands.add_parser("rolling", help="One stat over every run of N games.")
+    rolling_parser.add_argument("team")
+    rolling_parser.add_argument("stat", choices=[column for column in STATS_COLUMNS if column not in KEY_COLUMNS])
+    rolling_parser.add_argument("--games", type=int, default=5)
+    rolling_parser.add_argument("-o", "--output", default="-", help="CSV to write (default: print)")
+
+    instrument.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument.configure_from_args(args)
+
+    store = open_store(args.store)
+    path = game_log_path(store, args.team)
+    if args.command == "add":
+        try:
+            df = pd.concat([read_game_log(file) for file in args.files], ignore_index=True)
+            if args.rebuild or not os.path.exists(path):
+                log = GameLog.from_frame(df)
+                added = len(log)
+            else:
+                log = GameLog.load(path)
+                added = log.add_games(df)
+        except (OSError, ValueError) as e:
+            sys.exit(str(e))
+        log.save(path)
+        print(f"Added {added} games to {args.team}'s log ({len(log)} games, {len(log.players)} players).")
+        return 0
+
+    if not os.path.exists(path):
+        sys.exit(f"No game log for team '{args.team}'. Add one with: python -m backend.gamelog add {args.team} FILE")
+    log = GameLog.load(path)
+    constants = _store_constants(store)
+    if args.command == "window":
+        start, stop = log.window(args.last, args.since, args.until)
+        table = log.stats(start, stop, constants)
+        if start < stop:
+            print(f"Games {start + 1}-{stop} of {len(log)}: {log.games[start][0]} to {log.games[stop - 1][0]}",
+                  file=sys.stderr)
+        index = False
+    else:
+        if args.games < 1:
+            parser.error("--games must be at least 1")
+        if constants is None:
+            constants = league_constants(aggregate_league(pd.DataFrame(log.totals(), columns=COUNTING)))
+        table = log.rolling(args.stat, args.games, constants)
+        index = True
+
+    if args.output == "-":
+        table.to_csv(sys.stdout, index=index)
+    else:
+        with atomic_io.atomic_path(args.output) as temp:
+            table.to_csv(temp, index=index)
+        print(f"Wrote {len(table)} rows to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
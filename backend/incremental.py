@@ -0,0 +1,185 @@
+"""
+Incremental league rebuild from a directory of raw <Team>.txt files.
+
+A manifest in the output directory keeps a content hash and the summed
+counting stats of every team. On each run only teams whose raw file changed
+are re-parsed; league totals are rebuilt from the cached per-team sums, and
+other teams' files are rewritten only if the league OPS or league wOBA moved
+by more than the tolerance (OPS+ and wRAA are the only columns that depend on
+them). Everything a run writes, and the stats file of every team whose raw
+file is gone, is committed in one atomic_io transaction.
+
+    python -m backend.incremental raw_league/ [-o output_data] [--tolerance 1e-4]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import pandas as pd
+
+from . import atomic_io, instrument
+from .batch_ingest import RAW_EXTENSION, find_team_files, parse_team_file
+from .league_totals import LeagueTotals, aggregate_league, combine_league_totals
+from .derived import DerivedColumns
+from .recompute_league import derived_columns
+from .stats_store import TEAM_COLUMN, CsvStore
+from .wOBA import mlb_woba_weights
+
+MANIFEST_FILE = "league_manifest.json"
+DEFAULT_TOLERANCE = 1e-4
+
+
+# Function to hash a raw team file's contents
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(output_directory):
+    path = os.path.join(output_directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"teams": {}, "constants": {}}
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_manifest(output_directory, manifest):
+    with atomic_io.atomic_path(os.path.join(output_directory, MANIFEST_FILE)) as path, \
+            open(path, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+
+
+def _league_constants(totals):
+    return {"league_ops": totals.ops, "league_woba": totals.league_woba(mlb_woba_weights)}
+
+
+def _add_derived_columns(store, frames, totals):
+    # The same registry and columns as recompute_league, over every team being
+    # written in one call; returns team to its table with the columns set
+    if not frames:
+        return {}
+    names = derived_columns(totals)
+    league = pd.concat([df.assign(**{TEAM_COLUMN: team}) for team, df in frames.items()], ignore_index=True)
+    derived = DerivedColumns(store).compute(league, names, totals)
+    tables = {}
+    start = 0
+    for team, df in frames.items():
+        df = df.copy()
+        for name in names:
+            df[name] = derived[name].iloc[start:start + len(df)].to_numpy()
+        tables[team] = df
+        start += len(df)
+    return tables
+
+
+# Function to bring output_directory up to date with the raw files, touching as little as possible
+def update_league(raw_directory, output_directory="output_data", tolerance=DEFAULT_TOLERANCE):
+    """
+    Parameters:
+    raw_directory (str): Directory of raw <Team>.txt files.
+    output_directory (str): Directory holding <Team>_stats.csv and the manifest.
+    tolerance (float): How far league OPS or league wOBA may move before
+    unchanged teams have their OPS+ and wRAA rewritten.
+
+    Returns:
+    dict: Lists of team names under 'parsed', 'refreshed' and 'removed'.
+    A removed team's <Team>_stats.csv is deleted.
+    """
+    # Team files, league_stats.csv and the manifest are committed together
+    with atomic_io.transaction(output_directory) as txn:
+        return _update_league(raw_directory, output_directory, tolerance, txn)
+
+
+def _update_league(raw_directory, output_directory, tolerance, txn):
+    store = CsvStore(output_directory)
+    manifest = load_manifest(output_directory)
+    cached = manifest["teams"]
+
+    paths = {os.path.basename(path)[:-len(RAW_EXTENSION)]: path for path in find_team_files(raw_directory)}
+    removed = sorted(set(cached) - set(paths))
+    for team in removed:
+        del cached[team]
+        # Its stats file goes in the same commit as the totals that drop it
+        txn.remove(store.path_for(team))
+
+    # Re-parse only the teams whose raw file changed
+    parsed = {}
+    for team, path in paths.items():
+        digest = file_hash(path)
+        if team in cached and cached[team]["hash"] == digest:
+            continue
+        try:
+            _, team_df = parse_team_file(path)
+        except (OSError, ValueError) as e:
+            print(f"Skipping '{path}': {e}", file=sys.stderr)
+            continue
+        part = aggregate_league(team_df)
+        cached[team] = {"hash": digest, "totals": part.totals, "players": part.players}
+        parsed[team] = team_df
+
+    if not parsed and not removed:
+        return {"parsed": [], "refreshed": [], "removed": []}
+
+    # League totals come from the cached per-team sums, not from the files
+    totals = combine_league_totals(
+        LeagueTotals(totals=entry["totals"], players=entry["players"]) for entry in cached.values()
+    )
+    constants = _league_constants(totals)
+    previous = manifest["constants"]
+    moved = not previous or any(
+        abs(constants[name] - previous.get(name, float("inf"))) > tolerance for name in constants
+    )
+
+    # Unchanged teams only need OPS+ and wRAA, and only if the constants moved
+    frames = dict(parsed)
+    refreshed = []
+    if moved:
+        for team in sorted(set(cached) - set(parsed)):
+            path = store.path_for(team)
+            if not os.path.exists(path):
+                continue
+            frames[team] = pd.read_csv(path)
+            refreshed.append(team)
+        manifest["constants"] = constants
+
+    for team, team_df in _add_derived_columns(store, frames, totals).items():
+        team_df.to_csv(txn.path(store.path_for(team)), index=False)
+
+    league_df = totals.to_frame()
+    league_df = pd.concat(
+        [league_df, pd.DataFrame({'Statistic': ['wOBA'], 'Total': [constants["league_woba"]]})], ignore_index=True
+    )
+    league_df.to_csv(txn.path(os.path.join(output_directory, "league_stats.csv")), index=False)
+    save_manifest(output_directory, manifest)
+    return {"parsed": sorted(parsed), "refreshed": refreshed, "removed": removed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("raw_directory", help="Directory of raw <Team>.txt files")
+    parser.add_argument("-o", "--output-directory", default="output_data")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Change in league OPS/wOBA that triggers rewriting unchanged teams")
+    instrument.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument.configure_from_args(args)
+
+    if not os.path.isdir(args.raw_directory):
+        parser.error(f"'{args.raw_directory}' is not a directory")
+
+    with instrument.stage("update_league"):
+        result = update_league(args.raw_directory, args.output_directory, args.tolerance)
+    print(f"Parsed: {', '.join(result['parsed']) or 'none'}")
+    print(f"Refreshed OPS+/wRAA: {', '.join(result['refreshed']) or 'none'}")
+    if result["removed"]:
+        print(f"Removed: {', '.join(result['removed'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
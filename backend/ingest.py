@@ -0,0 +1,91 @@
+"""
+Non-interactive ingestion of raw stat pastes.
+
+Reads rows from files (or stdin) in chunks and appends them to a CSV as they
+are parsed, so memory use does not grow with the size of the input. Rows that
+fail validation (see validation.py) are left out and can be written to a
+quarantine CSV; the counts per reason are printed once at the end.
+
+    python -m backend.ingest --layout basic season.txt -o output_data/Branham_stats.csv
+    cat additional.txt | python -m backend.ingest --layout additional > additional.csv
+    python -m backend.ingest season.txt -o out.csv --quarantine rejected.csv
+"""
+import argparse
+import sys
+
+from . import instrument
+from .fast_parse import DEFAULT_CHUNK_SIZE
+from .validation import combine_reports, iter_validated_chunks
+
+
+# Function to stream one or more inputs into a CSV, one chunk at a time
+def ingest(inputs, output, kind="basic", chunk_size=DEFAULT_CHUNK_SIZE, quarantine=None):
+    """
+    Parse and validate each input in turn and write the accepted rows to output.
+
+    Parameters:
+    inputs (list): Open text streams to read rows from.
+    output (file): Text stream the CSV is written to.
+    kind (str): "basic" or "additional".
+    chunk_size (int): Number of input lines parsed per chunk.
+    quarantine (file): Optional text stream the rejected rows are written to,
+        as CSV with an Input column (position of the input in inputs).
+
+    Returns:
+    tuple: (number of rows written, ValidationReport over all inputs)
+    """
+    rows_written = 0
+    quarantined = 0
+    reports = []
+    for position, stream in enumerate(inputs):
+        for chunk, report in iter_validated_chunks(stream, kind=kind, chunk_size=chunk_size):
+            reports.append(report)
+            if quarantine is not None and not report.quarantine.empty:
+                rejected = report.quarantine.copy()
+                rejected.insert(0, "Input", position)
+                rejected.to_csv(quarantine, index=False, header=quarantined == 0)
+                quarantined += len(rejected)
+            if report.quit_line is not None:  # stop reading this input
+                break
+            if chunk.empty:
+                continue
+            chunk.to_csv(output, index=False, header=rows_written == 0)
+            rows_written += len(chunk)
+    return rows_written, combine_reports(reports)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="*", default=["-"], help="Raw paste files to read ('-' for stdin)")
+    parser.add_argument("--layout", choices=["basic", "additional"], default="basic",
+                        help="Which stat table the rows come from")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Number of lines parsed per chunk")
+    parser.add_argument("-o", "--output", default="-", help="CSV file to write ('-' for stdout)")
+    parser.add_argument("--quarantine", help="CSV file to write rejected rows to")
+    instrument.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument.configure_from_args(args)
+
+    streams = [sys.stdin if path == "-" else open(path, encoding="utf-8") for path in args.inputs]
+    output = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    quarantine = open(args.quarantine, "w", newline="", encoding="utf-8") if args.quarantine else None
+    try:
+        rows, report = ingest(streams, output, kind=args.layout, chunk_size=args.chunk_size, quarantine=quarantine)
+    finally:
+        for stream in streams:
+            if stream is not sys.stdin:
+                stream.close()
+        if output is not sys.stdout:
+            output.close()
+        if quarantine is not None:
+            quarantine.close()
+
+    print(f"Parsed {rows} rows.", file=sys.stderr)
+    if not report.clean:
+        print(report.summary(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
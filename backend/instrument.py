@@ -0,0 +1,313 @@
+"""
+Timing hooks for the parse -> merge -> aggregate -> metrics -> write path.
+
+Off by default. Switch it on with an environment variable or the --instrument
+flag of the pipeline scripts:
+
+    STATS_INSTRUMENT=summary python -m backend.recompute_league
+    STATS_INSTRUMENT=json python -m backend.batch_ingest raw/ 2> stages.jsonl
+    python -m backend.batch_ingest raw/ --instrument summary --profile merge
+
+Each instrumented stage records its wall time, rows, bytes read and written,
+and the peak resident memory of the process so far. Nested stages are named
+by their path, e.g. recompute_league/aggregate.
+
+- 'json' writes one JSON object per finished stage call. Each line carries
+  the pid, so stages run in worker processes show up too.
+- 'summary' prints one table row per stage when the process exits. Only the
+  main process's stages are included, because pool workers exit without
+  running exit handlers.
+
+Lines go to stderr, or to the file named by STATS_INSTRUMENT_OUTPUT.
+
+The environment is read on the first stage() call, not at import, so importing
+a module stays cheap and free of side effects. An unknown STATS_INSTRUMENT or
+STATS_PROFILE_MODE value is reported on stderr and leaves instrumentation off.
+
+--profile STAGE (STATS_PROFILE) wraps every call of one stage in cProfile and
+prints the top functions at exit. With --profile-mode tracemalloc
+(STATS_PROFILE_MODE) it instead prints each call's peak traced memory and its
+top allocation sites.
+
+In code:
+
+    with instrument.stage("merge") as record:
+        df = merge(...)
+        record.add(rows=len(df))
+
+When instrumentation is off, stage() returns a shared record that does
+nothing and is falsy, so the cost is a function call. Extra work done only to
+feed the counters (like os.path.getsize) can be skipped with `if record:`.
+"""
+import atexit
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MODE_VARIABLE = "STATS_INSTRUMENT"
+OUTPUT_VARIABLE = "STATS_INSTRUMENT_OUTPUT"
+PROFILE_VARIABLE = "STATS_PROFILE"
+PROFILE_MODE_VARIABLE = "STATS_PROFILE_MODE"
+
+MODES = ("summary", "json")
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+# Lines of cProfile output and allocation sites printed for the profiled stage
+PROFILE_LINES = 25
+TRACEMALLOC_SITES = 10
+
+
+# The record handed out while instrumentation is off
+class _NullRecord:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __bool__(self):
+        return False
+
+    def add(self, rows=0, bytes_read=0, bytes_written=0):
+        pass
+
+
+_NULL_RECORD = _NullRecord()
+
+_configured = False
+_mode = None
+_output = None
+_profile_stage = None
+_profile_mode = "cprofile"
+_profiler = None
+_stack = []
+_totals = {}
+_exit_registered = False
+
+
+def _peak_rss_mib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def _write(line):
+    stream = _output if _output is not None else sys.stderr
+    stream.write(line + "\n")
+    stream.flush()
+
+
+# One timed call of a stage
+class StageRecord:
+    __slots__ = ("name", "path", "rows", "bytes_read", "bytes_written", "seconds", "peak_rss_mib", "_start")
+
+    def __init__(self, name):
+        self.name = name
+        self.path = name
+        self.rows = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.seconds = 0.0
+        self.peak_rss_mib = None
+        self._start = None
+
+    def add(self, rows=0, bytes_read=0, bytes_written=0):
+        self.rows += rows
+        self.bytes_read += bytes_read
+        self.bytes_written += bytes_written
+
+    def __enter__(self):
+        _stack.append(self.name)
+        self.path = "/".join(_stack)
+        if self.name == _profile_stage:
+            _start_profile()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self._start
+        if self.name == _profile_stage:
+            _stop_profile(self)
+        _stack.pop()
+        self.peak_rss_mib = _peak_rss_mib()
+        _finish(self)
+        return False
+
+    def as_dict(self):
+        return {
+            "stage": self.path, "seconds": round(self.seconds, 6), "rows": self.rows,
+            "bytes_read": self.bytes_read, "bytes_written": self.bytes_written,
+            "peak_rss_mib": None if self.peak_rss_mib is None else round(self.peak_rss_mib, 1),
+            "pid": os.getpid(),
+        }
+
+
+def _finish(record):
+    if _mode == "json":
+        _write(json.dumps(record.as_dict()))
+    else:
+        total = _totals.setdefault(record.path, {
+            "calls": 0, "seconds": 0.0, "rows": 0, "bytes_read": 0, "bytes_written": 0, "peak_rss_mib": None,
+        })
+        total["calls"] += 1
+        total["seconds"] += record.seconds
+        total["rows"] += record.rows
+        total["bytes_read"] += record.bytes_read
+        total["bytes_written"] += record.bytes_written
+        if record.peak_rss_mib is not None:
+            total["peak_rss_mib"] = max(total["peak_rss_mib"] or 0, record.peak_rss_mib)
+
+
+def _start_profile():
+    global _profiler
+    if _profile_mode == "tracemalloc":
+        tracemalloc.start()
+    else:
+        import cProfile
+        _profiler = _profiler or cProfile.Profile()
+        _profiler.enable()
+
+
+def _stop_profile(record):
+    if _profile_mode == "tracemalloc":
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        lines = [f"tracemalloc {record.path}: peak {peak / 2**20:.1f} MiB"]
+        for statistic in snapshot.statistics("lineno")[:TRACEMALLOC_SITES]:
+            lines.append(f"  {statistic}")
+        _write("\n".join(lines))
+    else:
+        _profiler.disable()
+
+
+# Function to time one stage
+def stage(name):
+    """
+    Returns:
+    StageRecord, or a do-nothing record when instrumentation is off. Use it as
+    a context manager and add rows and bytes to it.
+    """
+    if not _configured:
+        configure_from_env()
+    if _mode is None:
+        return _NULL_RECORD
+    return StageRecord(name)
+
+
+def enabled():
+    if not _configured:
+        configure_from_env()
+    return _mode is not None
+
+
+# Function to build the per-stage summary table
+def summary():
+    """
+    Returns:
+    str: One line per stage path, in the order stages first finished, with
+    calls, total seconds, rows, MiB read and written, and peak RSS.
+    """
+    lines = [f"{'stage':<40}{'calls':>7}{'seconds':>10}{'rows':>11}{'read MiB':>10}{'written MiB':>13}"
+             f"{'peak MiB':>10}"]
+    for path, total in _totals.items():
+        peak = "" if total["peak_rss_mib"] is None else f"{total['peak_rss_mib']:.1f}"
+        lines.append(
+            f"{path:<40}{total['calls']:>7}{total['seconds']:>10.4f}{total['rows']:>11}"
+            f"{total['bytes_read'] / 2**20:>10.2f}{total['bytes_written'] / 2**20:>13.2f}{peak:>10}"
+        )
+    return "\n".join(lines)
+
+
+def _report_at_exit():
+    if _mode == "summary" and _totals:
+        _write(summary())
+    if _profiler is not None:
+        import io
+        import pstats
+        buffer = io.StringIO()
+        pstats.Stats(_profiler, stream=buffer).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        _write(f"cProfile {_profile_stage}:\n{buffer.getvalue()}")
+
+
+# Function to switch instrumentation on or off
+def configure(mode=None, profile=None, profile_mode="cprofile", output=None):
+    """
+    Parameters:
+    mode (str): 'summary', 'json', or None to switch instrumentation off.
+        Profiling a stage switches it on in 'summary' mode if no mode is given.
+    profile (str): Name of the stage to profile, e.g. 'merge'.
+    profile_mode (str): 'cprofile' or 'tracemalloc'.
+    output (str): File the JSON lines and summary are appended to (default
+        stderr).
+    """
+    global _configured, _mode, _output, _profile_stage, _profile_mode, _exit_registered
+    if mode is not None and mode not in MODES:
+        raise ValueError(f"Unknown instrumentation mode '{mode}'. Expected one of: {', '.join(MODES)}")
+    if profile_mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{profile_mode}'. Expected one of: {', '.join(PROFILE_MODES)}")
+
+    _configured = True
+    _mode = mode or ("summary" if profile else None)
+    _profile_stage = profile
+    _profile_mode = profile_mode
+    if _output is not None:
+        _output.close()
+    _output = open(output, "a", encoding="utf-8") if output else None
+    _totals.clear()
+    if _mode is not None and not _exit_registered:
+        atexit.register(_report_at_exit)
+        _exit_registered = True
+
+
+# Function to configure instrumentation from the STATS_* environment variables
+def configure_from_env():
+    """
+    Unknown values are reported on stderr and switch instrumentation off
+    rather than failing the script that imported this module.
+    """
+    mode = os.environ.get(MODE_VARIABLE) or None
+    profile_mode = os.environ.get(PROFILE_MODE_VARIABLE) or "cprofile"
+    if mode is not None and mode not in MODES:
+        print(f"Ignoring {MODE_VARIABLE}='{mode}': expected one of {', '.join(MODES)}", file=sys.stderr)
+        configure()
+        return
+    if profile_mode not in PROFILE_MODES:
+        print(f"Ignoring {PROFILE_MODE_VARIABLE}='{profile_mode}': expected one of {', '.join(PROFILE_MODES)}",
+              file=sys.stderr)
+        configure()
+        return
+    try:
+        configure(mode, os.environ.get(PROFILE_VARIABLE) or None, profile_mode,
+                  os.environ.get(OUTPUT_VARIABLE) or None)
+    except OSError as e:
+        print(f"Ignoring {OUTPUT_VARIABLE}: {e}", file=sys.stderr)
+        configure()
+
+
+# Function to add the instrumentation flags to a script's argument parser
+def add_arguments(parser):
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument("--instrument", choices=MODES, help=f"Time each stage (or set {MODE_VARIABLE})")
+    group.add_argument("--profile", metavar="STAGE", help="Profile one stage, e.g. merge")
+    group.add_argument("--profile-mode", choices=PROFILE_MODES, default="cprofile")
+
+
+# Function to apply the instrumentation flags; the environment applies when they are not given
+def configure_from_args(args):
+    if args.instrument or args.profile:
+        # Worker processes read the environment, so pass the flags on to them
+        os.environ[MODE_VARIABLE] = args.instrument or "summary"
+        if args.profile:
+            os.environ[PROFILE_VARIABLE] = args.profile
+            os.environ[PROFILE_MODE_VARIABLE] = args.profile_mode
+        configure(args.instrument, args.profile, args.profile_mode, os.environ.get(OUTPUT_VARIABLE) or None)
@@ -0,0 +1,99 @@
+"""
+Leaderboard and percentile index over the league table.
+
+Built once per league rebuild; answers top-N and percentile questions without
+re-sorting the league:
+
+    index = LeaderboardIndex(league_df)
+    index.top('wOBA', 10, min_pa=index.qualifying_pa)  # O(k) after the first call
+    index.percentile('OPS+', 120)                       # O(log n) binary search
+"""
+import math
+
+import numpy as np
+
+# Derived columns produced by wOBA.py, ops_plus.py and merge_additional_data
+INDEXED_STATS = ['wOBA', 'wRAA', 'OPS', 'OPS+', 'ISOP', 'BABIP']
+
+# Plate appearances per team game to qualify, as used by the frontend filter
+QUALIFYING_PA_PER_GAME = 2.41
+
+
+# Function to compute the qualifying PA threshold for a league table
+def qualifying_pa(df):
+    if df.empty or 'Games' not in df.columns:
+        return 0
+    return QUALIFYING_PA_PER_GAME * df['Games'].max()
+
+
+# Sorted views of each stat, with lazily built views for the default and qualifying PA thresholds
+class LeaderboardIndex:
+    def __init__(self, df, stats=INDEXED_STATS, version=None):
+        """
+        Parameters:
+        df (DataFrame): League table (one row per player).
+        stats (list): Columns to index; those missing from df are skipped.
+        version: Any value identifying the league build, e.g. a file signature.
+        """
+        self.df = df.reset_index(drop=True)
+        self.version = version
+        self.stats = [stat for stat in stats if stat in self.df.columns]
+        self.qualifying_pa = qualifying_pa(self.df)
+        self._pa = self.df['PA'].to_numpy(dtype=np.float64) if 'PA' in self.df.columns else None
+        # Views for no threshold and the qualifying one; any other threshold
+        # comes from a query string and is computed per call, so the cache
+        # cannot grow with the values clients send
+        self._views = {}
+
+    def _view(self, stat, min_pa):
+        """
+        (row order best-first, values sorted ascending) for one stat among
+        players with at least min_pa plate appearances; NaN values are left out.
+        """
+        if stat not in self.stats:
+            raise KeyError(f"'{stat}' is not indexed. Indexed stats: {', '.join(self.stats)}")
+        if min_pa is not None and not math.isfinite(min_pa):
+            raise ValueError(f"min_pa must be finite, not {min_pa}")
+        key = (stat, min_pa)
+        if key in self._views:
+            return self._views[key]
+        values = self.df[stat].to_numpy(dtype=np.float64)
+        keep = ~np.isnan(values)
+        if min_pa is not None and self._pa is not None:
+            keep &= self._pa >= min_pa
+        rows = np.flatnonzero(keep)
+        ascending = np.argsort(values[rows], kind="stable")
+        view = (rows[ascending[::-1]], values[rows][ascending])
+        if min_pa is None or min_pa == self.qualifying_pa:
+            self._views[key] = view
+        return view
+
+    def top(self, stat, n=10, min_pa=None, ascending=False):
+        """
+        The n best players by stat (highest first unless ascending), restricted
+        to players with at least min_pa plate appearances.
+        """
+        best_first, _ = self._view(stat, min_pa)
+        rows = best_first[::-1][:n] if ascending else best_first[:n]
+        return self.df.iloc[rows]
+
+    def count(self, stat, min_pa=None):
+        """
+        Number of (qualified) players with a value for stat.
+        """
+        return len(self._view(stat, min_pa)[1])
+
+    def percentile(self, stat, value, min_pa=None):
+        """
+        Percentage of (qualified) players whose stat is at or below value.
+        """
+        _, sorted_values = self._view(stat, min_pa)
+        if len(sorted_values) == 0:
+            return float('nan')
+        return 100.0 * np.searchsorted(sorted_values, value, side="right") / len(sorted_values)
+
+    def player_percentile(self, stat, row, min_pa=None):
+        """
+        Percentile of the player at positional row of the indexed table.
+        """
+        return self.percentile(stat, self.df[stat].iat[row], min_pa=min_pa)
@@ -0,0 +1,121 @@
+"""
+Filtering, sorting and pagination over the in-memory league table.
+
+Used by the stats service for
+
+    GET /api/query?teams=Branham,Leland&columns=Name,wOBA&sort=wOBA&desc&min_pa=20&limit=50&offset=0
+
+and returns a columnar payload sized by the page, not the league.
+"""
+import math
+
+import pandas as pd
+
+from .stats_store import TEAM_COLUMN
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 5000
+
+
+def _split(value):
+    if value is None or value == "":
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _non_negative_int(args, name, default):
+    value = args.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer.") from None
+    if number < 0:
+        raise ValueError(f"'{name}' must not be negative.")
+    return number
+
+
+# Function to validate query-string arguments into run_query keyword arguments
+def parse_query_args(args):
+    """
+    Parameters:
+    args (mapping): Query-string arguments (e.g. Flask's request.args).
+
+    Returns:
+    dict: Keyword arguments for run_query.
+
+    Raises:
+    ValueError: If a parameter is malformed.
+    """
+    desc = args.get("desc")
+    limit = _non_negative_int(args, "limit", DEFAULT_LIMIT)
+    if limit > MAX_LIMIT:
+        raise ValueError(f"'limit' must be at most {MAX_LIMIT}.")
+    min_pa = args.get("min_pa")
+    if min_pa not in (None, ""):
+        try:
+            min_pa = float(min_pa)
+        except ValueError:
+            min_pa = float('nan')
+        if not math.isfinite(min_pa):
+            raise ValueError("'min_pa' must be a number.")
+    else:
+        min_pa = None
+    return {
+        "teams": _split(args.get("teams")),
+        "columns": _split(args.get("columns")),
+        "sort": args.get("sort") or None,
+        "descending": desc is not None and desc.lower() not in ("0", "false", "no"),
+        "min_pa": min_pa,
+        "limit": limit,
+        "offset": _non_negative_int(args, "offset", 0),
+    }
+
+
+# Function to filter, sort and page a league table
+def run_query(df, teams=None, columns=None, sort=None, descending=False, min_pa=None,
+              limit=DEFAULT_LIMIT, offset=0):
+    """
+    Returns:
+    tuple: (page DataFrame, number of rows matching before paging)
+
+    Raises:
+    ValueError: If a requested column or sort key is not in the table.
+    """
+    if columns is not None:
+        unknown = [column for column in columns if column not in df.columns]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+    if sort is not None and sort not in df.columns:
+        raise ValueError(f"Unknown sort column '{sort}'.")
+
+    mask = pd.Series(True, index=df.index)
+    if teams is not None:
+        mask &= df[TEAM_COLUMN].isin(teams)
+    if min_pa is not None:
+        mask &= df['PA'] >= min_pa
+    matched = df[mask]
+
+    if sort is not None:
+        matched = matched.sort_values(sort, ascending=not descending, kind="stable", na_position="last")
+
+    page = matched.iloc[offset:offset + limit]
+    if columns is not None:
+        page = page[columns]
+    return page, len(matched)
+
+
+# Function to turn a page into a JSON-ready columnar payload
+def columnar_payload(page, total, offset, limit):
+    columns = {}
+    for column in page.columns:
+        values = page[column].tolist()
+        columns[column] = [None if isinstance(v, float) and math.isnan(v) else v for v in values]
+    return {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "rows": len(page),
+        "columns": columns,
+    }
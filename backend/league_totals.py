@@ -0,0 +1,141 @@
+"""
+League-wide totals computed once and shared by every stage.
+
+    totals = read_league_totals(open_store("output_data"))
+    totals.obp, totals.ops, totals.woba_weights()
+
+wOBA, wRAA, OPS+ and the league averages table all take a LeagueTotals
+instead of re-reading the team files.
+"""
+from dataclasses import dataclass
+
+import pandas as pd
+
+from . import instrument
+
+# Counting stats summed across the league, in the order of the league table
+COUNTING_STATS = [
+    'Games', 'PA', 'AB', 'R', 'Hits', 'RBI', 'Doubles', 'Triples', 'HR',
+    'BB', 'K', 'HBP', 'SF', 'SACB', 'ROE', 'FC', 'LOB',
+]
+
+
+@dataclass(frozen=True)
+class LeagueTotals:
+    """
+    Summed counting stats for a league.
+
+    totals (dict): Stat name (see COUNTING_STATS) to league total.
+    players (int): Number of player rows the totals were summed over.
+    """
+    totals: dict
+    players: int
+
+    def __getitem__(self, stat):
+        return self.totals[stat]
+
+    @property
+    def singles(self):
+        return self['Hits'] - self['Doubles'] - self['Triples'] - self['HR']
+
+    @property
+    def total_bases(self):
+        return self.singles + (2 * self['Doubles']) + (3 * self['Triples']) + (4 * self['HR'])
+
+    @property
+    def ba(self):
+        return self['Hits'] / self['AB'] if self['AB'] > 0 else 0
+
+    @property
+    def obp(self):
+        denominator = self['PA'] - self['SF']
+        return (self['Hits'] + self['BB'] + self['HBP']) / denominator if denominator > 0 else 0
+
+    @property
+    def slg(self):
+        return self.total_bases / self['AB'] if self['AB'] > 0 else 0
+
+    @property
+    def ops(self):
+        return self.obp + self.slg
+
+    def averages(self):
+        # Per-player averages of each counting stat
+        return {stat: (total / self.players if self.players > 0 else 0) for stat, total in self.totals.items()}
+
+    def woba_inputs(self):
+        # The totals calculate_woba_weights expects
+        return {
+            'BB': self['BB'], 'HBP': self['HBP'], '1B': self.singles, '2B': self['Doubles'],
+            '3B': self['Triples'], 'HR': self['HR'], 'SF': self['SF'], 'PA': self['PA'], 'Runs': self['R'],
+        }
+
+    def league_woba(self, weights):
+        """
+        League wOBA using the given weights (keys as in wOBA.mlb_woba_weights).
+        """
+        numerator = (
+            weights['Walks'] * self['BB'] +
+            weights['Hit By Pitch'] * self['HBP'] +
+            weights['Singles'] * self.singles +
+            weights['Doubles'] * self['Doubles'] +
+            weights['Triples'] * self['Triples'] +
+            weights['Home Runs'] * self['HR']
+        )
+        denominator = self['AB'] + self['BB'] + self['HBP'] + self['SF']
+        if denominator == 0:
+            return 0
+        return numerator / denominator
+
+    def to_frame(self):
+        """
+        The Statistic/Total/Average table written to league_stats.csv.
+        """
+        return pd.DataFrame({
+            'Statistic': list(self.totals.keys()) + ['BA', 'OBP', 'SLG', 'OPS'],
+            'Total': list(self.totals.values()) + [None, None, None, None],
+            'Average': list(self.averages().values()) + [self.ba, self.obp, self.slg, self.ops],
+        })
+
+
+# Function to sum every counting stat across all teams in one pass
+def aggregate_league(frames):
+    """
+    Parameters:
+    frames (DataFrame or iterable of DataFrames): Player rows for the league.
+    Stats missing from the frames count as zero.
+
+    Returns:
+    LeagueTotals
+    """
+    with instrument.stage("aggregate") as record:
+        df = frames if isinstance(frames, pd.DataFrame) else pd.concat(list(frames), ignore_index=True)
+        present = [stat for stat in COUNTING_STATS if stat in df.columns]
+        sums = df[present].sum()
+        totals = {stat: (sums[stat].item() if stat in sums.index else 0) for stat in COUNTING_STATS}
+        record.add(rows=len(df))
+    return LeagueTotals(totals=totals, players=len(df))
+
+
+# Function to add up per-team totals without touching the player rows
+def combine_league_totals(parts):
+    """
+    Parameters:
+    parts (iterable of LeagueTotals): Totals for disjoint groups of players,
+    e.g. one per team.
+
+    Returns:
+    LeagueTotals
+    """
+    totals = dict.fromkeys(COUNTING_STATS, 0)
+    players = 0
+    for part in parts:
+        for stat in COUNTING_STATS:
+            totals[stat] += part[stat]
+        players += part.players
+    return LeagueTotals(totals=totals, players=players)
+
+
+# Function to read just the counting stats from a store and aggregate them
+def read_league_totals(store):
+    return aggregate_league(store.read(columns=COUNTING_STATS))
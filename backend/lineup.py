@@ -0,0 +1,433 @@
+"""
+Batting-order run expectancy from the parsed player rates.
+
+Each player's plate appearances become event rates (1B, 2B, 3B, HR, BB/HBP,
+ROE, SF, SACB, out) from the same counting stats as bootstrap.py. A lineup is
+scored with a Markov chain over the 24 base-out states: for every batter who
+can lead off an inning, the chain gives the inning's expected runs and who
+leads off the next inning, and chaining those over the innings gives the
+expected runs per game. Runners move by fixed rules (see _transition); there
+are no double plays, steals or extra bases taken.
+
+Many lineups are scored at once as arrays of state probabilities. The search
+for the best order runs either over every order of nine players, or as
+hill climbing from random lineups (swap two batters, or bring in a bench
+player) when the roster is larger. Both spread their work over a process pool.
+Search results are cached under <store>/.lineups/, keyed by a hash of the
+roster's rates and the search settings.
+
+    python -m backend.lineup Branham                       # search the team's roster
+    python -m backend.lineup Branham --lineup "R. Winsor(Sr)" ...   # score one order
+    python -m backend.lineup Branham --lineup NAME ... --exhaustive  # best order of these nine
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import atomic_io, instrument
+from .bootstrap import INPUT_COLUMNS, OUTCOMES, outcome_counts
+from .stats_store import TEAM_COLUMN, CsvStore, open_store
+
+EVENTS = ["1B", "2B", "3B", "HR", "BB/HBP", "ROE", "SF", "SACB", "Out"]
+E_1B, E_2B, E_3B, E_HR, E_WALK, E_ROE, E_SF, E_SACB, E_OUT = range(len(EVENTS))
+
+LINEUP_SIZE = 9
+# High-school games are seven innings
+DEFAULT_INNINGS = 7
+DEFAULT_STARTS = 16
+# Bump when the transition rules change so cached searches are not reused
+MODEL_VERSION = 1
+CACHE_DIRECTORY = ".lineups"
+
+FIRST, SECOND, THIRD = 1, 2, 4
+STATES = 24
+INNING_OVER = STATES
+# Lineups scored per array block, to bound memory
+BLOCK = 4096
+
+
+# Function to apply one plate-appearance event to a base-out state
+def _transition(outs, bases, event):
+    """
+    Parameters:
+    outs (int): Outs before the plate appearance (0-2).
+    bases (int): Occupied bases as FIRST | SECOND | THIRD bits.
+    event (int): Index into EVENTS.
+
+    Returns:
+    tuple: (outs, bases, runs) after the plate appearance.
+    """
+    runners = bin(bases).count("1")
+    if event == E_1B:
+        # Runners on second and third score, a runner on first stops at second
+        return outs, FIRST | (SECOND if bases & FIRST else 0), bin(bases & (SECOND | THIRD)).count("1")
+    if event == E_2B:
+        return outs, SECOND | (THIRD if bases & FIRST else 0), bin(bases & (SECOND | THIRD)).count("1")
+    if event == E_3B:
+        return outs, THIRD, runners
+    if event == E_HR:
+        return outs, 0, runners + 1
+    if event == E_WALK:
+        # Only forced runners move
+        if not bases & FIRST:
+            return outs, bases | FIRST, 0
+        if not bases & SECOND:
+            return outs, bases | FIRST | SECOND, 0
+        if not bases & THIRD:
+            return outs, FIRST | SECOND | THIRD, 0
+        return outs, bases, 1
+    if event == E_ROE:
+        # Batter safe at first, every runner moves up one base
+        return outs, ((bases << 1) & 7) | FIRST, 1 if bases & THIRD else 0
+    outs += 1
+    if outs == 3:
+        return outs, 0, 0
+    if event == E_SF and bases & THIRD:
+        return outs, bases & ~THIRD, 1
+    if event == E_SACB:
+        return outs, (bases << 1) & 7, 1 if bases & THIRD else 0
+    return outs, bases, 0
+
+
+def _build_model():
+    # moves[e, i, j] = 1 when event e takes live state i to state j; runs[e, i] = runs it scores
+    moves = np.zeros((len(EVENTS), STATES, STATES + 1))
+    runs = np.zeros((len(EVENTS), STATES))
+    for event in range(len(EVENTS)):
+        for state in range(STATES):
+            outs, bases, scored = _transition(state // 8, state % 8, event)
+            moves[event, state, INNING_OVER if outs == 3 else outs * 8 + bases] = 1
+            runs[event, state] = scored
+    return moves, runs
+
+
+MOVES, RUNS = _build_model()
+
+
+# Function to turn player rows into per-plate-appearance event rates
+def event_rates(df):
+    """
+    Parameters:
+    df (DataFrame): Player rows with the bootstrap.INPUT_COLUMNS, and ROE if
+        the table has it.
+
+    Returns:
+    ndarray: (players, len(EVENTS)) rates; each row sums to 1, or is all zero
+    for a player with no plate appearances.
+    """
+    count = dict(zip(OUTCOMES, outcome_counts(df).T))
+    roe = df['ROE'].fillna(0).to_numpy(dtype=np.int64) if 'ROE' in df.columns else np.zeros(len(df), np.int64)
+    # Reached on error is counted in AB - Hits - K, with the outs in play
+    roe = np.minimum(np.maximum(roe, 0), count["Out"])
+    events = np.column_stack([
+        count["1B"], count["2B"], count["3B"], count["HR"], count["BB"] + count["HBP"], roe,
+        count["SF"], count["SACB"], count["K"] + count["Out"] - roe,
+    ]).astype(np.float64)
+    totals = events.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(totals > 0, events / totals, 0.0)
+
+
+def _inning_tables(rates, lineups, tolerance, max_batters):
+    # For lineups (L, 9) and each leadoff slot s: expected runs of the inning
+    # (L, 9) and the probability that slot k leads off the next one (L, 9, 9)
+    count, size = lineups.shape
+    rows = count * size
+    # Per-player transitions mixed over the events, with the expected runs from each state as a last column
+    transitions = np.concatenate([np.einsum('pe,eij->pij', rates, MOVES), (rates @ RUNS)[:, :, None]], axis=2)
+
+    # Row (l, b) holds the innings of lineup l whose batter up is slot b, so a
+    # row's batter never changes; rows are sorted by player so each step is one
+    # matrix product per player. After the plate appearance the innings move to
+    # row (l, b + 1): a fixed reordering of the rows.
+    players = lineups.ravel()
+    order = np.argsort(players, kind="stable")
+    bounds = np.searchsorted(players[order], np.arange(len(rates) + 1)).tolist()
+    position = np.empty(rows, dtype=np.intp)
+    position[order] = np.arange(rows)
+    previous = position[order - order % size + (order - 1) % size]
+
+    state = np.zeros((rows, STATES))
+    state[:, 0] = 1.0
+    after = np.empty((rows, STATES + 2))
+    unsorted = np.empty(rows)
+    runs = np.zeros((count, size))
+    next_leadoff = np.zeros((count, size, size))
+    lineup_rows = np.arange(count)[:, None]
+    slots = np.arange(size)
+    for t in range(max_batters):
+        for player, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+            if stop > start:
+                np.matmul(state[start:stop], transitions[player], out=after[start:stop])
+        # The innings in row (l, b) after t batters were led off by slot b - t
+        unsorted[order] = after[:, -1]
+        runs += np.roll(unsorted.reshape(count, size), -t, axis=1)
+        unsorted[order] = after[:, INNING_OVER]
+        next_leadoff[lineup_rows, (slots - t) % size, (slots + 1) % size] += unsorted.reshape(count, size)
+        state = after[previous, :STATES]
+        if state.sum(axis=1).max() < tolerance:
+            break
+    else:
+        # Innings still going after max_batters: the next batter up leads off
+        unsorted[order] = state.sum(axis=1)
+        next_leadoff[lineup_rows, (slots - max_batters) % size, slots] += unsorted.reshape(count, size)
+    return runs, next_leadoff
+
+
+# Function to score lineups by expected runs per game
+def expected_runs(rates, lineups, innings=DEFAULT_INNINGS, tolerance=1e-10, max_batters=60):
+    """
+    Parameters:
+    rates (ndarray): (players, len(EVENTS)) from event_rates.
+    lineups (array-like): (L, batters) player indices into rates, in batting order.
+    innings (int): Innings per game.
+    tolerance (float): Stop following an inning once less than this
+        probability of it is still going.
+    max_batters (int): Most batters followed in one inning.
+
+    Returns:
+    ndarray: (L,) expected runs per game.
+    """
+    lineups = np.atleast_2d(np.asarray(lineups, dtype=np.intp))
+    scores = np.empty(len(lineups))
+    with instrument.stage("lineup") as record:
+        for start in range(0, len(lineups), BLOCK):
+            block = lineups[start:start + BLOCK]
+            runs, next_leadoff = _inning_tables(rates, block, tolerance, max_batters)
+            leadoff = np.zeros(runs.shape)
+            leadoff[:, 0] = 1.0
+            total = np.zeros(len(block))
+            for _ in range(innings):
+                total += (leadoff * runs).sum(axis=1)
+                leadoff = np.einsum('ls,lsk->lk', leadoff, next_leadoff)
+            scores[start:start + BLOCK] = total
+        record.add(rows=len(lineups))
+    return scores
+
+
+def _top(lineups, scores, top):
+    order = np.argsort(-scores, kind="stable")[:top]
+    return [(lineups[i].tolist(), float(scores[i])) for i in order]
+
+
+# Function to score every order that starts with a given prefix (runs in a worker process)
+def score_orders(rates, players, prefix, innings, top):
+    """
+    Returns:
+    list: Up to top (lineup, runs) pairs, best first; lineups index rates.
+    """
+    rest = [player for player in players if player not in prefix]
+    lineups = np.array([list(prefix) + list(order) for order in itertools.permutations(rest)], dtype=np.intp)
+    return _top(lineups, expected_runs(rates, lineups, innings), top)
+
+
+# Function to hill-climb from one random lineup (runs in a worker process)
+def climb(rates, players, seed, innings, top, size=LINEUP_SIZE):
+    """
+    Each round scores every lineup one move away, in one batch: two batters
+    swapped, or one batter replaced by a bench player. The best of them is
+    taken while it scores more runs.
+
+    Returns:
+    list: Up to top (lineup, runs) pairs seen, best first.
+    """
+    rng = np.random.default_rng(seed)
+    players = np.asarray(players, dtype=np.intp)
+    current = rng.permutation(players)
+    lineup, bench = current[:size], current[size:]
+    best = float(expected_runs(rates, lineup[None], innings)[0])
+    seen = {tuple(lineup.tolist()): best}
+    swaps = list(itertools.combinations(range(size), 2))
+    while True:
+        neighbours = np.repeat(lineup[None], len(swaps) + size * len(bench), axis=0)
+        for row, (a, b) in enumerate(swaps):
+            neighbours[row, [a, b]] = lineup[[b, a]]
+        for row, (slot, sub) in enumerate(itertools.product(range(size), bench), start=len(swaps)):
+            neighbours[row, slot] = sub
+        scores = expected_runs(rates, neighbours, innings)
+        seen.update(zip(map(tuple, neighbours.tolist()), scores.tolist()))
+        choice = int(np.argmax(scores))
+        if scores[choice] <= best + 1e-12:
+            break
+        best = float(scores[choice])
+        lineup = neighbours[choice]
+        bench = np.setdiff1d(players, lineup)
+    ranked = sorted(seen.items(), key=lambda item: -item[1])[:top]
+    return [(list(order), runs) for order, runs in ranked]
+
+
+def _run(function, arguments, workers):
+    if workers == 1 or len(arguments) <= 1:
+        return [function(*args) for args in arguments]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, *zip(*arguments)))
+
+
+# Function to search for the batting orders that score the most runs
+def search_lineups(rates, players=None, exhaustive=None, starts=DEFAULT_STARTS, seed=0, workers=1,
+                   innings=DEFAULT_INNINGS, top=5, size=LINEUP_SIZE):
+    """
+    Parameters:
+    rates (ndarray): (players, len(EVENTS)) from event_rates.
+    players (list): Indices into rates to choose from (default: all).
+    exhaustive (bool): Score every order; needs exactly size players. Default:
+        exhaustive when there are exactly size players, else hill climbing.
+    starts (int): Random starting lineups for hill climbing.
+    seed (int): Base seed for the starting lineups.
+    workers (int): Worker processes; 1 runs in this process, None uses all CPUs.
+
+    Returns:
+    list: Up to top distinct (lineup, runs per game) pairs, best first.
+
+    Raises:
+    ValueError: With fewer than size players, or exhaustive with more.
+    """
+    players = list(range(len(rates))) if players is None else list(players)
+    if len(players) < size:
+        raise ValueError(f"A lineup needs {size} players with plate appearances, only {len(players)} given.")
+    if exhaustive is None:
+        exhaustive = len(players) == size
+    if exhaustive and len(players) != size:
+        raise ValueError(f"An exhaustive search orders exactly {size} players, {len(players)} given.")
+
+    if exhaustive:
+        # One task per choice of the first two batters
+        arguments = [(rates, players, prefix, innings, top) for prefix in itertools.permutations(players, 2)]
+        results = _run(score_orders, arguments, workers)
+    else:
+        seeds = np.random.SeedSequence(seed).spawn(starts)
+        results = _run(climb, [(rates, players, child, innings, top, size) for child in seeds], workers)
+    found = {}
+    for lineup, runs in itertools.chain.from_iterable(results):
+        found[tuple(lineup)] = runs
+    return [(list(lineup), runs) for lineup, runs in sorted(found.items(), key=lambda item: -item[1])[:top]]
+
+
+# Function to hash a roster's rates and the search settings
+def roster_key(names, rates, **settings):
+    digest = hashlib.sha1(json.dumps([MODEL_VERSION, list(names), settings], sort_keys=True).encode())
+    digest.update(np.ascontiguousarray(rates, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+# Search results of one store, cached by roster hash
+class LineupCache:
+    def __init__(self, store, cache_directory=None):
+        if cache_directory is None:
+            base = store.directory if isinstance(store, CsvStore) else os.path.dirname(os.path.abspath(store.path))
+            cache_directory = os.path.join(base, CACHE_DIRECTORY)
+        self.cache_directory = cache_directory
+
+    def _path(self, key):
+        return os.path.join(self.cache_directory, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, result):
+        with atomic_io.atomic_path(self._path(key)) as path, open(path, "w", encoding="utf-8") as handle:
+            json.dump(result, handle)
+
+
+# Function to find the best batting orders for a team's roster, through the cache
+def best_lineups(roster, cache=None, lineup=None, exhaustive=None, starts=DEFAULT_STARTS, seed=0, workers=1,
+                 innings=DEFAULT_INNINGS, top=5):
+    """
+    Parameters:
+    roster (DataFrame): One team's player rows, with Name.
+    cache (LineupCache): Where to look up and save results, or None.
+    lineup (list): Player names to order; default: search the whole roster.
+
+    Returns:
+    list: Up to top (names, runs per game) pairs, best first.
+
+    Raises:
+    ValueError: For unknown names or too few players with plate appearances.
+    """
+    names = roster['Name'].tolist()
+    if lineup is not None:
+        missing = [name for name in lineup if name not in names]
+        if missing:
+            raise ValueError(f"Not on the roster: {', '.join(missing)}")
+        names = list(lineup)
+        roster = roster.set_index('Name').loc[names].reset_index()
+    rates = event_rates(roster)
+    usable = (rates.sum(axis=1) > 0) & roster[INPUT_COLUMNS].notna().all(axis=1).to_numpy()
+    players = np.flatnonzero(usable)
+
+    # Sorted so the same players in any row order share a cache entry
+    order = sorted(players, key=lambda player: names[player])
+    key_names = [names[player] for player in order]
+    key = roster_key(key_names, rates[order], exhaustive=exhaustive, starts=starts, seed=seed,
+                     innings=innings, top=top)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        return [(lineup_names, runs) for lineup_names, runs in cached]
+
+    found = search_lineups(rates[order], exhaustive=exhaustive, starts=starts, seed=seed, workers=workers,
+                           innings=innings, top=top)
+    result = [([key_names[player] for player in lineup_order], runs) for lineup_order, runs in found]
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("team")
+    parser.add_argument("--store", default=os.environ.get("STATS_STORE", "output_data"))
+    parser.add_argument("--lineup", nargs="+", metavar="NAME",
+                        help="Score these players in this order (with --exhaustive: find their best order)")
+    parser.add_argument("--exhaustive", action="store_true", help="Score every order of the nine --lineup players")
+    parser.add_argument("--starts", type=int, default=DEFAULT_STARTS, help="Random starts for hill climbing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--innings", type=int, default=DEFAULT_INNINGS)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--no-cache", action="store_true")
+    instrument.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument.configure_from_args(args)
+
+    store = open_store(args.store)
+    roster = store.read(teams=[args.team]) if args.team in store.teams() else None
+    if roster is None or roster.empty:
+        parser.error(f"No stats found for team '{args.team}' in '{args.store}'.")
+    roster = roster.drop(columns=[TEAM_COLUMN], errors="ignore").reset_index(drop=True)
+
+    try:
+        if args.lineup and not args.exhaustive:
+            missing = [name for name in args.lineup if name not in set(roster['Name'])]
+            if missing:
+                raise ValueError(f"Not on the roster: {', '.join(missing)}")
+            rates = event_rates(roster.set_index('Name').loc[args.lineup].reset_index())
+            runs = expected_runs(rates, [list(range(len(args.lineup)))], args.innings)[0]
+            print(f"{runs:.3f} expected runs per {args.innings} innings")
+            return 0
+        cache = None if args.no_cache else LineupCache(store)
+        results = best_lineups(roster, cache, args.lineup, exhaustive=True if args.exhaustive else None,
+                               starts=args.starts, seed=args.seed, workers=args.workers, innings=args.innings,
+                               top=args.top)
+    except ValueError as e:
+        parser.error(str(e))
+
+    for rank, (names, runs) in enumerate(results, start=1):
+        print(f"{rank}. {runs:.3f} runs per {args.innings} innings")
+        for slot, name in enumerate(names, start=1):
+            print(f"   {slot}. {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
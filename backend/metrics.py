@@ -0,0 +1,102 @@
+"""
+Vectorized per-player metrics.
+
+Every function takes NumPy arrays or pandas Series (or scalars) and works on
+whole columns at once. Rounding and zero-denominator handling match the
+row-by-row functions in wOBA.py.
+"""
+import numpy as np
+import pandas as pd
+
+# Weight keys used throughout, as in wOBA.mlb_woba_weights
+WEIGHT_KEYS = ['Walks', 'Hit By Pitch', 'Singles', 'Doubles', 'Triples', 'Home Runs']
+
+
+# Function to round like Python's round() on floats, element-wise
+def round_like_python(values, decimals):
+    """
+    np.round scales, rounds and unscales, which can land on the other side of
+    a tie than Python's correctly rounded round() (e.g. 2.675 -> 2.68 instead
+    of 2.67). Values close enough to a tie to be affected are re-rounded with
+    round(); everything else keeps the vectorized result, which is identical.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, decimals)
+    scaled = values * (10.0 ** decimals)
+    with np.errstate(invalid='ignore'):
+        near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded = np.array(rounded, copy=True, ndmin=1)
+        flat = rounded.reshape(-1)
+        source = values.reshape(-1)
+        for i in np.flatnonzero(near_tie.reshape(-1)):
+            flat[i] = round(float(source[i]), decimals)
+        rounded = rounded.reshape(values.shape)
+    return rounded
+
+
+# Function to count singles from hits and extra-base hits
+def singles(hits, doubles, triples, hr):
+    return hits - doubles - triples - hr
+
+
+# Function to calculate wOBA for many players at once
+def woba(bb, hbp, singles, doubles, triples, hr, ab, sf, weights, decimals=3, zero_denominator=0.0):
+    """
+    Parameters:
+    bb, hbp, singles, doubles, triples, hr, ab, sf: Counting stats, as arrays
+    or Series of equal length (or scalars).
+    weights (dict): Weights keyed like wOBA.mlb_woba_weights.
+    decimals (int or None): Round to this many places; None leaves the raw value.
+    zero_denominator (float or None): Value for players with AB + BB + HBP + SF
+    of zero; None keeps the IEEE result (NaN or inf).
+
+    Returns:
+    ndarray: wOBA per player.
+    """
+    bb, hbp, singles, doubles, triples, hr, ab, sf = (
+        np.asarray(column, dtype=np.float64) for column in (bb, hbp, singles, doubles, triples, hr, ab, sf)
+    )
+    # Same term order as the row-wise version so results are bit-identical
+    numerator = (
+        weights['Walks'] * bb +
+        weights['Hit By Pitch'] * hbp +
+        weights['Singles'] * singles +
+        weights['Doubles'] * doubles +
+        weights['Triples'] * triples +
+        weights['Home Runs'] * hr
+    )
+    denominator = ab + bb + hbp + sf
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = numerator / denominator
+    if zero_denominator is not None:
+        result = np.where(denominator == 0, zero_denominator, result)
+    if decimals is not None:
+        result = round_like_python(result, decimals)
+    return result
+
+
+# Function to calculate wRAA for many players at once
+def wraa(woba, pa, league_woba, woba_scale, decimals=2):
+    woba = np.asarray(woba, dtype=np.float64)
+    pa = np.asarray(pa, dtype=np.float64)
+    result = ((woba - league_woba) / woba_scale) * pa
+    if decimals is not None:
+        result = round_like_python(result, decimals)
+    return result
+
+
+# Function to calculate wOBA from a DataFrame's Hits/Doubles/Triples/HR/BB/HBP/AB/SF columns
+def woba_column(df, weights, decimals=3, zero_denominator=0.0):
+    values = woba(
+        df['BB'], df['HBP'], singles(df['Hits'], df['Doubles'], df['Triples'], df['HR']),
+        df['Doubles'], df['Triples'], df['HR'], df['AB'], df['SF'],
+        weights, decimals=decimals, zero_denominator=zero_denominator,
+    )
+    return pd.Series(values, index=df.index, name='wOBA')
+
+
+# Function to calculate wRAA from a DataFrame's wOBA and PA columns
+def wraa_column(df, league_woba, woba_scale, decimals=2):
+    values = wraa(df['wOBA'], df['PA'], league_woba, woba_scale, decimals=decimals)
+    return pd.Series(values, index=df.index, name='wRAA')
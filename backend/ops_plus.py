@@ -0,0 +1,44 @@
+import pandas as pd
+import os
+
+from .derived import DerivedColumns
+from .league_totals import COUNTING_STATS, aggregate_league
+from .stats_store import open_store
+
+# Function to calculate OPS+ for each player and add it to each CSV file
+def add_ops_plus_to_files():
+    output_directory = "output_data"
+
+    # Only the counting stats and OBP/SLG are needed, and they are read once
+    store = open_store(os.environ.get("STATS_STORE", output_directory))
+    with store.transaction():
+        _update_ops_plus(store, output_directory)
+
+def _update_ops_plus(store, output_directory):
+    df = store.read(columns=COUNTING_STATS + ['OBP', 'SLG'])
+    if df.empty:
+        print(f"No team stats found in '{output_directory}'. Cannot calculate OPS+.")
+        return
+
+    totals = aggregate_league(df)
+    league_ops = totals.ops
+    if pd.isna(league_ops) or league_ops == 0:
+        print("Invalid league OPS value. Cannot calculate OPS+.")
+        return
+
+    print(f"Using league OPS of {league_ops:.3f} to calculate OPS+ for each player.")
+
+    # OPS and OPS+ come from the derived-column cache; only teams whose values changed are rewritten
+    teams = DerivedColumns(store).materialize(['OPS', 'OPS+'], totals=totals)
+    for team in teams:
+        print(f"OPS+ added for team: {team}")
+    if not teams:
+        print("OPS and OPS+ are up to date.")
+
+def main():
+    add_ops_plus_to_files()
+
+
+# Add OPS+ to each player's CSV file when run as a script
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 
+from . import atomic_io, instrument, metrics
+from .charts import TEAM_CHARTS, draw_team_chart, team_summary
+from .league_totals import aggregate_league
+from .player_keys import align_additional
+from .validation import validate_lines
+
 # Function to parse initial raw baseball data (up to "HR" and "GS")
 def parse_baseball_data(raw_data):
     rows = raw_data.strip().split("\n")
@@ -160,73 +164,103 @@ def calculate_woba(df, wBB, wHBP, w1B, w2B, w3B, wHR):
     DataFrame: Updated DataFrame with the 'wOBA' column added.
     """
     # Calculate the number of singles (1B) for each player
-    df['1B'] = df['Hits'] - df['Doubles'] - df['Triples'] - df['HR']
-
-    # Calculate wOBA using the custom weights
-    df['wOBA'] = (
-        (wBB * df['BB']) +
-        (wHBP * df['HBP']) +
-        (w1B * df['1B']) +
-        (w2B * df['Doubles']) +
-        (w3B * df['Triples']) +
-        (wHR * df['HR'])
-    ) / (df['AB'] + df['BB'] + df['HBP'] + df['SF'])
+    df['1B'] = metrics.singles(df['Hits'], df['Doubles'], df['Triples'], df['HR'])
+
+    # Calculate unrounded wOBA using the custom weights; a zero denominator is left as NaN/inf
+    weights = dict(zip(metrics.WEIGHT_KEYS, (wBB, wHBP, w1B, w2B, w3B, wHR)))
+    df['wOBA'] = metrics.woba(
+        df['BB'], df['HBP'], df['1B'], df['Doubles'], df['Triples'], df['HR'], df['AB'], df['SF'],
+        weights, decimals=None, zero_denominator=None,
+    )
 
     return df
 
+# Function to merge a team's additional data into its basic data and add ISOP and BABIP
+def merge_additional_data(existing_df, new_df):
+    with instrument.stage("merge") as record:
+        # Line the additional rows up with the basic rows by player key instead of
+        # an outer join, and report rows that don't match instead of adding them
+        existing_df, report = align_additional(existing_df, new_df)
+
+        # Calculate and add the ISOP column (SLG - AVG) and round to 3 decimal places
+        existing_df["ISOP"] = (existing_df["SLG"] - existing_df["AVG"]).round(3)
+
+        # Calculate and add the BABIP column and round to 3 decimal places
+        # BABIP = (H - HR) / (AB - K - HR + SF)
+        existing_df["BABIP"] = (
+            (existing_df["Hits"] - existing_df["HR"]) /
+            (existing_df["AB"] - existing_df["K"] - existing_df["HR"] + existing_df["SF"])
+        ).fillna(0).round(3)  # Fill NaN values with 0 if the denominator is zero or if there are missing values
+        record.add(rows=len(existing_df))
+
+    if not report.clean:
+        print(report.summary())
+    return existing_df
+
+# Function to aggregate the league-wide totals used for the custom wOBA weights
+def aggregate_league_totals(team_dataframes):
+    return aggregate_league(team_dataframes.values()).woba_inputs()
+
+# Function to compute the league totals and wOBA weights once and add wOBA to every team
+def apply_league_woba(team_dataframes):
+    """
+    Aggregate league totals across all teams, derive the custom wOBA weights
+    and add the 1B and wOBA columns to each team's DataFrame in place.
+
+    Parameters:
+    team_dataframes (dict): Team name to merged DataFrame.
+
+    Returns:
+    tuple: Custom weights for BB, HBP, 1B, 2B, 3B, HR.
+    """
+    league_totals = aggregate_league_totals(team_dataframes)
+
+    # Calculate custom wOBA weights based on the league-wide statistics
+    with instrument.stage("woba_weights"):
+        weights = calculate_woba_weights(league_totals)
+    wBB, wHBP, w1B, w2B, w3B, wHR = weights
+
+    print("Custom wOBA Weights Calculated:")
+    print(f"wBB: {wBB}, wHBP: {wHBP}, w1B: {w1B}, w2B: {w2B}, w3B: {w3B}, wHR: {wHR}")
+
+    # Calculate wOBA for each player in every team
+    with instrument.stage("woba") as record:
+        for team, df in team_dataframes.items():
+            team_dataframes[team] = calculate_woba(df, wBB, wHBP, w1B, w2B, w3B, wHR)
+            record.add(rows=len(df))
+
+    return weights
+
 def visualize_team_statistics(team_dataframes):
+    # Plotting libraries are slow to import, so load them only when plotting
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     # Check if there are any teams
     if not team_dataframes:
         print("No team data available to visualize.")
         return
 
-    # Create a DataFrame to store aggregated team statistics
-    team_stats = []
-
-    for team, df in team_dataframes.items():
-        total_runs = df['R'].sum()
-        total_hr = df['HR'].sum()
-        avg_batting_avg = df['AVG'].mean()
-
-        team_stats.append({
-            'Team': team,
-            'Total Runs': total_runs,
-            'Total Home Runs': total_hr,
-            'Average Batting Average': avg_batting_avg
-        })
-
-    # Convert to DataFrame
-    team_stats_df = pd.DataFrame(team_stats)
+    # Aggregate team statistics (see charts.py for headless rendering to files)
+    league_df = pd.concat([df.assign(Team=team) for team, df in team_dataframes.items()], ignore_index=True)
+    team_stats_df = team_summary(league_df)
 
     # Set the style of the plots
     sns.set(style="whitegrid")
 
-    # Bar plot for total runs per team
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x='Team', y='Total Runs', data=team_stats_df, palette='Blues_d')
-    plt.title('Total Runs by Team')
-    plt.ylabel('Total Runs')
-    plt.xlabel('Team')
-    plt.xticks(rotation=45)
-    plt.show()
-
-    # Bar plot for total home runs per team
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x='Team', y='Total Home Runs', data=team_stats_df, palette='Reds_d')
-    plt.title('Total Home Runs by Team')
-    plt.ylabel('Total Home Runs')
-    plt.xlabel('Team')
-    plt.xticks(rotation=45)
-    plt.show()
-
-    # Bar plot for average batting average per team
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x='Team', y='Average Batting Average', data=team_stats_df, palette='Greens_d')
-    plt.title('Average Batting Average by Team')
-    plt.ylabel('Average Batting Average')
-    plt.xlabel('Team')
-    plt.xticks(rotation=45)
-    plt.show()
+    # Bar plots for total runs, total home runs and average batting average per team
+    for _, column, title, palette in TEAM_CHARTS:
+        _, ax = plt.subplots(figsize=(10, 6))
+        draw_team_chart(ax, team_stats_df, column, title, palette)
+        plt.show()
+
+# Function to read pasted lines from the prompt until a 'done' line
+def read_lines_until_done():
+    while True:
+        line = input()
+        if line.lower() == 'done':
+            return
+        yield line
 
 # Function to manage user input and create new DataFrames
 def manage_dataframes():
@@ -255,36 +289,23 @@ def manage_dataframes():
                 print("Enter additional player data (with OBP, SLG, OPS). Type 'done' on a new line to finish:")
             
             while True:
-                new_raw_data = ""
-                while True:
-                    line = input()
-                    if line.lower() == 'done':
-                        break
-                    new_raw_data += line + "\n"
+                lines = read_lines_until_done()
+                new_df, report = validate_lines(lines, kind="basic" if existing_df is None else "additional")
+                if not report.clean:
+                    print(report.summary())
+                # A 'quit' line stops parsing early; consume the rest of the paste up to 'done'
+                for _ in lines:
+                    pass
 
                 if existing_df is None:
-                    new_df = parse_baseball_data(new_raw_data)
                     if not new_df.empty:
                         team_dataframes[team_name] = new_df
                         break
                     else:
                         print("No valid rows were entered. Please try again.")
                 else:
-                    new_df = parse_additional_data(new_raw_data)
                     if not new_df.empty:
-                        existing_df = pd.merge(existing_df, new_df, on=["Number", "Name", "Games"], how='outer')
-                        
-                        # Calculate and add the ISOP column (SLG - AVG) and round to 3 decimal places
-                        existing_df["ISOP"] = (existing_df["SLG"] - existing_df["AVG"]).round(3)
-
-                        # Calculate and add the BABIP column and round to 3 decimal places
-                        # BABIP = (H - HR) / (AB - K - HR + SF)
-                        existing_df["BABIP"] = (
-                            (existing_df["Hits"] - existing_df["HR"]) /
-                            (existing_df["AB"] - existing_df["K"] - existing_df["HR"] + existing_df["SF"])
-                        ).fillna(0).round(3)  # Fill NaN values with 0 if the denominator is zero or if there are missing values
-                        
-                        team_dataframes[team_name] = existing_df
+                        team_dataframes[team_name] = merge_additional_data(existing_df, new_df)
                         break
                     else:
                         print("No valid rows were entered. Please try again.")
@@ -294,37 +315,19 @@ def manage_dataframes():
 
             # Save the team's DataFrame to a CSV file
             output_path = os.path.join(output_directory, f"{team_name}_stats.csv")
-            team_dataframes[team_name].to_csv(output_path, index=False)
+            with instrument.stage("write") as record, atomic_io.atomic_path(output_path) as path:
+                team_dataframes[team_name].to_csv(path, index=False)
+                if record:
+                    record.add(rows=len(team_dataframes[team_name]), bytes_written=os.path.getsize(path))
             print(f"Data for team '{team_name}' saved to {output_path}")
 
         elif user_input == 'no':
             print("No more data to add. Calculating league-wide statistics for wOBA...")
-            league_totals = {
-                'BB': 0, 'HBP': 0, '1B': 0, '2B': 0, '3B': 0, 'HR': 0, 'SF': 0, 'PA': 0, 'Runs': 0
-            }
-            # Aggregate league-wide statistics
-            for df in team_dataframes.values():
-                league_totals['BB'] += df['BB'].sum()
-                league_totals['HBP'] += df['HBP'].sum()
-                league_totals['1B'] += (df['Hits'] - df['Doubles'] - df['Triples'] - df['HR']).sum()
-                league_totals['2B'] += df['Doubles'].sum()
-                league_totals['3B'] += df['Triples'].sum()
-                league_totals['HR'] += df['HR'].sum()
-                league_totals['SF'] += df['SF'].sum()
-                league_totals['PA'] += df['PA'].sum()
-                league_totals['Runs'] += df['R'].sum()
-
-            # Calculate custom wOBA weights based on the league-wide statistics
-            wBB, wHBP, w1B, w2B, w3B, wHR = calculate_woba_weights(league_totals)
-
-            print("Custom wOBA Weights Calculated:")
-            print(f"wBB: {wBB}, wHBP: {wHBP}, w1B: {w1B}, w2B: {w2B}, w3B: {w3B}, wHR: {wHR}")
-
-            # Calculate wOBA for each player in every team
+            apply_league_woba(team_dataframes)
+
             for team, df in team_dataframes.items():
-                team_dataframes[team] = calculate_woba(df, wBB, wHBP, w1B, w2B, w3B, wHR)
                 print(f"\nUpdated DataFrame with wOBA for team '{team}':")
-                print(team_dataframes[team])
+                print(df)
 
             break
         else:
@@ -332,5 +335,10 @@ def manage_dataframes():
 
     return team_dataframes
 
+def main():
+    return manage_dataframes()
+
+
 # Call the function to manage multiple DataFrames
-team_dataframes = manage_dataframes()
+if __name__ == "__main__":
+    team_dataframes = main()
@@ -0,0 +1,176 @@
+"""
+Integer player keys and key-indexed alignment of the two stat pastes.
+
+The basic paste (up to HR and GS) and the additional paste (SF through OPS)
+describe the same players. Instead of an outer join on Number, Name and Games,
+each row gets a 64-bit key from its team, jersey number and normalized name,
+and the additional rows are looked up by key for every basic row. Rows that do
+not line up are reported rather than turned into extra half-empty rows.
+
+    merged, report = align_additional(basic_df, additional_df)
+    if not report.clean:
+        print(report.summary())
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .stats_store import TEAM_COLUMN
+
+KEY_COLUMNS = ["Number", "Name", "Games"]
+
+# Players listed per problem in AlignmentReport.summary()
+SUMMARY_PLAYERS = 10
+
+
+# Byte lookup tables for normalization: ASCII upper case maps to lower case;
+# ASCII letters, digits, UTF-8 continuation bytes and the separator are kept
+_LOWER = np.arange(256, dtype=np.uint8)
+_LOWER[ord("A"):ord("Z") + 1] += ord("a") - ord("A")
+_KEEP = np.zeros(256, dtype=bool)
+for _low, _high in (("0", "9"), ("a", "z"), ("A", "Z")):
+    _KEEP[ord(_low):ord(_high) + 1] = True
+_KEEP[0x80:] = True
+_SEPARATOR = "\0"
+_KEEP[ord(_SEPARATOR)] = True
+
+
+# Function to normalize names so formatting differences don't split a player
+def normalize_names(names):
+    """
+    'R. Winsor(Sr)', 'R.  Winsor (Sr)' and 'r. winsor(SR)' all normalize to
+    'rwinsorsr': lower case, with everything but letters and digits removed.
+    All names are joined and filtered in one pass over their bytes rather than
+    with a regex per name.
+
+    Returns:
+    list: Normalized names, in order.
+    """
+    if len(names) == 0:
+        return []
+    raw = np.frombuffer(_SEPARATOR.join(names).encode(), dtype=np.uint8)
+    return _LOWER[raw[_KEEP[raw]]].tobytes().decode().split(_SEPARATOR)
+
+
+def _field_codes(frames, column, normalize=False):
+    values = np.concatenate([df[column].astype(str).to_numpy(dtype=object) for df in frames])
+    codes, uniques = pd.factorize(values)
+    if normalize:
+        # Both pastes repeat the same names, so only distinct names are normalized
+        normalized_codes, uniques = pd.factorize(np.array(normalize_names(uniques), dtype=object))
+        codes = normalized_codes[codes]
+    return codes, len(uniques)
+
+
+# Function to build integer player keys shared across frames
+def player_keys(*frames):
+    """
+    Parameters:
+    frames (DataFrame): Parsed rows with Number and Name (and optionally Team).
+
+    Returns:
+    list: One int64 array per frame. Rows with the same team, jersey number and
+    normalized name get the same key, in every frame; keys are dense (0, 1,
+    2, ...) so they can index arrays directly.
+    """
+    lengths = [len(df) for df in frames]
+    codes = np.zeros(sum(lengths), dtype=np.int64)
+    if len(codes):
+        fields = [_field_codes(frames, "Number"), _field_codes(frames, "Name", normalize=True)]
+        if all(TEAM_COLUMN in df.columns for df in frames):
+            fields.insert(0, _field_codes(frames, TEAM_COLUMN))
+        for field_codes, cardinality in fields:
+            # Re-densify after each field so the combined codes can't overflow
+            codes = pd.factorize(codes * cardinality + field_codes)[0].astype(np.int64, copy=False)
+    return np.split(codes, np.cumsum(lengths)[:-1])
+
+
+# Rows of the two pastes that could not be matched one to one
+@dataclass(frozen=True)
+class AlignmentReport:
+    unmatched_additional: pd.DataFrame = field(default_factory=pd.DataFrame)
+    missing_additional: pd.DataFrame = field(default_factory=pd.DataFrame)
+    duplicate_basic: pd.DataFrame = field(default_factory=pd.DataFrame)
+    duplicate_additional: pd.DataFrame = field(default_factory=pd.DataFrame)
+    games_mismatch: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+    @property
+    def clean(self):
+        return all(
+            frame.empty for frame in (
+                self.unmatched_additional, self.missing_additional, self.duplicate_basic,
+                self.duplicate_additional, self.games_mismatch,
+            )
+        )
+
+    def summary(self):
+        lines = []
+        for label, frame in (
+            ("Additional rows with no matching player (dropped)", self.unmatched_additional),
+            ("Players with no additional row (left blank)", self.missing_additional),
+            ("Duplicate players in the basic paste (first kept)", self.duplicate_basic),
+            ("Duplicate players in the additional paste (first kept)", self.duplicate_additional),
+            ("Players whose Games differ between pastes (basic kept)", self.games_mismatch),
+        ):
+            if not frame.empty:
+                shown = frame.head(SUMMARY_PLAYERS)
+                players = ", ".join(f"{number} {name}" for number, name in zip(shown["Number"], shown["Name"]))
+                if len(frame) > SUMMARY_PLAYERS:
+                    players += f" and {len(frame) - SUMMARY_PLAYERS} more"
+                lines.append(f"{label}: {players}")
+        return "\n".join(lines)
+
+
+def _players(df, mask):
+    return df.loc[mask, ["Number", "Name"]].reset_index(drop=True)
+
+
+# Function to attach the additional stats to the basic rows by player key
+def align_additional(basic_df, additional_df):
+    """
+    Parameters:
+    basic_df (DataFrame): Parsed basic rows.
+    additional_df (DataFrame): Parsed additional rows for the same team.
+
+    Returns:
+    tuple: (DataFrame with one row per basic player and the additional stat
+    columns, AlignmentReport). Rows keep the order of the basic paste, and
+    int columns stay int when every player was matched.
+    """
+    basic_keys, additional_keys = player_keys(basic_df, additional_df)
+
+    duplicate_basic = pd.Series(basic_keys).duplicated().to_numpy()
+    duplicate_additional = pd.Series(additional_keys).duplicated().to_numpy()
+    basic = basic_df[~duplicate_basic].reset_index(drop=True)
+    basic_keys = basic_keys[~duplicate_basic]
+
+    # Row of the additional paste for every key (-1 if it has none)
+    lookup = np.full(len(basic_keys) + len(additional_keys), -1, dtype=np.intp)
+    lookup[additional_keys[~duplicate_additional]] = np.flatnonzero(~duplicate_additional)
+    positions = lookup[basic_keys]
+    matched = positions >= 0
+
+    games_mismatch = np.zeros(len(basic), dtype=bool)
+    games_mismatch[matched] = (
+        basic["Games"].to_numpy()[matched] != additional_df["Games"].to_numpy()[positions[matched]]
+    )
+
+    stats = additional_df[[column for column in additional_df.columns if column not in basic.columns]]
+    if matched.all():
+        aligned = stats.iloc[positions].reset_index(drop=True)
+    else:
+        aligned = stats.reset_index(drop=True).reindex(positions).reset_index(drop=True)
+    merged = pd.concat([basic, aligned], axis=1)
+
+    unmatched_additional = ~duplicate_additional
+    unmatched_additional[positions[matched]] = False
+
+    report = AlignmentReport(
+        unmatched_additional=_players(additional_df, unmatched_additional),
+        missing_additional=_players(basic, ~matched),
+        duplicate_basic=_players(basic_df, duplicate_basic),
+        duplicate_additional=_players(additional_df, duplicate_additional),
+        games_mismatch=_players(basic, games_mismatch),
+    )
+    return merged, report
@@ -0,0 +1,241 @@
+"""
+Compact in-memory store for player-season rows.
+
+A parsed league table is mostly small integers and three-decimal rates, but as
+a DataFrame every Number and Name is a Python string and every rate a float64.
+PlayerRecords packs the same table into one structured NumPy array:
+
+- String columns (Team, Number, Name) become dictionary codes (uint8/16/32)
+  into an array of their distinct values, so each string is stored once.
+- Counting stats are int16 when they fit, int32 otherwise.
+- Rates are stored as fixed-point integers (e.g. thousandths for AVG/OBP/SLG)
+  whenever dividing the code by the scale gives back the exact float64, and
+  stay float64 otherwise. NaN is kept through a sentinel code.
+
+Columns decode back to their original dtype and values, so to_frame()
+reproduces the DataFrame it was built from, and records['BB'] can be handed to
+the metrics kernels like a DataFrame column:
+
+    records = PlayerRecords.from_frame(df)
+    woba = metrics.woba_column(records, weights)
+
+The warehouse holds multi-season reads this way (Warehouse.read_records), and
+parse_records packs a paste chunk by chunk as the fast parser reads it.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .fast_parse import DEFAULT_CHUNK_SIZE, iter_parse_chunks
+
+# Decimal places tried for fixed-point rate columns, fewest first
+FIXED_POINT_DECIMALS = range(0, 5)
+
+_INT_CODE_DTYPES = (np.int16, np.int32)
+
+
+def _smallest_int_dtype(low, high):
+    for dtype in _INT_CODE_DTYPES:
+        info = np.iinfo(dtype)
+        # The minimum is reserved as the NaN sentinel
+        if info.min < low and high <= info.max:
+            return dtype
+    return None
+
+
+def _encode_numeric(values):
+    """
+    Returns:
+    tuple: (codes, scale); scale is None when values are stored as float64.
+    """
+    if values.dtype.kind in "iub":
+        if len(values) == 0:
+            return values.astype(np.int16), 1
+        dtype = _smallest_int_dtype(values.min(), values.max())
+        return (values.astype(dtype), 1) if dtype is not None else (values, 1)
+
+    values = values.astype(np.float64, copy=False)
+    missing = np.isnan(values)
+    present = values[~missing]
+    if not np.isfinite(present).all():
+        return values, None
+    for decimals in FIXED_POINT_DECIMALS:
+        scale = 10 ** decimals
+        scaled = np.rint(present * scale)
+        low, high = (scaled.min(), scaled.max()) if len(scaled) else (0, 0)
+        dtype = _smallest_int_dtype(low, high)
+        if dtype is None:
+            break
+        if np.array_equal(scaled / scale, present):
+            codes = np.full(len(values), np.iinfo(dtype).min, dtype=dtype)
+            codes[~missing] = scaled.astype(dtype)
+            return codes, float(scale)
+    return values, None
+
+
+def _code_dtype(categories):
+    return np.min_scalar_type(max(categories - 1, 0))
+
+
+def _decode_numeric(codes, scale, dtype):
+    if scale is None:
+        return np.asarray(codes, dtype=dtype)
+    if isinstance(scale, int):
+        return codes.astype(dtype)
+    values = codes / scale
+    values[codes == np.iinfo(codes.dtype).min] = np.nan
+    return values.astype(dtype, copy=False)
+
+
+# Structured-array store for player-season rows
+class PlayerRecords:
+    def __init__(self, data, categories, scales, dtypes):
+        """
+        Use from_frame() or concat() rather than building this directly.
+
+        Parameters:
+        data (ndarray): Structured array, one field per column.
+        categories (dict): Column to object array of distinct values, for coded columns.
+        scales (dict): Column to int 1 (integer column), float scale
+            (fixed-point rate) or None (stored as float64).
+        dtypes (dict): Column to the dtype it decodes to.
+        """
+        self.data = data
+        self.categories = categories
+        self.scales = scales
+        self.dtypes = dtypes
+
+    @classmethod
+    def from_frame(cls, df):
+        fields = []
+        arrays = []
+        categories = {}
+        scales = {}
+        dtypes = {}
+        for column in df.columns:
+            values = df[column].to_numpy()
+            dtypes[column] = df[column].dtype
+            if values.dtype == object:
+                codes, uniques = pd.factorize(values)
+                categories[column] = np.asarray(uniques, dtype=object)
+                codes = codes.astype(_code_dtype(len(uniques)))
+                scales[column] = None
+            else:
+                codes, scales[column] = _encode_numeric(values)
+            fields.append((column, codes.dtype))
+            arrays.append(codes)
+
+        data = np.empty(len(df), dtype=fields)
+        for (column, _), codes in zip(fields, arrays):
+            data[column] = codes
+        return cls(data, categories, scales, dtypes)
+
+    @classmethod
+    def concat(cls, parts):
+        """
+        Combine several PlayerRecords with the same columns (e.g. one per
+        season or league) into one, merging their category dictionaries.
+        """
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            raise ValueError("Nothing to concatenate.")
+        first = parts[0]
+        if any(part.columns != first.columns for part in parts):
+            raise ValueError("All parts must have the same columns.")
+
+        columns = {}
+        categories = {}
+        scales = {}
+        for column in first.columns:
+            if column in first.categories:
+                uniques = pd.Index(pd.unique(np.concatenate([part.categories[column] for part in parts])))
+                code_dtype = _code_dtype(len(uniques))
+                columns[column] = np.concatenate([
+                    uniques.get_indexer(part.categories[column]).astype(code_dtype)[part.data[column]]
+                    for part in parts
+                ])
+                categories[column] = np.asarray(uniques, dtype=object)
+                scales[column] = None
+            elif len({(part.data.dtype[column], part.scales[column]) for part in parts}) == 1:
+                columns[column] = np.concatenate([part.data[column] for part in parts])
+                scales[column] = first.scales[column]
+            else:
+                # Stored differently in different parts: decode and encode again
+                values = np.concatenate([part[column] for part in parts])
+                columns[column], scales[column] = _encode_numeric(values)
+
+        data = np.empty(sum(len(part) for part in parts), dtype=[(c, a.dtype) for c, a in columns.items()])
+        for column, values in columns.items():
+            data[column] = values
+        return cls(data, categories, scales, dict(first.dtypes))
+
+    @property
+    def columns(self):
+        return list(self.data.dtype.names)
+
+    @property
+    def index(self):
+        return pd.RangeIndex(len(self))
+
+    @property
+    def nbytes(self):
+        """
+        Bytes held by the records and their category dictionaries (including
+        the Python objects in them).
+        """
+        category_bytes = sum(
+            values.nbytes + sum(sys.getsizeof(value) for value in values)
+            for values in self.categories.values()
+        )
+        return self.data.nbytes + category_bytes
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, column):
+        """
+        The decoded column as a NumPy array: strings as objects, numbers in
+        their original dtype.
+        """
+        if column not in self.dtypes:
+            raise KeyError(column)
+        codes = self.data[column]
+        if column in self.categories:
+            return self.categories[column][codes]
+        return _decode_numeric(codes, self.scales[column], self.dtypes[column])
+
+    def take(self, rows):
+        """
+        The records at the given positions (or boolean mask), sharing the
+        category dictionaries.
+        """
+        return PlayerRecords(self.data[rows], self.categories, self.scales, self.dtypes)
+
+    def to_frame(self, columns=None):
+        """
+        Decode back into a DataFrame with the original columns and dtypes.
+        """
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({
+            column: pd.Series(self[column], dtype=self.dtypes[column], copy=False) for column in columns
+        })
+
+
+# Function to parse a stream of lines straight into PlayerRecords
+def parse_records(lines, kind="basic", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Like fast_parse.parse_lines, but each chunk is packed as soon as it is
+    parsed, so only one chunk is ever held as a DataFrame.
+
+    Returns:
+    PlayerRecords or None: None if no rows were parsed or the input was
+    abandoned with 'quit'.
+    """
+    parts = []
+    for chunk in iter_parse_chunks(lines, kind=kind, chunk_size=chunk_size):
+        if chunk.columns.empty:
+            return None
+        if not chunk.empty:
+            parts.append(PlayerRecords.from_frame(chunk))
+    return PlayerRecords.concat(parts) if parts else None
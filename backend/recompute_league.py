@@ -0,0 +1,77 @@
+"""
+Recompute every league-level output from a single read of the team stats:
+league totals and averages (league_stats.csv), then wOBA, wRAA, OPS and OPS+
+for every player, written back in one pass. The player columns come from the
+derived-column cache (derived.py), so only teams whose values changed are
+rewritten. All files are replaced in a single atomic_io transaction, so
+readers see either the old league or the new one.
+
+    python -m backend.recompute_league [--instrument summary]
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from . import atomic_io, instrument
+from .derived import DerivedColumns
+from .league_totals import aggregate_league
+from .stats_store import TEAM_COLUMN, open_store
+from .wOBA import calculate_league_woba, mlb_woba_weights
+
+# Player columns a league rebuild keeps up to date (OPS+ only with a league OPS)
+DERIVED_COLUMNS = ['OPS', 'OPS+', 'wOBA', 'wRAA']
+
+
+# Function to list the derived columns a league with these totals gets
+def derived_columns(totals):
+    return [name for name in DERIVED_COLUMNS if name != 'OPS+' or totals.ops]
+
+
+# Function to rebuild league_stats.csv and all derived player columns from one read
+def recompute_league(output_directory="output_data", store=None):
+    store = store or open_store(output_directory)
+    # The read, the league file and the player columns form one commit
+    with instrument.stage("recompute_league"), atomic_io.transaction(output_directory), store.transaction():
+        return _recompute_league(output_directory, store)
+
+
+def _recompute_league(output_directory, store):
+    df = store.read()
+    if df.empty:
+        print("No team stats found. Nothing to recompute.")
+        return None
+
+    totals = aggregate_league(df)
+    league_woba = calculate_league_woba(totals, mlb_woba_weights)
+    derived = derived_columns(totals)
+    if not totals.ops:
+        print("Invalid league OPS value. Skipping OPS+.")
+
+    league_df = totals.to_frame()
+    league_df = pd.concat(
+        [league_df, pd.DataFrame({'Statistic': ['wOBA'], 'Total': [league_woba]})], ignore_index=True
+    )
+    league_path = os.path.join(output_directory, "league_stats.csv")
+    with instrument.stage("write") as record, atomic_io.atomic_path(league_path) as path:
+        league_df.to_csv(path, index=False)
+        if record:
+            record.add(rows=len(league_df), bytes_written=os.path.getsize(path))
+
+    # Values come from the derived-column cache; only teams whose values changed are rewritten
+    changed = DerivedColumns(store).materialize(derived, df=df, totals=totals)
+    print(f"Recomputed {', '.join(derived)} for {df[TEAM_COLUMN].nunique()} teams, {len(changed)} changed "
+          f"(league OPS {totals.ops:.3f}, league wOBA {league_woba:.3f}).")
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    instrument.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument.configure_from_args(args)
+    recompute_league(store=open_store(os.environ.get("STATS_STORE", "output_data")))
+
+
+if __name__ == "__main__":
+    main()
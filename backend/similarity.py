@@ -0,0 +1,286 @@
+"""
+Player similarity ("who in the league hits like this kid?").
+
+Every player becomes a vector of rate stats plus wOBA and OPS+, each
+standardized to mean 0 and standard deviation 1 so no stat dominates by its
+scale. Similarity is the Euclidean distance between those vectors. The
+standardized matrix and its row norms are computed once per league build; a
+query is then one matrix-vector product and a partial sort, and all-pairs
+comps are blocks of one matrix product.
+
+    index = SimilarityIndex(league_df)
+    index.similar(index.row("Branham", "R. Winsor(Sr)"), k=5, min_pa=20)
+    index.comps(k=3)                       # every player's 3 closest, one pass
+
+A cross-season index reads player-seasons from the warehouse and standardizes
+each league-season on its own, so a player is compared with how far above or
+below their own league they were:
+
+    python -m backend.similarity "R. Winsor(Sr)" [--team Branham] [-k 5] [--min-pa 20]
+    python -m backend.similarity "R. Winsor(Sr)" --warehouse warehouse [--league SCVAL] [--season 2023 2024]
+    python -m backend.similarity --comps 3 [-o comps.csv]
+"""
+import argparse
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from . import atomic_io, instrument
+from .leaderboard import qualifying_pa
+from .stats_store import TEAM_COLUMN, open_store
+
+# Stats compared, as columns of the team tables or rates computed from them
+FEATURES = ['AVG', 'OBP', 'SLG', 'ISOP', 'BABIP', 'K%', 'BB%', 'wOBA', 'OPS+']
+# Columns the features are computed from
+SOURCE_COLUMNS = ['Name', 'PA', 'K', 'BB', 'HBP', 'AVG', 'OBP', 'SLG', 'ISOP', 'BABIP', 'wOBA', 'OPS+']
+# Rows scored per block in comps(), to bound the block of the distance matrix
+BLOCK = 2048
+
+
+# Function to build the raw feature matrix of a league table
+def feature_matrix(df, features=FEATURES):
+    """
+    Returns:
+    ndarray: (players, len(features)) float64; NaN where a stat is missing.
+    """
+    pa = df['PA'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = {
+            'K%': np.where(pa > 0, df['K'].to_numpy(dtype=np.float64) / pa, np.nan),
+            'BB%': np.where(pa > 0, (df['BB'] + df['HBP']).to_numpy(dtype=np.float64) / pa, np.nan),
+        }
+    return np.column_stack([
+        rates[feature] if feature in rates else pd.to_numeric(df[feature], errors="coerce").to_numpy(dtype=np.float64)
+        for feature in features
+    ])
+
+
+def _standardize(values, groups=None):
+    # z-scores per column, within each group; a column with no spread becomes 0
+    standardized = np.empty_like(values)
+    codes = np.zeros(len(values), dtype=np.intp) if groups is None else groups
+    for code in np.unique(codes):
+        rows = codes == code
+        block = values[rows]
+        mean = block.mean(axis=0)
+        std = block.std(axis=0)
+        standardized[rows] = (block - mean) / np.where(std > 0, std, 1.0)
+    return standardized
+
+
+def _check_min_pa(min_pa):
+    if min_pa is not None and not math.isfinite(min_pa):
+        raise ValueError(f"min_pa must be finite, not {min_pa}")
+
+
+# Standardized stat vectors of a league (or of many seasons), for nearest-neighbour queries
+class SimilarityIndex:
+    def __init__(self, df, features=FEATURES, group_by=None, version=None):
+        """
+        Parameters:
+        df (DataFrame): One row per player (or player-season) with the
+            SOURCE_COLUMNS. Rows missing any feature are left out.
+        features (list): Stats to compare (see FEATURES).
+        group_by (list): Columns to standardize within, e.g. League and Season
+            for a cross-season index; default: the whole table at once.
+        version: Any value identifying the league build, e.g. a file signature.
+        """
+        self.features = list(features)
+        self.version = version
+        with instrument.stage("similarity_index") as record:
+            values = feature_matrix(df, self.features)
+            complete = ~np.isnan(values).any(axis=1)
+            self.df = df[complete].reset_index(drop=True)
+            groups = None
+            if group_by:
+                groups, _ = pd.MultiIndex.from_frame(self.df[group_by]).factorize()
+            self.matrix = np.ascontiguousarray(_standardize(values[complete], groups))
+            self.norms = np.einsum('ij,ij->i', self.matrix, self.matrix)
+            # Single queries rank in float32 with one feature per row, the
+            # fastest layout for a product with one vector; the k found are
+            # then measured exactly from self.matrix
+            self._columns = np.ascontiguousarray(self.matrix.T, dtype=np.float32)
+            self._pa = self.df['PA'].to_numpy(dtype=np.float64)
+            self.qualifying_pa = qualifying_pa(self.df)
+            # Only for no threshold and the qualifying one (see _norms_for)
+            self._query_norms = {}
+            record.add(rows=len(self.df))
+
+    def __len__(self):
+        return len(self.df)
+
+    def row(self, team, name):
+        """
+        Returns:
+        int: Position of the player in self.df (the first match), or None.
+        """
+        match = self.df['Name'] == name
+        if team is not None:
+            match &= self.df[TEAM_COLUMN] == team
+        rows = np.flatnonzero(match.to_numpy())
+        return int(rows[0]) if len(rows) else None
+
+    def _distances(self, vectors, rows=None):
+        # Squared distances from each vector to every indexed player: |a|^2 + |b|^2 - 2 a.b
+        norms = self.norms if rows is None else self.norms[rows]
+        squared = np.einsum('ij,ij->i', vectors, vectors)[:, None] + norms[None, :] - 2 * vectors @ (
+            self.matrix if rows is None else self.matrix[rows]).T
+        return np.maximum(squared, 0)
+
+    def _nearest(self, distances, k):
+        # Column indices of the k smallest entries of each row, closest first
+        k = min(k, distances.shape[1])
+        if k == 0:
+            return np.empty((len(distances), 0), dtype=np.intp)
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(distances, nearest, axis=1).argsort(axis=1, kind="stable")
+        return np.take_along_axis(nearest, order, axis=1)
+
+    def _norms_for(self, min_pa):
+        # Row norms with players under min_pa pushed to infinity. Kept for no
+        # threshold and the qualifying one, so those cost nothing per query
+        # after the first; other thresholds come from query strings and are
+        # recomputed, so the cache cannot grow with the values clients send
+        if min_pa in self._query_norms:
+            return self._query_norms[min_pa]
+        _check_min_pa(min_pa)
+        norms = self.norms.astype(np.float32)
+        if min_pa is not None:
+            norms[self._pa < min_pa] = np.inf
+        if min_pa is None or min_pa == self.qualifying_pa:
+            self._query_norms[min_pa] = norms
+        return norms
+
+    def nearest(self, row, k=10, min_pa=None):
+        """
+        Parameters:
+        row (int): Position of the player in self.df (see row()).
+        k (int): Number of neighbours.
+        min_pa (float): Only consider players with at least this many PA.
+
+        Returns:
+        tuple: (positions in self.df, distances in standard deviations) of
+        the k closest other players, closest first.
+        """
+        # |a - b|^2 ranks like |b|^2 - 2 a.b for a fixed query a
+        scores = self._norms_for(min_pa) - 2 * (self.matrix[row].astype(np.float32) @ self._columns)
+        scores[row] = np.inf
+        k = min(k, len(scores) - 1)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        found = np.argpartition(scores, k - 1)[:k]
+        found = found[np.isfinite(scores[found])]
+        distances = np.sqrt(((self.matrix[found] - self.matrix[row]) ** 2).sum(axis=1))
+        order = np.argsort(distances, kind="stable")
+        return found[order], distances[order]
+
+    def similar(self, row, k=10, min_pa=None):
+        """
+        Returns:
+        DataFrame: nearest() as the players' rows with a Distance column.
+        """
+        found, distances = self.nearest(row, k, min_pa)
+        result = self.df.iloc[found].reset_index(drop=True)
+        result.insert(len(result.columns), 'Distance', distances)
+        return result
+
+    def comps(self, k=3, min_pa=None):
+        """
+        Every player's k closest other players.
+
+        Returns:
+        tuple: (neighbours, distances), both (players, k); neighbours are
+        positions in self.df, -1 where there are fewer than k candidates.
+        """
+        _check_min_pa(min_pa)
+        candidates = np.flatnonzero(self._pa >= min_pa) if min_pa is not None else np.arange(len(self))
+        neighbours = np.full((len(self), k), -1, dtype=np.intp)
+        distances = np.full((len(self), k), np.inf)
+        with instrument.stage("comps") as record:
+            for start in range(0, len(self), BLOCK):
+                stop = min(start + BLOCK, len(self))
+                block = self._distances(self.matrix[start:stop], candidates)
+                # Never a player's own comp
+                own = np.flatnonzero((candidates >= start) & (candidates < stop))
+                block[candidates[own] - start, own] = np.inf
+                nearest = self._nearest(block, k)
+                found = np.take_along_axis(block, nearest, axis=1)
+                valid = np.isfinite(found)
+                neighbours[start:stop, :nearest.shape[1]] = np.where(valid, candidates[nearest], -1)
+                distances[start:stop, :nearest.shape[1]] = np.sqrt(found)
+            record.add(rows=len(self))
+        return neighbours, distances
+
+    def comps_frame(self, k=3, min_pa=None):
+        """
+        comps() as a table: the player's key columns, then Comp <i> and
+        Distance <i> for each neighbour.
+        """
+        neighbours, distances = self.comps(k, min_pa)
+        keys = [column for column in ['League', 'Season', TEAM_COLUMN, 'Name'] if column in self.df.columns]
+        table = self.df[keys].copy()
+        labels = self.df[keys].astype(str).agg(" / ".join, axis=1).to_numpy()
+        for i in range(neighbours.shape[1]):
+            table[f"Comp {i + 1}"] = np.where(neighbours[:, i] >= 0, labels[neighbours[:, i]], "")
+            table[f"Distance {i + 1}"] = distances[:, i].round(3)
+        return table
+
+
+# Function to build a cross-season index from the warehouse
+def warehouse_index(warehouse, leagues=None, seasons=None, features=FEATURES):
+    from .warehouse import LEAGUE_COLUMN, SEASON_COLUMN
+
+    df = warehouse.read(columns=SOURCE_COLUMNS, leagues=leagues, seasons=seasons)
+    return SimilarityIndex(df, features, group_by=[LEAGUE_COLUMN, SEASON_COLUMN])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("name", nargs="?", help="Player to find comps for")
+    parser.add_argument("--team", help="The player's team, when the name is not unique")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--min-pa", type=float)
+    parser.add_argument("--comps", type=int, metavar="K", help="Every player's K closest instead of one player's")
+    parser.add_argument("-o", "--output", default="-", help="With --comps, CSV to write (default: print)")
+    parser.add_argument("--store", default=os.environ.get("STATS_STORE", "output_data"))
+    parser.add_argument("--warehouse", metavar="ROOT", help="Search player-seasons in a warehouse instead")
+    parser.add_argument("--league", nargs="+")
+    parser.add_argument("--season", nargs="+")
+    instrument.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument.configure_from_args(args)
+    if args.name is None and args.comps is None:
+        parser.error("Give a player name or --comps K.")
+
+    if args.warehouse:
+        from .warehouse import Warehouse
+        index = warehouse_index(Warehouse(args.warehouse), args.league, args.season)
+    else:
+        index = SimilarityIndex(open_store(args.store).read(columns=SOURCE_COLUMNS))
+    if not len(index):
+        sys.exit("No players with all of: " + ", ".join(index.features))
+
+    if args.comps is not None:
+        table = index.comps_frame(args.comps, args.min_pa)
+        if args.output == "-":
+            print(table.to_string(index=False))
+        else:
+            with atomic_io.atomic_path(args.output) as path:
+                table.to_csv(path, index=False)
+            print(f"Wrote comps for {len(table)} players to {args.output}")
+        return 0
+
+    row = index.row(args.team, args.name)
+    if row is None:
+        sys.exit(f"No player '{args.name}'" + (f" on team '{args.team}'." if args.team else "."))
+    pd.set_option("display.width", 200)
+    print(index.df.iloc[[row]].to_string(index=False))
+    print(index.similar(row, args.k, args.min_pa).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
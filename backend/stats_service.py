@@ -0,0 +1,372 @@
+"""
+HTTP service for the Next.js frontend.
+
+Serves the team and league tables from memory and wraps the parsers behind
+POST /api/parse. Tables are loaded once and reloaded only when their file's
+modification time or size changes, so a request costs one os.stat instead of
+a CSV read. Writers replace files atomically (atomic_io), so a reload never
+sees a half-written file, and league-wide routes load every team from the
+same commit.
+
+    python -m backend.stats_service [--port 5000] [--output-directory output_data]
+
+Routes:
+    POST /api/parse                 parse pasted rows (see parse_payload); rows that
+                                    fail validation come back under "quarantine"
+    GET  /api/listCsvFiles          {"csvFiles": [...]}
+    GET  /api/readCsv?team=<team>   {"data": "<csv text>"}
+    GET  /api/teams                 {"teams": [...]}
+    GET  /api/teams/<team>          team table as {"columns", "index", "data"}
+    GET  /api/league                league_stats.csv as {"columns", "index", "data"}
+    GET  /api/query?teams=&columns=&sort=&desc&min_pa=&limit=&offset=
+                                    filtered, sorted page of all players (see league_query)
+    GET  /api/leaders?stat=&n=&min_pa=|qualified
+                                    top-N players by a derived stat (see leaderboard)
+    GET  /api/percentile?stat=&team=&name=&min_pa=|qualified
+                                    a player's league percentile for a derived stat
+                                    (null when no player qualifies)
+    GET  /api/similar?team=&name=&k=&min_pa=|qualified
+                                    the k players whose stats are closest (see similarity)
+"""
+import argparse
+import io
+import json
+import math
+import os
+import threading
+
+import pandas as pd
+from flask import Flask, Response, jsonify, request
+
+from . import atomic_io
+from .leaderboard import LeaderboardIndex
+from .league_query import MAX_LIMIT, columnar_payload, parse_query_args, run_query
+from .similarity import SimilarityIndex
+from .stats_store import LEAGUE_FILE, TEAM_COLUMN, TEAM_FILE_SUFFIX
+from .validation import ValidationReport, validate_lines
+
+try:
+    from flask_cors import CORS
+except ImportError:  # CORS is only needed when the browser calls the service directly
+    CORS = None
+
+
+# A table loaded from disk together with its pre-serialized payloads
+class CachedTable:
+    def __init__(self, signature, text):
+        self.signature = signature
+        self.csv = text
+        self.df = pd.read_csv(io.StringIO(text))
+        self.json = self.df.to_json(orient="split")
+
+
+# In-memory copies of the CSVs in a directory, refreshed when a file changes
+class TableCache:
+    def __init__(self, directory="output_data"):
+        self.directory = directory
+        self._tables = {}
+        self._listing = (None, [])
+        self._league_players = None
+        self._leaderboard = None
+        self._similarity = None
+        self._lock = threading.Lock()
+
+    def _signature(self, path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def csv_files(self):
+        signature = self._signature(self.directory)
+        listing_signature, files = self._listing
+        if listing_signature != signature:
+            files = sorted(filename for filename in os.listdir(self.directory) if filename.endswith(".csv"))
+            self._listing = (signature, files)
+        return files
+
+    def teams(self):
+        return [
+            filename[:-len(TEAM_FILE_SUFFIX)]
+            for filename in self.csv_files()
+            if filename.endswith(TEAM_FILE_SUFFIX) and filename != LEAGUE_FILE
+        ]
+
+    def get(self, filename):
+        """
+        Return the CachedTable for a CSV in the directory, or None if there is
+        no such file. Only names from the directory listing are accepted.
+        """
+        if filename not in self.csv_files():
+            return None
+        path = os.path.join(self.directory, filename)
+        try:
+            signature = self._signature(path)
+        except FileNotFoundError:
+            return None
+        table = self._tables.get(filename)
+        if table is not None and table.signature == signature:
+            return table
+        with self._lock:
+            table = self._tables.get(filename)
+            if table is None or table.signature != signature:
+                with open(path, encoding="utf-8") as handle:
+                    table = CachedTable(signature, handle.read())
+                self._tables[filename] = table
+        return table
+
+    def team(self, team):
+        return self.get(f"{team}{TEAM_FILE_SUFFIX}")
+
+    def _league_players_with_signature(self):
+        # All team files from one commit, so a league rebuild is never half seen
+        with atomic_io.snapshot(self.directory):
+            tables = [(team, self.team(team)) for team in self.teams()]
+        tables = [(team, table) for team, table in tables if table is not None]
+        signature = tuple((team, table.signature) for team, table in tables)
+        cached = self._league_players
+        if cached is not None and cached[0] == signature:
+            return cached
+        frames = [table.df.assign(**{TEAM_COLUMN: team}) for team, table in tables]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[TEAM_COLUMN])
+        self._league_players = (signature, df)
+        return self._league_players
+
+    def league_players(self):
+        """
+        All team tables concatenated with a Team column. Rebuilt only when one
+        of the team files changes.
+        """
+        return self._league_players_with_signature()[1]
+
+    def leaderboard(self):
+        """
+        LeaderboardIndex over league_players(). Any rewrite of a team file
+        (e.g. a league recompute) changes the signature and drops the index.
+        """
+        signature, df = self._league_players_with_signature()
+        index = self._leaderboard
+        if index is None or index.version != signature:
+            index = LeaderboardIndex(df, version=signature)
+            self._leaderboard = index
+        return index
+
+    def similarity(self):
+        """
+        SimilarityIndex over league_players(), rebuilt like leaderboard().
+        """
+        signature, df = self._league_players_with_signature()
+        index = self._similarity
+        if index is None or index.version != signature:
+            index = SimilarityIndex(df, version=signature)
+            self._similarity = index
+        return index
+
+    def league(self):
+        return self.get(LEAGUE_FILE)
+
+
+# Function to turn a /api/parse request body into a parsed, validated DataFrame
+def parse_payload(payload):
+    """
+    Accepts either pasted rows:
+        {"raw": "<rows>", "kind": "basic" | "additional", "team": "<team>"}
+    or the single player sent by the add-data form:
+        {"name": "<name>", "team": "<team>", "pa": <int>, "avg": <float>}
+
+    Returns:
+    tuple: (DataFrame of the rows that passed validation, with a Team column
+    when a team was given, ValidationReport)
+
+    Raises:
+    ValueError: If the payload is neither shape or holds invalid values.
+    """
+    team = payload.get("team")
+    report = ValidationReport()
+    if "raw" in payload:
+        kind = payload.get("kind", "basic")
+        df, report = validate_lines(str(payload["raw"]).splitlines(), kind=kind)
+        if report.quit_line is not None:
+            raise ValueError("Data entry was abandoned with 'quit'.")
+    elif "name" in payload:
+        pa = int(payload.get("pa", 0))
+        avg = float(payload.get("avg", 0))
+        if not payload["name"] or pa <= 0 or not 0 < avg <= 1:
+            raise ValueError("Invalid input data. Please provide valid player information.")
+        df = pd.DataFrame([{"Name": str(payload["name"]), "PA": pa, "AVG": avg}])
+        report = ValidationReport(accepted=1)
+    else:
+        raise ValueError("Expected either 'raw' rows or a player 'name'.")
+    if team:
+        df.insert(0, "Team", str(team))
+    return df, report
+
+
+# Function to read the stat and PA threshold shared by the leaderboard routes
+def leaderboard_args(args, index):
+    """
+    min_pa may be a number or 'qualified' (the index's qualifying PA).
+
+    Raises:
+    ValueError: If the stat is missing or not indexed, or min_pa is malformed.
+    """
+    stat = args.get("stat", "")
+    if stat not in index.stats:
+        raise ValueError(f"'stat' must be one of: {', '.join(index.stats)}")
+    return stat, min_pa_arg(args, index.qualifying_pa)
+
+
+# Function to read a min_pa argument: a number, 'qualified' or nothing
+def min_pa_arg(args, qualified):
+    min_pa = args.get("min_pa")
+    if min_pa in (None, ""):
+        return None
+    if min_pa == "qualified":
+        return qualified
+    try:
+        value = float(min_pa)
+    except ValueError:
+        value = float('nan')
+    if not math.isfinite(value):
+        raise ValueError("'min_pa' must be a number or 'qualified'.")
+    return value
+
+
+def _json_response(body):
+    return Response(body, mimetype="application/json")
+
+
+# Function to build the Flask app around a table cache
+def create_app(output_directory="output_data"):
+    app = Flask(__name__)
+    # Keep column order in columnar payloads
+    app.json.sort_keys = False
+    if CORS is not None:
+        CORS(app)
+    cache = TableCache(output_directory)
+    app.config["TABLE_CACHE"] = cache
+
+    @app.post("/api/parse")
+    def parse():
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return jsonify({"error": "Expected a JSON object."}), 400
+        try:
+            df, report = parse_payload(payload)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        return _json_response(
+            f'{{"rows": {len(df)}, "table": {df.to_json(orient="split")}, '
+            f'"quarantined": {json.dumps(report.counts)}, "quarantine": {report.quarantine.to_json(orient="records")}}}'
+        )
+
+    @app.get("/api/listCsvFiles")
+    def list_csv_files():
+        return jsonify({"csvFiles": cache.csv_files()})
+
+    @app.get("/api/readCsv")
+    def read_csv():
+        team = request.args.get("team", "")
+        table = cache.team(team)
+        if table is None:
+            return jsonify({"error": f"No stats found for team '{team}'."}), 404
+        return jsonify({"data": table.csv})
+
+    @app.get("/api/teams")
+    def teams():
+        return jsonify({"teams": cache.teams()})
+
+    @app.get("/api/teams/<team>")
+    def team_table(team):
+        table = cache.team(team)
+        if table is None:
+            return jsonify({"error": f"No stats found for team '{team}'."}), 404
+        return _json_response(table.json)
+
+    @app.get("/api/query")
+    def query():
+        try:
+            params = parse_query_args(request.args)
+            page, total = run_query(cache.league_players(), **params)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(columnar_payload(page, total, params["offset"], params["limit"]))
+
+    @app.get("/api/leaders")
+    def leaders():
+        index = cache.leaderboard()
+        try:
+            stat, min_pa = leaderboard_args(request.args, index)
+            n = int(request.args.get("n", 10))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if not 0 <= n <= MAX_LIMIT:
+            return jsonify({"error": f"'n' must be between 0 and {MAX_LIMIT}."}), 400
+        page = index.top(stat, n, min_pa=min_pa)
+        return jsonify(columnar_payload(page, index.count(stat, min_pa), 0, n))
+
+    @app.get("/api/percentile")
+    def percentile():
+        index = cache.leaderboard()
+        try:
+            stat, min_pa = leaderboard_args(request.args, index)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        team, name = request.args.get("team", ""), request.args.get("name", "")
+        df = index.df
+        rows = (df[TEAM_COLUMN] == team) & (df['Name'] == name)
+        if not rows.any():
+            return jsonify({"error": f"No player '{name}' on team '{team}'."}), 404
+        row = int(rows.to_numpy().nonzero()[0][0])
+        value = df[stat].iat[row]
+        if pd.isna(value):
+            return jsonify({"error": f"'{name}' has no {stat}."}), 404
+        percentile = index.player_percentile(stat, row, min_pa=min_pa)
+        return jsonify({
+            "team": team,
+            "name": name,
+            "stat": stat,
+            "value": float(value),
+            "min_pa": min_pa,
+            # null when no player reaches min_pa (JSON has no NaN)
+            "percentile": None if math.isnan(percentile) else percentile,
+        })
+
+    @app.get("/api/similar")
+    def similar():
+        index = cache.similarity()
+        team, name = request.args.get("team", ""), request.args.get("name", "")
+        try:
+            k = int(request.args.get("k", 10))
+            min_pa = min_pa_arg(request.args, index.qualifying_pa)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if not 0 <= k <= MAX_LIMIT:
+            return jsonify({"error": f"'k' must be between 0 and {MAX_LIMIT}."}), 400
+        row = index.row(team, name)
+        if row is None:
+            return jsonify({"error": f"No player '{name}' on team '{team}' with all of: "
+                                     f"{', '.join(index.features)}."}), 404
+        page = index.similar(row, k, min_pa=min_pa)
+        return jsonify(columnar_payload(page, len(page), 0, k))
+
+    @app.get("/api/league")
+    def league_table():
+        table = cache.league()
+        if table is None:
+            return jsonify({"error": f"'{LEAGUE_FILE}' not found."}), 404
+        return _json_response(table.json)
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("-o", "--output-directory", default="output_data")
+    args = parser.parse_args(argv)
+
+    create_app(args.output_directory).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Storage backends for per-player team stats.
+
+Every backend exposes the same methods and works on one league-wide DataFrame
+with a 'Team' column:
+
+    store = open_store("output_data")              # per-team CSVs (current layout)
+    store = open_store("output_data/league.npystore")  # memory-mapped NumPy columns
+    store = open_store("output_data/league.parquet")   # Parquet, needs pyarrow
+
+    df = store.read(columns=["OBP", "SLG"])        # only these columns are loaded
+    store.update_columns(new_columns_df)           # write back a few columns
+
+Writes go through atomic_io: files are staged and renamed into place under
+the directory's write lock. Several writes made inside one store.transaction()
+are committed together, e.g. a read-modify-write of the whole league.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import atomic_io, instrument
+
+TEAM_COLUMN = "Team"
+TEAM_FILE_SUFFIX = "_stats.csv"
+LEAGUE_FILE = "league_stats.csv"
+
+
+def _projection(columns):
+    if columns is None:
+        return None
+    return [TEAM_COLUMN] + [column for column in columns if column != TEAM_COLUMN]
+
+
+# Per-team CSV files in one directory, e.g. output_data/Branham_stats.csv
+class CsvStore:
+    def __init__(self, directory="output_data"):
+        self.directory = directory
+
+    def path_for(self, team):
+        return os.path.join(self.directory, f"{team}{TEAM_FILE_SUFFIX}")
+
+    def transaction(self):
+        return atomic_io.transaction(self.directory)
+
+    def teams(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            filename[:-len(TEAM_FILE_SUFFIX)]
+            for filename in os.listdir(self.directory)
+            if filename.endswith(TEAM_FILE_SUFFIX) and filename != LEAGUE_FILE
+        )
+
+    def read(self, columns=None, teams=None):
+        """
+        Read the league table, optionally only some columns and/or teams.
+        Rows come back grouped by team in sorted team order.
+        """
+        frames = []
+        usecols = None if columns is None else [column for column in columns if column != TEAM_COLUMN]
+        with instrument.stage("read") as record, atomic_io.snapshot(self.directory):
+            for team in teams if teams is not None else self.teams():
+                path = atomic_io.current_path(self.path_for(team))
+                df = pd.read_csv(path, usecols=usecols)
+                if usecols is not None:
+                    df = df[usecols]
+                df.insert(0, TEAM_COLUMN, team)
+                frames.append(df)
+                if record:
+                    record.add(rows=len(df), bytes_read=os.path.getsize(path))
+        if not frames:
+            return pd.DataFrame(columns=_projection(columns) or [TEAM_COLUMN])
+        return pd.concat(frames, ignore_index=True)
+
+    def write(self, df):
+        os.makedirs(self.directory, exist_ok=True)
+        with instrument.stage("write") as record, self.transaction() as txn:
+            for team, team_df in df.groupby(TEAM_COLUMN, sort=True):
+                path = txn.path(self.path_for(team))
+                team_df.drop(columns=TEAM_COLUMN).to_csv(path, index=False)
+                if record:
+                    record.add(rows=len(team_df), bytes_written=os.path.getsize(path))
+
+    def update_columns(self, df):
+        """
+        Add or replace columns. df must have a 'Team' column and one row per
+        stored row, in the order read() returns them.
+        """
+        with instrument.stage("write") as record, self.transaction() as txn:
+            for team, new_columns in df.groupby(TEAM_COLUMN, sort=True):
+                path = txn.current(self.path_for(team))
+                team_df = pd.read_csv(path)
+                if record:
+                    record.add(bytes_read=os.path.getsize(path))
+                for column in new_columns.columns.drop(TEAM_COLUMN):
+                    team_df[column] = new_columns[column].to_numpy()
+                path = txn.path(self.path_for(team))
+                team_df.to_csv(path, index=False)
+                if record:
+                    record.add(rows=len(team_df), bytes_written=os.path.getsize(path))
+
+
+# One directory of .npy files, one per column, read back memory-mapped
+class NpyStore:
+    suffix = ".npystore"
+    meta_file = "meta.json"
+
+    def __init__(self, path):
+        self.path = path
+
+    def transaction(self):
+        return atomic_io.transaction(self.path)
+
+    def _meta(self):
+        with open(atomic_io.current_path(os.path.join(self.path, self.meta_file)), encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def _save_meta(self, txn, meta):
+        with open(txn.path(os.path.join(self.path, self.meta_file)), "w", encoding="utf-8") as handle:
+            json.dump(meta, handle, indent=2)
+
+    def _write_column(self, txn, meta, column, values):
+        # Column names such as "OPS+" are mapped to numbered files
+        filename = meta["files"].get(column) or f"{len(meta['files']):03d}.npy"
+        array = values.to_numpy()
+        if array.dtype == object or not np.issubdtype(array.dtype, np.number):
+            array = array.astype(str)
+        # np.save would add .npy to the temp name, so write through a handle
+        with open(txn.path(os.path.join(self.path, filename)), "wb") as handle:
+            np.save(handle, array)
+        meta["files"][column] = filename
+        if column not in meta["columns"]:
+            meta["columns"].append(column)
+
+    def _remove_unused_files(self):
+        # Column files left over from an earlier, wider table; readers only open files in meta.json
+        used = set(self._meta()["files"].values()) if os.path.exists(os.path.join(self.path, self.meta_file)) else set()
+        for filename in os.listdir(self.path):
+            if filename.endswith(".npy") and filename not in used:
+                os.remove(os.path.join(self.path, filename))
+
+    def _bytes(self, txn, meta, columns):
+        return sum(os.path.getsize(txn.current(os.path.join(self.path, meta["files"][column]))) for column in columns)
+
+    def teams(self):
+        if not os.path.exists(self.path):
+            return []
+        return sorted(np.unique(self._load(self._meta(), TEAM_COLUMN)).tolist())
+
+    def _load(self, meta, column):
+        return np.load(atomic_io.current_path(os.path.join(self.path, meta["files"][column])), mmap_mode="r")
+
+    def read(self, columns=None, teams=None):
+        with instrument.stage("read") as record, atomic_io.snapshot(self.path):
+            meta = self._meta()
+            wanted = _projection(columns) or meta["columns"]
+            data = {column: self._load(meta, column) for column in wanted}
+            df = pd.DataFrame(data, columns=wanted)
+            if teams is not None:
+                df = df[df[TEAM_COLUMN].isin(teams)].reset_index(drop=True)
+            record.add(rows=len(df), bytes_read=sum(array.nbytes for array in data.values()))
+        return df
+
+    def write(self, df):
+        df = df.sort_values(TEAM_COLUMN, kind="stable").reset_index(drop=True)
+        meta = {"rows": len(df), "columns": [], "files": {}}
+        with instrument.stage("write") as record, self.transaction() as txn:
+            self._remove_unused_files()
+            for column in [TEAM_COLUMN] + [c for c in df.columns if c != TEAM_COLUMN]:
+                self._write_column(txn, meta, column, df[column])
+            self._save_meta(txn, meta)
+            if record:
+                record.add(rows=len(df), bytes_written=self._bytes(txn, meta, meta["columns"]))
+
+    def update_columns(self, df):
+        with instrument.stage("write") as record, self.transaction() as txn:
+            meta = self._meta()
+            if len(df) != meta["rows"]:
+                raise ValueError(f"Expected {meta['rows']} rows, got {len(df)}.")
+            for column in df.columns.drop(TEAM_COLUMN):
+                self._write_column(txn, meta, column, df[column])
+            self._save_meta(txn, meta)
+            if record:
+                record.add(rows=len(df), bytes_written=self._bytes(txn, meta, df.columns.drop(TEAM_COLUMN)))
+
+
+# A single Parquet file for the whole league; requires pyarrow
+class ParquetStore:
+    suffix = ".parquet"
+
+    def __init__(self, path):
+        self.path = path
+
+    def transaction(self):
+        return atomic_io.transaction(os.path.dirname(os.path.abspath(self.path)))
+
+    def teams(self):
+        if not os.path.exists(self.path):
+            return []
+        return sorted(pd.read_parquet(self.path, columns=[TEAM_COLUMN])[TEAM_COLUMN].unique().tolist())
+
+    def read(self, columns=None, teams=None):
+        filters = None if teams is None else [(TEAM_COLUMN, "in", list(teams))]
+        path = atomic_io.current_path(self.path)
+        with instrument.stage("read") as record:
+            df = pd.read_parquet(path, columns=_projection(columns), filters=filters)
+            if record:
+                record.add(rows=len(df), bytes_read=os.path.getsize(path))
+        return df
+
+    def write(self, df):
+        df = df.sort_values(TEAM_COLUMN, kind="stable").reset_index(drop=True)
+        with instrument.stage("write") as record, self.transaction() as txn:
+            path = txn.path(self.path)
+            df.to_parquet(path, index=False)
+            if record:
+                record.add(rows=len(df), bytes_written=os.path.getsize(path))
+
+    def update_columns(self, df):
+        with instrument.stage("write") as record, self.transaction() as txn:
+            existing = pd.read_parquet(txn.current(self.path))
+            if len(df) != len(existing):
+                raise ValueError(f"Expected {len(existing)} rows, got {len(df)}.")
+            for column in df.columns.drop(TEAM_COLUMN):
+                existing[column] = df[column].to_numpy()
+            path = txn.path(self.path)
+            existing.to_parquet(path, index=False)
+            if record:
+                record.add(rows=len(existing), bytes_written=os.path.getsize(path))
+
+
+# Function to pick a backend from a path
+def open_store(location="output_data"):
+    """
+    Return the store for a location: a path ending in .npystore or .parquet
+    selects that backend, anything else is treated as a CSV directory.
+    """
+    if location.endswith(NpyStore.suffix):
+        return NpyStore(location)
+    if location.endswith(ParquetStore.suffix):
+        return ParquetStore(location)
+    return CsvStore(location)
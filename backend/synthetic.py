@@ -0,0 +1,256 @@
+"""
+Synthetic leagues in the raw paste formats the parsers accept.
+
+Every team gets a basic paste (Number, Name, Games, AVG, PA, AB, R, Hits, RBI,
+Doubles, Triples, HR, GS) and an additional paste (Number, Name, Games, SF,
+SACB, BB, K, HBP, ROE, FC, LOB, OBP, SLG, OPS) for the same players.
+
+The distributions follow the real teams in output_data/:
+- Regulars play most of an 18-game season at about 3.6 PA a game; bench
+  players get a few games.
+- Plate appearances are split into walks, hit by pitches, sacrifices and
+  at-bats per player, and at-bats into hits and strikeouts.
+- Hits are split into singles, doubles, triples and home runs, with talent
+  and power drawn per player.
+- Rates are derived from the counts and printed like the source site
+  ('.250', '1.000').
+
+A team's rows depend only on (seed, league, team), so a league can grow
+without changing the teams it already has.
+
+    python -m backend.synthetic raw_league/ --teams 9 --players 18
+    python -m backend.synthetic raw_leagues/ --leagues 3 --teams 40 --players 20 --seed 7
+
+The output directories can be fed to batch_ingest.py; with --leagues above 1,
+each league gets its own subdirectory.
+"""
+import argparse
+import os
+
+import numpy as np
+
+SEASON_GAMES = 18
+# Roster spots that play most games
+REGULARS = 10
+MAX_PLAYERS = 100
+
+FIRST_INITIALS = "ABCDEFGHJKLMNOPRSTVWZ"
+LAST_NAMES = [
+    "Winsor", "Waldorph", "Setser", "Edwards", "Garcia", "Nguyen", "Smith", "De La Cruz", "Lee", "Park",
+    "Hernandez", "Lopez", "Martinez", "Tran", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis",
+    "Rodriguez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Thompson", "White",
+    "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson", "Walker", "Young", "Allen", "King",
+    "Wright", "Scott", "Torres", "Hill", "Flores", "Green", "Adams", "Nelson", "Baker", "Hall",
+    "Rivera", "Campbell", "Mitchell", "Carter", "Roberts", "Gomez", "Phillips", "Evans", "Turner", "Diaz",
+    "Van Dyke", "Newton", "Ortiz", "Reyes", "Cruz", "Kim", "Chen", "Patel", "Singh", "Murphy",
+]
+CLASSES = ["(Fr)", "(So)", "(Jr)", "(Sr)"]
+
+# Shares of plate appearances, from the league totals in output_data/
+PA_SHARES = {"BB": 0.094, "HBP": 0.030, "SF": 0.008, "SACB": 0.013}
+# Mean hit rate per at-bat, strikeout rate per out in play, and the split of hits
+HIT_RATE = 0.289
+STRIKEOUT_RATE = 0.26
+HIT_SPLIT = {"Doubles": 0.177, "Triples": 0.013, "HR": 0.013}
+
+
+def _format_rate(value):
+    # '.250' below one, '1.000' at one and above, like the source tables
+    text = f"{value:.3f}"
+    return text[1:] if text.startswith("0") else text
+
+
+def _format_rates(values):
+    values = np.asarray(values).tolist()
+    formatted = {value: _format_rate(value) for value in set(values)}
+    return [formatted[value] for value in values]
+
+
+def _names(rng, players):
+    names = []
+    taken = set()
+    while len(names) < players:
+        # Draw a few spare names at once; repeats within a team are skipped
+        initials = rng.integers(0, len(FIRST_INITIALS), 2 * players)
+        last_names = rng.integers(0, len(LAST_NAMES), 2 * players)
+        classes = rng.integers(0, len(CLASSES), 2 * players)
+        for initial, last_name, year in zip(initials.tolist(), last_names.tolist(), classes.tolist()):
+            name = f"{FIRST_INITIALS[initial]}. {LAST_NAMES[last_name]}"
+            if name not in taken and len(names) < players:
+                taken.add(name)
+                names.append(f"{name}{CLASSES[year]}")
+    return names
+
+
+# Function to draw the counting stats of one team
+def team_stats(players, seed=0, league=0, team=0, season_games=SEASON_GAMES):
+    """
+    Returns:
+    dict: Column name to array (one entry per player), with Number and Name.
+    """
+    if not 0 < players <= MAX_PLAYERS:
+        raise ValueError(f"players must be between 1 and {MAX_PLAYERS} (jersey numbers are unique per team)")
+    rng = np.random.default_rng([seed, league, team])
+
+    regular = np.arange(players) < REGULARS
+    rng.shuffle(regular)
+    games = np.where(
+        regular,
+        rng.integers(max(season_games - 4, 1), season_games + 1, players),
+        rng.integers(1, max(season_games // 2, 1) + 1, players),
+    )
+    pa_per_game = np.where(regular, rng.normal(3.6, 0.4, players), rng.uniform(0.5, 2.5, players))
+    pa = np.maximum(np.rint(games * np.clip(pa_per_game, 0.3, 5.0)), 1).astype(np.int64)
+
+    # Plate appearances: walks, hit by pitches, sacrifices, and at-bats
+    eye = rng.lognormal(0.0, 0.35, players)
+    shares = np.column_stack([
+        np.clip(PA_SHARES["BB"] * eye, 0, 0.3), np.full(players, PA_SHARES["HBP"]),
+        np.full(players, PA_SHARES["SF"]), np.full(players, PA_SHARES["SACB"]),
+    ])
+    shares = np.column_stack([shares, 1 - shares.sum(axis=1)])
+    bb, hbp, sf, sacb, ab = rng.multinomial(pa, shares).T
+
+    # At-bats: hits, then strikeouts, reached on error and fielder's choice among the outs
+    contact = np.clip(rng.normal(HIT_RATE, 0.06, players), 0.05, 0.6)
+    hits = rng.binomial(ab, contact)
+    k = rng.binomial(ab - hits, np.clip(rng.normal(STRIKEOUT_RATE, 0.08, players), 0.02, 0.7))
+    roe = rng.binomial(ab - hits - k, 0.06)
+    fc = rng.binomial(ab - hits - k - roe, 0.05)
+
+    power = rng.lognormal(0.0, 0.5, players)
+    extra = np.column_stack([HIT_SPLIT["Doubles"] * power, HIT_SPLIT["Triples"] * np.ones(players),
+                             HIT_SPLIT["HR"] * power ** 2])
+    extra = np.minimum(extra, 0.3)
+    split = np.column_stack([1 - extra.sum(axis=1), extra])
+    singles, doubles, triples, hr = rng.multinomial(hits, split).T
+
+    on_base = hits + bb + hbp + roe + fc
+    runs = hr + rng.binomial(on_base - hr, 0.33)
+    rbi = hr + sf + rng.binomial(hits - hr, 0.4)
+    lob = rng.poisson(0.34 * pa)
+    starts = np.where(rng.random(players) < 0.05, rng.binomial(games, 0.8), 0)
+
+    return {
+        "Number": rng.choice(MAX_PLAYERS, players, replace=False),
+        "Name": _names(rng, players),
+        "Games": games, "PA": pa, "AB": ab, "R": runs, "Hits": hits, "RBI": rbi,
+        "Doubles": doubles, "Triples": triples, "HR": hr, "GS": starts,
+        "SF": sf, "SACB": sacb, "BB": bb, "K": k, "HBP": hbp, "ROE": roe, "FC": fc, "LOB": lob,
+        "Singles": singles,
+    }
+
+
+# Function to format one team's stats as the two raw pastes
+def team_pastes(stats):
+    """
+    Returns:
+    tuple: (basic paste, additional paste) as text, one player per line.
+    """
+    ab = stats["AB"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg = np.where(ab > 0, stats["Hits"] / ab, 0.0)
+        obp_denominator = ab + stats["BB"] + stats["HBP"] + stats["SF"]
+        obp = np.where(obp_denominator > 0, (stats["Hits"] + stats["BB"] + stats["HBP"]) / obp_denominator, 0.0)
+        total_bases = stats["Singles"] + 2 * stats["Doubles"] + 3 * stats["Triples"] + 4 * stats["HR"]
+        slg = np.where(ab > 0, total_bases / ab, 0.0)
+    obp = np.round(obp, 3)
+    slg = np.round(slg, 3)
+
+    # Every column as strings; rates repeat a lot, so each value is formatted once
+    text = {column: list(map(str, np.asarray(values).tolist())) for column, values in stats.items() if column != "Name"}
+    text["Name"] = list(stats["Name"])
+    text["AVG"], text["OBP"], text["SLG"], text["OPS"] = (_format_rates(values) for values in (avg, obp, slg, obp + slg))
+    basic_columns = ["Number", "Name", "Games", "AVG", "PA", "AB", "R", "Hits", "RBI", "Doubles", "Triples", "HR", "GS"]
+    additional_columns = ["Number", "Name", "Games", "SF", "SACB", "BB", "K", "HBP", "ROE", "FC", "LOB",
+                          "OBP", "SLG", "OPS"]
+
+    basic = [" ".join(row) for row in zip(*(text[column] for column in basic_columns))]
+    additional = [" ".join(row) for row in zip(*(text[column] for column in additional_columns))]
+    return "\n".join(basic), "\n".join(additional)
+
+
+def team_name(team):
+    return f"Team{team:04d}"
+
+
+# Function to build the raw pastes of a whole league
+def synthetic_league(teams=9, players=18, seed=0, league=0, season_games=SEASON_GAMES):
+    """
+    Parameters:
+    teams (int): Number of teams.
+    players (int): Players per team (at most 100).
+    seed (int): Seed; the same arguments always give the same pastes.
+    league (int): League number, so several leagues from one seed differ.
+
+    Returns:
+    dict: Team name to (basic paste, additional paste).
+    """
+    return {
+        team_name(team): team_pastes(team_stats(players, seed, league, team, season_games))
+        for team in range(teams)
+    }
+
+
+# Function to build one basic and one additional paste of any number of players
+def synthetic_pastes(rows, seed=0):
+    """
+    Draw players team by team (MAX_PLAYERS at a time) like synthetic_league,
+    as one pair of pastes. Each name gets its row number ('A. Smith17(Jr)'),
+    so every player of the paste has a name of their own, as a merge or key
+    over one large paste needs.
+
+    Returns:
+    tuple: (basic paste, additional paste), rows lines each.
+    """
+    if rows < 1:
+        raise ValueError("rows must be at least 1")
+    teams = [
+        team_stats(min(MAX_PLAYERS, rows - start), seed, team=team)
+        for team, start in enumerate(range(0, rows, MAX_PLAYERS))
+    ]
+    stats = {column: np.concatenate([team[column] for team in teams]) for column in teams[0] if column != "Name"}
+    names = [name for team in teams for name in team["Name"]]
+    stats["Name"] = [f"{name[:-4]}{i}{name[-4:]}" for i, name in enumerate(names)]
+    return team_pastes(stats)
+
+
+# Function to write raw <Team>.txt files in the batch_ingest layout
+def write_raw_league(directory, teams=9, players=18, seed=0, league=0):
+    """
+    Returns:
+    list: Paths of the files written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for team, (basic, additional) in synthetic_league(teams, players, seed, league).items():
+        path = os.path.join(directory, f"{team}.txt")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(f"{basic}\ndone\n{additional}\ndone\n")
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Directory to write the raw <Team>.txt files to")
+    parser.add_argument("--leagues", type=int, default=1)
+    parser.add_argument("--teams", type=int, default=9, help="Teams per league")
+    parser.add_argument("--players", type=int, default=18, help="Players per team")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.leagues < 1 or args.teams < 1:
+        parser.error("--leagues and --teams must be at least 1")
+    if not 0 < args.players <= MAX_PLAYERS:
+        parser.error(f"--players must be between 1 and {MAX_PLAYERS}")
+
+    for league in range(args.leagues):
+        directory = args.directory if args.leagues == 1 else os.path.join(args.directory, f"League{league + 1:02d}")
+        paths = write_raw_league(directory, args.teams, args.players, args.seed, league)
+        print(f"Wrote {len(paths)} teams to {directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
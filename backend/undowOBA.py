@@ -1,6 +1,8 @@
-import pandas as pd
 import os
 
+from .derived import DerivedColumns
+from .stats_store import CsvStore
+
 # Function to undo wOBA and remove the 1B column from all CSV files
 def undo_woba_and_1b():
     output_directory = "output_data"
@@ -10,26 +12,21 @@ def undo_woba_and_1b():
         print(f"The directory '{output_directory}' does not exist. No files to undo.")
         return
 
-    # Iterate over each CSV file in the directory
-    for filename in os.listdir(output_directory):
-        if filename.endswith(".csv"):
-            file_path = os.path.join(output_directory, filename)
-            df = pd.read_csv(file_path)
-            
-            # List of columns to remove
-            columns_to_remove = []
-            if 'wOBA' in df.columns:
-                columns_to_remove.append('wOBA')
-            if '1B' in df.columns:
-                columns_to_remove.append('1B')
-            
-            # Remove the columns if they exist
-            if columns_to_remove:
-                df = df.drop(columns=columns_to_remove)
-                df.to_csv(file_path, index=False)  # Save the updated DataFrame back to the CSV file
-                print(f"Columns {', '.join(columns_to_remove)} removed from file: {filename}")
-            else:
-                print(f"No wOBA or 1B column found in file: {filename}")
+    # Drop the cached values, then strip the columns from the team files that
+    # have them, all in one commit
+    store = CsvStore(output_directory)
+    removed = DerivedColumns(store).drop(['wOBA', '1B'], from_files=True)
+    for team in store.teams():
+        filename = os.path.basename(store.path_for(team))
+        if team in removed:
+            print(f"Columns {', '.join(removed[team])} removed from file: {filename}")
+        else:
+            print(f"No wOBA or 1B column found in file: {filename}")
+
+def main():
+    undo_woba_and_1b()
+
 
-# Call the function to undo wOBA and remove the 1B column
-undo_woba_and_1b()
+# Undo wOBA and remove the 1B column when run as a script
+if __name__ == "__main__":
+    main()
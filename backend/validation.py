@@ -0,0 +1,257 @@
+"""
+Validation and quarantine of pasted stat rows.
+
+The parsers skip rows they cannot read and print an error for each one. This
+stage parses the same way without printing. It also rejects rows that parse
+but cannot be right, such as more hits than at-bats or more at-bats than plate
+appearances. Every rejected row goes into a quarantine table with its line
+number and reason, and the report keeps counts per reason:
+
+    df, report = validate_text(raw_data, kind="basic")
+    if not report.clean:
+        print(report.summary())
+        report.quarantine.to_csv("quarantine.csv", index=False)
+
+The checks run as column operations over a whole chunk of rows at once.
+"""
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+from .fast_parse import _QUIT_PATTERN, DEFAULT_CHUNK_SIZE, _dtypes, _layout, _parse_text
+
+QUARANTINE_COLUMNS = ["Line", "Reason", "Detail", "Row"]
+
+# Reason given to rows the parser could not read; Detail holds the error
+UNPARSEABLE = "unparseable"
+
+# Counting stats that can never be negative
+NON_NEGATIVE_STATS = [
+    "Games", "PA", "AB", "R", "Hits", "RBI", "Doubles", "Triples", "HR", "GS",
+    "SF", "SACB", "BB", "K", "HBP", "ROE", "FC", "LOB",
+]
+
+# Sanity checks as (reason, columns, function returning True for bad rows).
+# A check runs on any frame that has all of its columns; missing values pass.
+SANITY_CHECKS = [
+    ("no name", ["Name"], lambda df: df["Name"] == ""),
+    ("Hits > AB", ["Hits", "AB"], lambda df: df["Hits"] > df["AB"]),
+    ("Doubles + Triples + HR > Hits", ["Doubles", "Triples", "HR", "Hits"],
+     lambda df: df["Doubles"] + df["Triples"] + df["HR"] > df["Hits"]),
+    ("AB > PA", ["AB", "PA"], lambda df: df["AB"] > df["PA"]),
+    ("GS > Games", ["GS", "Games"], lambda df: df["GS"] > df["Games"]),
+    ("AVG outside 0-1", ["AVG"], lambda df: (df["AVG"] < 0) | (df["AVG"] > 1)),
+    ("OBP outside 0-1", ["OBP"], lambda df: (df["OBP"] < 0) | (df["OBP"] > 1)),
+    ("SLG outside 0-4", ["SLG"], lambda df: (df["SLG"] < 0) | (df["SLG"] > 4)),
+]
+
+# Quarantined rows listed in ValidationReport.summary()
+SUMMARY_ROWS = 5
+
+
+def _empty_quarantine():
+    return pd.DataFrame({
+        "Line": pd.Series(dtype=np.int64), "Reason": pd.Series(dtype=object),
+        "Detail": pd.Series(dtype=object), "Row": pd.Series(dtype=object),
+    })
+
+
+# Counters and quarantined rows from validating one input
+@dataclass(frozen=True)
+class ValidationReport:
+    accepted: int = 0
+    quarantine: pd.DataFrame = field(default_factory=_empty_quarantine)
+    quit_line: int = None
+
+    @property
+    def rejected(self):
+        return len(self.quarantine)
+
+    @property
+    def rows(self):
+        return self.accepted + self.rejected
+
+    @property
+    def counts(self):
+        """
+        Quarantined rows per reason. A row that fails several checks is
+        counted under each of them.
+        """
+        if self.quarantine.empty:
+            return {}
+        reasons = self.quarantine["Reason"].str.split("; ").explode()
+        return reasons.value_counts(sort=True).to_dict()
+
+    @property
+    def clean(self):
+        return self.quarantine.empty and self.quit_line is None
+
+    def summary(self):
+        lines = [f"{self.rows} rows: {self.accepted} accepted, {self.rejected} quarantined"]
+        for reason, count in self.counts.items():
+            lines.append(f"  {reason}: {count}")
+        for line, reason, detail, row in self.quarantine[QUARANTINE_COLUMNS].head(SUMMARY_ROWS).itertuples(index=False):
+            lines.append(f"  line {line} ({reason}{': ' + detail if detail else ''}): {row}")
+        if self.rejected > SUMMARY_ROWS:
+            lines.append(f"  ... and {self.rejected - SUMMARY_ROWS} more")
+        if self.quit_line is not None:
+            lines.append(f"Stopped at 'quit' on line {self.quit_line}.")
+        return "\n".join(lines)
+
+
+# Function to combine the reports of several chunks into one
+def combine_reports(reports):
+    reports = list(reports)
+    quarantines = [report.quarantine for report in reports if not report.quarantine.empty]
+    quit_lines = [report.quit_line for report in reports if report.quit_line is not None]
+    return ValidationReport(
+        accepted=sum(report.accepted for report in reports),
+        quarantine=pd.concat(quarantines, ignore_index=True) if quarantines else _empty_quarantine(),
+        quit_line=quit_lines[0] if quit_lines else None,
+    )
+
+
+# Function to run the sanity checks over parsed rows
+def check_rows(df):
+    """
+    Parameters:
+    df (DataFrame): Parsed rows of either layout (or both merged).
+
+    Returns:
+    ndarray: For each row, the checks it failed joined by '; ', or '' if it
+    passed all of them.
+    """
+    reasons = np.full(len(df), "", dtype=object)
+    checks = list(SANITY_CHECKS)
+    counting = [column for column in NON_NEGATIVE_STATS if column in df.columns]
+    if counting:
+        checks.insert(0, ("negative count", counting, lambda frame: (frame[counting] < 0).any(axis=1)))
+
+    with instrument.stage("validate") as record:
+        for reason, columns, check in checks:
+            if not all(column in df.columns for column in columns):
+                continue
+            bad = np.asarray(check(df), dtype=bool)
+            if bad.any():
+                failed = reasons[bad]
+                reasons[bad] = np.where(failed == "", reason, failed + "; " + reason)
+        record.add(rows=len(df))
+    return reasons
+
+
+def _validate_text(text, kind, first_line):
+    """
+    Parse and check text whose first line is line first_line of the input.
+    """
+    layout, pattern = _layout(kind)
+    quit_match = _QUIT_PATTERN.search(text)
+    if quit_match:
+        return pd.DataFrame(), ValidationReport(quit_line=first_line + text.count("\n", 0, quit_match.start()))
+
+    stripped = text.strip()
+    # Line numbers count from the start of text, before blank lines are stripped
+    first_line += text[:len(text) - len(text.lstrip())].count("\n")
+    with instrument.stage("parse") as record:
+        df, lines, rejected = _parse_text(stripped, layout, pattern)
+        record.add(rows=len(df), bytes_read=len(text))
+
+    reasons = check_rows(df)
+    bad = reasons != ""
+    quarantine = []
+    if rejected:
+        line, row, error = zip(*rejected)
+        quarantine.append(pd.DataFrame({
+            "Line": np.array(line, dtype=np.int64) + first_line, "Reason": UNPARSEABLE,
+            "Detail": np.array(error, dtype=object), "Row": np.array(row, dtype=object),
+        }))
+    if bad.any():
+        raw_lines = np.array(stripped.split("\n"), dtype=object)
+        quarantine.append(pd.DataFrame({
+            "Line": lines[bad].astype(np.int64) + first_line, "Reason": reasons[bad],
+            "Detail": "", "Row": raw_lines[lines[bad]],
+        }))
+        df = df[~bad].reset_index(drop=True)
+
+    if len(quarantine) > 1:
+        quarantine = pd.concat(quarantine, ignore_index=True).sort_values("Line", kind="stable")
+        quarantine = quarantine.reset_index(drop=True)
+    else:
+        quarantine = quarantine[0] if quarantine else _empty_quarantine()
+    return df, ValidationReport(accepted=len(df), quarantine=quarantine)
+
+
+# Function to parse and validate a whole paste
+def validate_text(raw_data, kind="basic"):
+    """
+    Parameters:
+    raw_data (str): Pasted rows of the basic or additional stat table.
+    kind (str): "basic" or "additional".
+
+    Returns:
+    tuple: (DataFrame of the rows that passed, ValidationReport). Line
+    numbers in the quarantine count from 1 at the first line of raw_data. On a
+    'quit' line the DataFrame is empty with no columns, like the parsers
+    return, and the report records the line.
+    """
+    return _validate_text(raw_data, kind, 1)
+
+
+# Function to parse and validate a stream of lines in chunks
+def iter_validated_chunks(lines, kind="basic", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    The validated counterpart of fast_parse.iter_parse_chunks.
+
+    Yields:
+    tuple: (DataFrame, ValidationReport) per chunk. The index of the accepted
+    rows continues across chunks, and line numbers count from 1 at the first
+    line of the stream. A 'quit' line ends the stream with an empty DataFrame
+    with no columns and a report holding the line.
+    """
+    _layout(kind)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    offset = 0
+    first_line = 1
+    buffer = []
+    for line in lines:
+        buffer.append(line.rstrip("\r\n"))
+        if len(buffer) >= chunk_size or buffer[-1].lower() == "quit":
+            df, report = _validate_text("\n".join(buffer), kind, first_line)
+            first_line += len(buffer)
+            buffer.clear()
+            if report.quit_line is not None:
+                yield df, report
+                return
+            df.index += offset
+            offset += len(df)
+            yield df, report
+
+    if buffer:
+        df, report = _validate_text("\n".join(buffer), kind, first_line)
+        df.index += offset
+        yield df, report
+
+
+# Function to parse and validate a stream of lines into one DataFrame
+def validate_lines(lines, kind="basic", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Collect iter_validated_chunks into one DataFrame and one report. On a
+    'quit' line the DataFrame is empty with no columns and nothing counts as
+    accepted.
+    """
+    layout, _ = _layout(kind)
+    frames = []
+    reports = []
+    for df, report in iter_validated_chunks(lines, kind, chunk_size):
+        reports.append(report)
+        if report.quit_line is not None:
+            # Like parse_lines, 'quit' abandons the rows already parsed too
+            return df, replace(combine_reports(reports), accepted=0)
+        frames.append(df)
+    if not frames:
+        columns = ["Number", "Name"] + [column for column, _ in layout]
+        return pd.DataFrame(columns=columns).astype(_dtypes(layout)), ValidationReport()
+    return pd.concat(frames), combine_reports(reports)
@@ -1,50 +1,20 @@
 import os
+import numpy as np
 import pandas as pd
 
+from . import atomic_io
+from .league_totals import aggregate_league
+from .stats_store import open_store
+
 # Directory containing CSV files
 input_directory = 'output_data'
 league_data_file = os.path.join(input_directory, 'league_stats.csv')
 
-# Function to calculate the league wOBA using league data
-def calculate_league_woba(league_data, weights):
-    # Calculate league totals
-    singles = league_data.loc[league_data['Statistic'] == 'Hits', 'Total'].values[0] - (
-        league_data.loc[league_data['Statistic'] == 'Doubles', 'Total'].values[0] +
-        league_data.loc[league_data['Statistic'] == 'Triples', 'Total'].values[0] +
-        league_data.loc[league_data['Statistic'] == 'HR', 'Total'].values[0]
-    )
-    doubles = league_data.loc[league_data['Statistic'] == 'Doubles', 'Total'].values[0]
-    triples = league_data.loc[league_data['Statistic'] == 'Triples', 'Total'].values[0]
-    home_runs = league_data.loc[league_data['Statistic'] == 'HR', 'Total'].values[0]
-    walks = league_data.loc[league_data['Statistic'] == 'BB', 'Total'].values[0]
-    hit_by_pitch = league_data.loc[league_data['Statistic'] == 'HBP', 'Total'].values[0]
-    sacrifice_flies = league_data.loc[league_data['Statistic'] == 'SF', 'Total'].values[0]
-    at_bats = league_data.loc[league_data['Statistic'] == 'AB', 'Total'].values[0]
-    
-    # Calculate numerator and denominator for league wOBA
-    numerator = (
-        weights['Walks'] * walks +
-        weights['Hit By Pitch'] * hit_by_pitch +
-        weights['Singles'] * singles +
-        weights['Doubles'] * doubles +
-        weights['Triples'] * triples +
-        weights['Home Runs'] * home_runs
-    )
-    denominator = (
-        at_bats +
-        walks +
-        hit_by_pitch +
-        sacrifice_flies
-    )
-    
-    # Avoid division by zero
-    if denominator == 0:
-        return 0
-    
-    # Calculate league wOBA
-    return numerator / denominator
+# Function to calculate the league wOBA from the shared league totals
+def calculate_league_woba(totals, weights):
+    return totals.league_woba(weights)
 
-# Function to calculate wOBA for each player
+# Function to calculate wOBA for one player (row-wise reference for metrics.woba)
 def calculate_woba(row, weights):
     try:
         # Calculate singles
@@ -79,7 +49,7 @@ def calculate_woba(row, weights):
         print(f"Error calculating wOBA for row: {row['Name']}. Error: {e}")
         return 0
 
-# Function to calculate wRAA for each player
+# Function to calculate wRAA for one player (row-wise reference for metrics.wraa)
 def calculate_wraa(row, league_woba, woba_scale):
     try:
         # Calculate wRAA using the formula
@@ -102,39 +72,47 @@ mlb_woba_weights = {
     'Sacrifice Flies': 0.50
 }
 
-# Load the league data from the CSV file
-league_data = pd.read_csv(league_data_file)
-
-# Calculate the league wOBA using the league data
-calculated_league_woba = calculate_league_woba(league_data, mlb_woba_weights)
 woba_scale = 1.20  # Typical wOBA scale value
 
-print(f"Calculated League wOBA: {calculated_league_woba}")
 
-# Check if the wOBA row exists in the league data; if not, add it
-if 'wOBA' not in league_data['Statistic'].values:
-    new_row = pd.DataFrame({'Statistic': ['wOBA'], 'Total': [calculated_league_woba]})
-    league_data = pd.concat([league_data, new_row], ignore_index=True)
-    league_data.to_csv(league_data_file, index=False)
-    print("Added wOBA to league_stats.csv")
+def main():
+    store = open_store(os.environ.get("STATS_STORE", input_directory))
+    with atomic_io.transaction(input_directory), store.transaction():
+        _update_woba(store)
+    print("wOBA and wRAA calculation and update complete.")
+
+
+def _update_woba(store):
+    # derived imports this module for the weights, so it is imported here
+    from .derived import DerivedColumns
+
+    # Read the league once; the totals and the per-player columns share it
+    df = store.read()
+    totals = aggregate_league(df)
+    calculated_league_woba = calculate_league_woba(totals, mlb_woba_weights)
 
-# Loop through CSV files in the directory
-for filename in os.listdir(input_directory):
-    if filename.endswith('.csv') and filename != 'league_stats.csv':
-        file_path = os.path.join(input_directory, filename)
-        
-        # Read CSV file
-        df = pd.read_csv(file_path)
+    print(f"Calculated League wOBA: {calculated_league_woba}")
 
-        # Calculate wOBA for each player using the regular MLB weights
-        if 'wOBA' not in df.columns:
-            df['wOBA'] = df.apply(calculate_woba, axis=1, weights=mlb_woba_weights)
+    # Add the wOBA row to the league data, or refresh it if the league moved
+    league_data = pd.read_csv(league_data_file)
+    rows = league_data['Statistic'] == 'wOBA'
+    if not rows.any():
+        new_row = pd.DataFrame({'Statistic': ['wOBA'], 'Total': [calculated_league_woba]})
+        league_data = pd.concat([league_data, new_row], ignore_index=True)
+        print("Added wOBA to league_stats.csv")
+    elif not np.allclose(league_data.loc[rows, 'Total'].astype(float), calculated_league_woba, rtol=1e-12, atol=0):
+        league_data.loc[rows, 'Total'] = calculated_league_woba
+        print("Updated wOBA in league_stats.csv")
+    else:
+        league_data = None
+    if league_data is not None:
+        with atomic_io.atomic_path(league_data_file) as path:
+            league_data.to_csv(path, index=False)
 
-        # Calculate wRAA for each player using the calculated league wOBA
-        df['wRAA'] = df.apply(calculate_wraa, axis=1, league_woba=calculated_league_woba, woba_scale=woba_scale)
+    # wOBA and wRAA come from the derived-column cache; only teams whose values changed are rewritten
+    for team in DerivedColumns(store).materialize(['wOBA', 'wRAA'], df=df, totals=totals):
+        print(f"Updated wOBA and wRAA for {team}")
 
-        # Write updated DataFrame back to CSV
-        df.to_csv(file_path, index=False)
-        print(f"Updated wOBA and wRAA for {filename}")
 
-print("wOBA and wRAA calculation and update complete.")
+if __name__ == "__main__":
+    main()
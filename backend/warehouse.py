@@ -0,0 +1,380 @@
+"""
+Multi-season, multi-league history of team stats.
+
+Seasons are kept side by side instead of overwriting output_data/:
+
+    warehouse/<league>/<season>/<Team>_stats.csv
+
+Each season directory is an ordinary CsvStore. Next to the team files,
+partition_totals.json caches every team's summed counting stats and the
+players on it, keyed by the file's modification time and size, so league
+averages, league wOBA and league OPS for any set of seasons come from the
+cache without reading player rows, and a player's career reads only the team
+files that player appears in. Player rows read for multi-season queries are
+held as PlayerRecords, packed one team file at a time.
+
+    python -m backend.warehouse import output_data --league SCVAL --season 2024
+    python -m backend.warehouse career "R. Winsor" [--league SCVAL]
+    python -m backend.warehouse players --season 2023 2024 --min-pa 50
+    python -m backend.warehouse averages --league SCVAL
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from . import atomic_io, metrics
+from .league_totals import COUNTING_STATS, LeagueTotals, aggregate_league, combine_league_totals
+from .player_keys import normalize_names
+from .player_records import PlayerRecords
+from .stats_store import TEAM_COLUMN, CsvStore
+from .wOBA import mlb_woba_weights, woba_scale
+
+LEAGUE_COLUMN = "League"
+SEASON_COLUMN = "Season"
+PARTITION_TOTALS_FILE = "partition_totals.json"
+
+# Columns every aggregate query reads from the team files
+QUERY_COLUMNS = ['Number', 'Name'] + COUNTING_STATS + ['OBP', 'SLG']
+
+
+# Function to turn display names into identities that hold across seasons
+def player_identities(names):
+    """
+    'R. Winsor(Jr)' one season and 'R. Winsor (Sr)' the next are the same
+    player: the class in parentheses is dropped before normalizing.
+    """
+    return normalize_names([str(name).split("(", 1)[0] for name in names])
+
+
+# Function to tell which player-season rows belong to the same player
+def link_players(df):
+    """
+    A row is one player-season, keyed within its league-season on team,
+    number and name. Rows of different seasons are linked by name identity
+    (see player_identities), so a player who changes team or number keeps
+    one career. When two players share an identity in the same league-season,
+    that identity is linked by identity and team instead, and by identity,
+    team and number if they share a team too.
+
+    Parameters:
+    df (DataFrame or PlayerRecords): Rows with League, Season, Team, Number
+    and Name.
+
+    Returns:
+    ndarray: One player code per row.
+    """
+    work = pd.DataFrame({
+        'Identity': player_identities(df['Name']),
+        LEAGUE_COLUMN: np.asarray(df[LEAGUE_COLUMN]).astype(str),
+        SEASON_COLUMN: np.asarray(df[SEASON_COLUMN]).astype(str),
+        TEAM_COLUMN: np.asarray(df[TEAM_COLUMN]).astype(str),
+        'Number': np.asarray(df['Number']).astype(str),
+    })
+    levels = [['Identity'], ['Identity', TEAM_COLUMN], ['Identity', TEAM_COLUMN, 'Number']]
+    level = np.zeros(len(work), dtype=np.intp)
+    for depth, key in enumerate(levels[:-1]):
+        rows = work[level == depth]
+        clashes = rows.duplicated(subset=key + [LEAGUE_COLUMN, SEASON_COLUMN], keep=False)
+        ambiguous = work['Identity'].isin(rows.loc[clashes, 'Identity']).to_numpy()
+        level[ambiguous & (level == depth)] = depth + 1
+    team = np.where(level >= 1, work[TEAM_COLUMN], "")
+    number = np.where(level >= 2, work['Number'], "")
+    codes, _ = pd.MultiIndex.from_arrays([work['Identity'], team, number]).factorize()
+    return codes
+
+
+def _subdirectories(path):
+    if not os.path.isdir(path):
+        return []
+    # Hidden directories hold caches such as .derived, not partitions
+    return sorted(entry.name for entry in os.scandir(path) if entry.is_dir() and not entry.name.startswith("."))
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+# Partitioned store of team stats by league and season
+class Warehouse:
+    def __init__(self, root="warehouse"):
+        self.root = root
+        self._totals = {}
+
+    def leagues(self):
+        return _subdirectories(self.root)
+
+    def seasons(self, league):
+        return _subdirectories(os.path.join(self.root, league))
+
+    def store(self, league, season):
+        return CsvStore(os.path.join(self.root, league, str(season)))
+
+    def write_season(self, league, season, df):
+        """
+        Write a season's league table (with a Team column), replacing the teams
+        it contains.
+        """
+        self.store(league, season).write(df)
+        self._season_cache(league, str(season))
+
+    def import_directory(self, league, season, directory="output_data"):
+        df = CsvStore(directory).read()
+        if df.empty:
+            raise ValueError(f"No team stats found in '{directory}'.")
+        self.write_season(league, season, df)
+        return df[TEAM_COLUMN].nunique()
+
+    def partitions(self, leagues=None, seasons=None, teams=None):
+        """
+        (league, season, team) for every stored team, pruned by directory and
+        file names only.
+        """
+        seasons = None if seasons is None else {str(season) for season in seasons}
+        found = []
+        for league in self.leagues():
+            if leagues is not None and league not in leagues:
+                continue
+            for season in self.seasons(league):
+                if seasons is not None and season not in seasons:
+                    continue
+                for team in self.store(league, season).teams():
+                    if teams is None or team in teams:
+                        found.append((league, season, team))
+        return found
+
+    def _season_cache(self, league, season):
+        """
+        The partition_totals.json entries of a season, refreshed for team files
+        that changed since they were cached.
+        """
+        store = self.store(league, season)
+        path = os.path.join(store.directory, PARTITION_TOTALS_FILE)
+        cache = self._totals.get((league, season))
+        if cache is None:
+            cache = {}
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as handle:
+                    cache = json.load(handle)
+
+        teams = store.teams()
+        changed = [team for team in cache if team not in teams]
+        for team in changed:
+            del cache[team]
+        for team in teams:
+            signature = _signature(store.path_for(team))
+            if team in cache and cache[team]["signature"] == signature:
+                continue
+            df = pd.read_csv(store.path_for(team))
+            totals = aggregate_league(df)
+            cache[team] = {
+                "signature": signature,
+                "totals": totals.totals,
+                "players": totals.players,
+                "identities": sorted(set(player_identities(df['Name']))),
+            }
+            changed.append(team)
+
+        if changed:
+            with atomic_io.atomic_path(path) as staged, open(staged, "w", encoding="utf-8") as handle:
+                json.dump(cache, handle, indent=2, sort_keys=True)
+        self._totals[(league, season)] = cache
+        return cache
+
+    def partition_totals(self, league, season, team):
+        entry = self._season_cache(league, str(season))[team]
+        return LeagueTotals(totals=entry["totals"], players=entry["players"])
+
+    def season_totals(self, league, season):
+        cache = self._season_cache(league, str(season))
+        return combine_league_totals(
+            LeagueTotals(totals=entry["totals"], players=entry["players"]) for entry in cache.values()
+        )
+
+    def league_averages(self, leagues=None, seasons=None):
+        """
+        The league averages table (see league_avg) over any set of seasons,
+        from cached totals only.
+        """
+        keys = {(league, season) for league, season, _ in self.partitions(leagues, seasons)}
+        return combine_league_totals(self.season_totals(league, season) for league, season in sorted(keys))
+
+    def read(self, columns=None, leagues=None, seasons=None, teams=None, partitions=None):
+        """
+        Player rows from the selected partitions only, with League, Season and
+        Team columns.
+        """
+        partitions = self.partitions(leagues, seasons, teams) if partitions is None else partitions
+        frames = []
+        for league, season, team in partitions:
+            df = self.store(league, season).read(columns=columns, teams=[team])
+            df.insert(0, SEASON_COLUMN, season)
+            df.insert(0, LEAGUE_COLUMN, league)
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame(columns=[LEAGUE_COLUMN, SEASON_COLUMN, TEAM_COLUMN] + list(columns or []))
+        return pd.concat(frames, ignore_index=True)
+
+    def read_records(self, columns=None, leagues=None, seasons=None, teams=None, partitions=None):
+        """
+        Like read(), packed into PlayerRecords one partition at a time, so only
+        one team's rows are ever held as a DataFrame.
+
+        Returns:
+        PlayerRecords or None: None if no partition has rows.
+        """
+        partitions = self.partitions(leagues, seasons, teams) if partitions is None else partitions
+        parts = [PlayerRecords.from_frame(self.read(columns=columns, partitions=[partition]))
+                 for partition in partitions]
+        parts = [part for part in parts if len(part)]
+        return PlayerRecords.concat(parts) if parts else None
+
+    def player_partitions(self, name, leagues=None, seasons=None):
+        """
+        The partitions a player appears in, found from the cached identities.
+        """
+        identity = player_identities([name])[0]
+        caches = {}
+        found = []
+        for league, season, team in self.partitions(leagues, seasons):
+            if (league, season) not in caches:
+                caches[(league, season)] = self._season_cache(league, season)
+            if identity in caches[(league, season)][team]["identities"]:
+                found.append((league, season, team))
+        return found
+
+    def _season_constants(self, df):
+        constants = {}
+        for league, season in df[[LEAGUE_COLUMN, SEASON_COLUMN]].drop_duplicates().itertuples(index=False):
+            totals = self.season_totals(league, season)
+            constants[(league, season)] = (totals.league_woba(mlb_woba_weights), totals.ops)
+        keys = list(zip(df[LEAGUE_COLUMN], df[SEASON_COLUMN]))
+        league_woba = np.array([constants[key][0] for key in keys], dtype=np.float64)
+        league_ops = np.array([constants[key][1] for key in keys], dtype=np.float64)
+        return league_woba, league_ops
+
+    def _aggregate(self, records):
+        """
+        One row per player (see link_players) of PlayerRecords (or None):
+        summed counting stats, rates from the sums, wOBA from the summed
+        components, wRAA summed over seasons against each season's league
+        wOBA, and OPS+ as the PA-weighted mean of each season's OPS+.
+        """
+        if records is None or not len(records):
+            return pd.DataFrame(columns=['Name', TEAM_COLUMN, 'Seasons'] + COUNTING_STATS + [
+                'AVG', 'OBP', 'SLG', 'OPS', 'OPS+', 'wOBA', 'wRAA'])
+        # Only the columns used below are decoded
+        df = records.to_frame([LEAGUE_COLUMN, SEASON_COLUMN, TEAM_COLUMN, 'Name'] + COUNTING_STATS + ['OBP', 'SLG'])
+        df['Player'] = link_players(records)
+        counting = df[COUNTING_STATS].fillna(0).astype(np.int64)
+        league_woba, league_ops = self._season_constants(df)
+
+        season_woba = metrics.woba_column(counting, mlb_woba_weights)
+        df['wRAA'] = metrics.wraa(season_woba, counting['PA'], league_woba, woba_scale, decimals=None)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ops_plus = (df['OBP'] + df['SLG']).to_numpy() / league_ops * 100
+        weighted = np.isfinite(ops_plus)
+        df['OPS+ x PA'] = np.where(weighted, ops_plus, 0) * counting['PA']
+        df['OPS+ PA'] = np.where(weighted, counting['PA'], 0)
+        df[COUNTING_STATS] = counting
+
+        grouped = df.groupby('Player', sort=False)
+        players = grouped[COUNTING_STATS + ['wRAA', 'OPS+ x PA', 'OPS+ PA']].sum()
+        players.insert(0, 'Seasons', grouped[[LEAGUE_COLUMN, SEASON_COLUMN]].value_counts().groupby(level=0).size())
+        # The team of the player's last row, which tells apart players who share a name
+        players.insert(0, TEAM_COLUMN, grouped[TEAM_COLUMN].last())
+        players.insert(0, 'Name', grouped['Name'].last())
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            singles = metrics.singles(players['Hits'], players['Doubles'], players['Triples'], players['HR'])
+            total_bases = singles + 2 * players['Doubles'] + 3 * players['Triples'] + 4 * players['HR']
+            players['AVG'] = (players['Hits'] / players['AB']).round(3)
+            players['OBP'] = ((players['Hits'] + players['BB'] + players['HBP']) /
+                              (players['PA'] - players['SF'])).round(3)
+            players['SLG'] = (total_bases / players['AB']).round(3)
+            players['OPS'] = players['OBP'] + players['SLG']
+            ops_plus = players.pop('OPS+ x PA') / players.pop('OPS+ PA')
+        # Same NaN handling and rounding as the OPS+ metric in derived.py
+        players['OPS+'] = ops_plus.fillna(0).round().astype(int)
+        players['wOBA'] = metrics.woba_column(players, mlb_woba_weights)
+        players['wRAA'] = metrics.round_like_python(players['wRAA'], 2)
+        return players.reset_index(drop=True)
+
+    def career(self, name, leagues=None, seasons=None):
+        """
+        A player's season lines and career totals, reading only the team files
+        the player appears in.
+
+        Returns:
+        tuple: (season rows with League, Season and Team, career DataFrame
+        with one row per player of that name; see link_players)
+        """
+        partitions = self.player_partitions(name, leagues, seasons)
+        records = self.read_records(columns=QUERY_COLUMNS, partitions=partitions)
+        if records is None:
+            return self.read(columns=QUERY_COLUMNS, partitions=[]), self._aggregate(None)
+        identity = player_identities([name])[0]
+        records = records.take(np.array(player_identities(records['Name']), dtype=object) == identity)
+        return records.to_frame(), self._aggregate(records)
+
+    def players(self, leagues=None, seasons=None, min_pa=None):
+        """
+        Multi-season totals for every player in the selected partitions.
+        """
+        players = self._aggregate(self.read_records(columns=QUERY_COLUMNS, leagues=leagues, seasons=seasons))
+        if min_pa is not None:
+            players = players[players['PA'] >= min_pa].reset_index(drop=True)
+        return players
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default="warehouse")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Copy a directory of team stats into a season.")
+    import_parser.add_argument("directory")
+    import_parser.add_argument("--league", required=True)
+    import_parser.add_argument("--season", required=True)
+
+    career_parser = commands.add_parser("career", help="One player's seasons and career totals.")
+    career_parser.add_argument("name")
+    career_parser.add_argument("--league", nargs="+")
+
+    players_parser = commands.add_parser("players", help="Multi-season totals for every player.")
+    players_parser.add_argument("--league", nargs="+")
+    players_parser.add_argument("--season", nargs="+")
+    players_parser.add_argument("--min-pa", type=float)
+
+    averages_parser = commands.add_parser("averages", help="League averages over seasons.")
+    averages_parser.add_argument("--league", nargs="+")
+    averages_parser.add_argument("--season", nargs="+")
+
+    args = parser.parse_args(argv)
+    warehouse = Warehouse(args.root)
+    pd.set_option("display.width", 200)
+
+    if args.command == "import":
+        try:
+            teams = warehouse.import_directory(args.league, args.season, args.directory)
+        except ValueError as e:
+            sys.exit(str(e))
+        print(f"Imported {teams} teams into {args.league}/{args.season}.")
+    elif args.command == "career":
+        seasons, career = warehouse.career(args.name, leagues=args.league)
+        if seasons.empty:
+            sys.exit(f"No seasons found for '{args.name}'.")
+        print(seasons.to_string(index=False))
+        print(career.to_string(index=False))
+    elif args.command == "players":
+        print(warehouse.players(args.league, args.season, args.min_pa).to_string(index=False))
+    else:
+        print(warehouse.league_averages(args.league, args.season).to_frame().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,7 @@ const DisplayCsv: React.FC = () => {
   const [highlightedColumn, setHighlightedColumn] = useState<string>(''); // State to track highlighted column
 
   const excludedColumns = ['Number', 'FC', 'GS', 'LOB']; // Columns to exclude
+  const QUERY_PAGE_SIZE = 5000; // Matches the backend's maximum page size
 
   const fetchCsvFiles = async () => {
     try {
@@ -66,24 +67,37 @@ const DisplayCsv: React.FC = () => {
 
   const fetchAllCsvData = async () => {
     try {
-      let combinedData: CsvRow[] = [];
-
-      const filesToFetch = csvFiles.filter(file => file !== 'league_stats.csv');
-
-      for (const file of filesToFetch) {
-        const teamName = file.replace('_stats.csv', '');
-        const response = await fetch(`/api/readCsv?team=${teamName}`);
+      // The backend returns the league column by column, a page at a time;
+      // keep requesting pages until every player has been read
+      const combinedData: CsvRow[] = [];
+      let offset = 0;
+      let total = 0;
+      do {
+        const response = await fetch(`/api/query?limit=${QUERY_PAGE_SIZE}&offset=${offset}`);
         const result = await response.json();
 
-        if (response.ok) {
-          const data = parseCsvData(result.data, true);
-          const dataWithTeam = data.map(row => {
-            const { Name, ...rest } = row;
-            return { Name, Team: teamName, ...rest };
+        if (!response.ok) {
+          throw new Error(result.error);
+        }
+
+        const columns: { [key: string]: (string | number | null)[] } = result.columns;
+        const { Name, Team, ...rest } = columns;
+        const ordered = { Name, Team, ...rest };
+        for (let i = 0; i < result.rows; i++) {
+          const row: CsvRow = {};
+          Object.entries(ordered).forEach(([column, values]) => {
+            const value = values[i];
+            row[column] = value === null ? '' : value;
           });
-          combinedData = combinedData.concat(dataWithTeam);
+          combinedData.push(row);
         }
-      }
+
+        total = result.total;
+        offset += result.rows;
+        if (result.rows === 0) {
+          break;
+        }
+      } while (offset < total);
 
       setOriginalData(combinedData);
       setCsvData(combinedData);
@@ -1,17 +1,14 @@
 // src/pages/api/listCsvFiles.ts
 import { NextApiRequest, NextApiResponse } from 'next';
-import fs from 'fs';
-import path from 'path';
-
-export default function handler(req: NextApiRequest, res: NextApiResponse) {
-  const outputDir = '/Users/bkkim/baseball-stats-app/output_data'; // Use the actual absolute path
 
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   try {
-    const files = fs.readdirSync(outputDir);
-    const csvFiles = files.filter(file => file.endsWith('.csv'));
-    res.status(200).json({ csvFiles });
+    // The Python stats service keeps the directory listing in memory
+    const response = await fetch('http://localhost:5000/api/listCsvFiles');
+    const result = await response.json();
+    res.status(response.status).json(result);
   } catch (error) {
-    console.error('Error reading directory:', error);
+    console.error('Error connecting to Python API:', error);
     res.status(500).json({ error: 'Failed to read directory' });
   }
 }
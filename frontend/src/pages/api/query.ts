@@ -0,0 +1,16 @@
+// src/pages/api/query.ts
+import { NextApiRequest, NextApiResponse } from 'next';
+
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
+  // Forward the query string (teams, columns, sort, desc, min_pa, limit, offset) unchanged
+  const queryString = req.url?.split('?')[1] ?? '';
+
+  try {
+    const response = await fetch(`http://localhost:5000/api/query?${queryString}`);
+    const result = await response.json();
+    res.status(response.status).json(result);
+  } catch (error) {
+    console.error('Error connecting to Python API:', error);
+    res.status(500).json({ error: 'Failed to query player data' });
+  }
+}